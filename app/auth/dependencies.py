@@ -2,16 +2,69 @@ from fastapi import Request, HTTPException, Depends
 from app.database import get_database
 from bson import ObjectId
 from datetime import datetime
+from typing import Optional
 
+from app.config import get_settings
+from app.services.cache import VersionedCache
+from app.services.versions import version_tracker
 
-async def get_current_user(request: Request):
-    """Get current user from session."""
+settings = get_settings()
+
+# Non-secret user fields that may travel in the signed session cookie
+SESSION_USER_FIELDS = ("name", "email", "is_admin")
+
+# Users are cached per worker until their "user" version is bumped
+user_cache = VersionedCache("user")
+
+
+async def load_user(user_id: str):
+    """Load an active user, served from the version-checked cache when possible."""
+    db = get_database()
+    user = await user_cache.get_or_load(
+        user_id,
+        lambda: db.users.find_one({"_id": ObjectId(user_id), "deleted_at": {"$exists": False}})
+    )
+    # Hand out a copy so callers can't mutate the cached document
+    return dict(user) if user else None
+
+
+async def user_from_session(request: Request) -> Optional[dict]:
+    """Resolve the session's user, preferring the signed snapshot stored in the cookie.
+
+    The snapshot is used only while its version matches the user's current
+    version, so any write to the user (on any worker) forces a reload.
+    Snapshot users carry no tokens; see get_current_user_full.
+    """
     user_id = request.session.get("user_id")
     if not user_id:
+        return None
+
+    version = list(await version_tracker.get(user_id, "user"))
+
+    if settings.session_user_snapshot:
+        snapshot = request.session.get("user")
+        if snapshot and snapshot.get("id") == user_id and snapshot.get("version") == version:
+            user = {field: snapshot.get(field) for field in SESSION_USER_FIELDS}
+            user.update({"_id": ObjectId(user_id), "_from_session": True})
+            return user
+
+    user = await load_user(user_id)
+
+    if user and settings.session_user_snapshot:
+        request.session["user"] = {
+            **{field: user.get(field) for field in SESSION_USER_FIELDS},
+            "id": user_id,
+            "version": version
+        }
+    return user
+
+
+async def get_current_user(request: Request):
+    """Get current user from session."""
+    if not request.session.get("user_id"):
         raise HTTPException(status_code=401, detail="Not authenticated")
 
-    db = get_database()
-    user = await db.users.find_one({"_id": ObjectId(user_id)})
+    user = await user_from_session(request)
 
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
@@ -21,12 +74,15 @@ async def get_current_user(request: Request):
 
 async def get_current_user_optional(request: Request):
     """Get current user from session (optional - returns None if not logged in)."""
-    user_id = request.session.get("user_id")
-    if not user_id:
-        return None
+    return await user_from_session(request)
 
-    db = get_database()
-    user = await db.users.find_one({"_id": ObjectId(user_id)})
+
+async def get_current_user_full(user=Depends(get_current_user)):
+    """Get the complete user document, including OAuth tokens and default recipients."""
+    if user.get("_from_session"):
+        user = await load_user(str(user["_id"]))
+        if not user:
+            raise HTTPException(status_code=401, detail="User not found")
     return user
 
 
@@ -1,82 +1,100 @@
-from google_auth_oauthlib.flow import Flow
-from google.oauth2.credentials import Credentials
-from google.auth.transport.requests import Request
+import base64
+import hashlib
+import secrets
+from datetime import datetime, timedelta
+from typing import Optional
+from urllib.parse import urlencode
 from app.config import get_settings
-import json
+from app.services.http_client import get_http_client
 
 settings = get_settings()
 
-
-def create_oauth_flow(redirect_uri: str = None) -> Flow:
-    """Create Google OAuth flow."""
-    client_config = {
-        "web": {
-            "client_id": settings.google_client_id,
-            "client_secret": settings.google_client_secret,
-            "auth_uri": "https://accounts.google.com/o/oauth2/auth",
-            "token_uri": "https://oauth2.googleapis.com/token",
-            "redirect_uris": [f"{settings.app_url}/auth/callback"],
-        }
+AUTH_URI = "https://accounts.google.com/o/oauth2/auth"
+TOKEN_URI = "https://oauth2.googleapis.com/token"
+USERINFO_URI = "https://www.googleapis.com/oauth2/v2/userinfo"
+
+
+def _token_expiry(payload: dict) -> Optional[str]:
+    """Absolute expiry (naive UTC, as stored on users) from a token response's expires_in."""
+    expires_in = payload.get("expires_in")
+    if not expires_in:
+        return None
+    return (datetime.utcnow() + timedelta(seconds=expires_in)).isoformat()
+
+
+def get_authorization_url() -> tuple[str, str, str]:
+    """Get Google OAuth authorization URL, state and PKCE code verifier."""
+    state = secrets.token_urlsafe(32)
+    code_verifier = secrets.token_urlsafe(64)
+    code_challenge = base64.urlsafe_b64encode(
+        hashlib.sha256(code_verifier.encode("ascii")).digest()
+    ).decode("ascii").rstrip("=")
+
+    params = {
+        "response_type": "code",
+        "client_id": settings.google_client_id,
+        "redirect_uri": f"{settings.app_url}/auth/callback",
+        "scope": " ".join(settings.google_scopes),
+        "state": state,
+        "access_type": "offline",
+        "include_granted_scopes": "true",
+        "prompt": "consent",
+        "code_challenge": code_challenge,
+        "code_challenge_method": "S256"
     }
-
-    flow = Flow.from_client_config(
-        client_config,
-        scopes=settings.google_scopes,
-        redirect_uri=redirect_uri or f"{settings.app_url}/auth/callback"
-    )
-
-    return flow
+    return f"{AUTH_URI}?{urlencode(params)}", state, code_verifier
 
 
-def get_authorization_url() -> tuple[str, str]:
-    """Get Google OAuth authorization URL and state."""
-    flow = create_oauth_flow()
-    authorization_url, state = flow.authorization_url(
-        access_type="offline",
-        include_granted_scopes="true",
-        prompt="consent"
-    )
-    return authorization_url, state
-
-
-def exchange_code_for_tokens(code: str) -> dict:
+async def exchange_code_for_tokens(code: str, code_verifier: Optional[str] = None) -> dict:
     """Exchange authorization code for tokens."""
-    flow = create_oauth_flow()
-    flow.fetch_token(code=code)
+    data = {
+        "grant_type": "authorization_code",
+        "code": code,
+        "client_id": settings.google_client_id,
+        "client_secret": settings.google_client_secret,
+        "redirect_uri": f"{settings.app_url}/auth/callback"
+    }
+    if code_verifier:
+        data["code_verifier"] = code_verifier
+
+    response = await get_http_client().post(TOKEN_URI, data=data)
+    if response.status_code != 200:
+        raise ValueError(f"Token exchange failed: {response.text}")
+    payload = response.json()
 
-    credentials = flow.credentials
     return {
-        "access_token": credentials.token,
-        "refresh_token": credentials.refresh_token,
-        "token_expiry": credentials.expiry.isoformat() if credentials.expiry else None,
-        "scopes": list(credentials.scopes) if credentials.scopes else []
+        "access_token": payload["access_token"],
+        "refresh_token": payload.get("refresh_token"),
+        "token_expiry": _token_expiry(payload),
+        "scopes": payload.get("scope", "").split(),
+        "id_token": payload.get("id_token")
     }
 
 
-def refresh_access_token(refresh_token: str) -> dict:
-    """Refresh access token using refresh token."""
-    credentials = Credentials(
-        token=None,
-        refresh_token=refresh_token,
-        client_id=settings.google_client_id,
-        client_secret=settings.google_client_secret,
-        token_uri="https://oauth2.googleapis.com/token"
+async def fetch_user_info(access_token: str) -> dict:
+    """Get the signed-in user's Google profile."""
+    response = await get_http_client().get(
+        USERINFO_URI,
+        headers={"Authorization": f"Bearer {access_token}"}
     )
+    if response.status_code != 200:
+        raise ValueError("Failed to get user info")
+    return response.json()
 
-    credentials.refresh(Request())
+
+async def refresh_access_token(refresh_token: str) -> dict:
+    """Refresh access token using refresh token."""
+    response = await get_http_client().post(TOKEN_URI, data={
+        "grant_type": "refresh_token",
+        "refresh_token": refresh_token,
+        "client_id": settings.google_client_id,
+        "client_secret": settings.google_client_secret
+    })
+    if response.status_code != 200:
+        raise ValueError(f"Token refresh failed: {response.text}")
+    payload = response.json()
 
     return {
-        "access_token": credentials.token,
-        "token_expiry": credentials.expiry.isoformat() if credentials.expiry else None
+        "access_token": payload["access_token"],
+        "token_expiry": _token_expiry(payload)
     }
-
-
-def get_credentials_from_tokens(access_token: str, refresh_token: str) -> Credentials:
-    """Create Credentials object from tokens."""
-    return Credentials(
-        token=access_token,
-        refresh_token=refresh_token,
-        client_id=settings.google_client_id,
-        client_secret=settings.google_client_secret,
-        token_uri="https://oauth2.googleapis.com/token"
-    )
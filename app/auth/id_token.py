@@ -0,0 +1,127 @@
+import asyncio
+import base64
+import json
+import re
+import time
+from typing import Dict, Optional
+
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric import padding
+from cryptography.hazmat.primitives.asymmetric.rsa import RSAPublicKey, RSAPublicNumbers
+
+from app.config import get_settings
+from app.services.http_client import get_http_client
+
+settings = get_settings()
+
+GOOGLE_CERTS_URI = "https://www.googleapis.com/oauth2/v3/certs"
+GOOGLE_ISSUERS = ("accounts.google.com", "https://accounts.google.com")
+
+# Don't refetch more often than this when a token names a key we haven't seen
+MIN_REFRESH_INTERVAL = 60
+
+MAX_AGE = re.compile(r"max-age=(\d+)")
+
+
+class InvalidIdToken(ValueError):
+    pass
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _public_key(jwk: dict) -> RSAPublicKey:
+    n = int.from_bytes(_b64decode(jwk["n"]), "big")
+    e = int.from_bytes(_b64decode(jwk["e"]), "big")
+    return RSAPublicNumbers(e, n).public_key()
+
+
+class JWKSCache:
+    """Google's signing keys, refetched when the response's max-age runs out
+    or when a token names a key we don't have yet (key rotation)."""
+
+    def __init__(self, uri: str = GOOGLE_CERTS_URI):
+        self.uri = uri
+        self.keys: Dict[str, RSAPublicKey] = {}
+        self._expires_at = 0.0
+        self._fetched_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def refresh(self):
+        response = await get_http_client().get(self.uri)
+        response.raise_for_status()
+
+        self.keys = {
+            jwk["kid"]: _public_key(jwk)
+            for jwk in response.json()["keys"]
+            if jwk.get("kty") == "RSA"
+        }
+        match = MAX_AGE.search(response.headers.get("cache-control", ""))
+        max_age = int(match.group(1)) if match else settings.jwks_refresh_seconds
+        self._fetched_at = time.monotonic()
+        self._expires_at = self._fetched_at + max_age
+
+    def _needs_refresh(self, kid: str) -> bool:
+        now = time.monotonic()
+        if now >= self._expires_at:
+            return True
+        return kid not in self.keys and now - self._fetched_at >= MIN_REFRESH_INTERVAL
+
+    async def get_key(self, kid: str) -> Optional[RSAPublicKey]:
+        if self._needs_refresh(kid):
+            async with self._lock:
+                # Another request may have refreshed while we waited
+                if self._needs_refresh(kid):
+                    await self.refresh()
+        return self.keys.get(kid)
+
+    def clear(self):
+        self.keys.clear()
+        self._expires_at = 0.0
+        self._fetched_at = 0.0
+
+
+jwks_cache = JWKSCache()
+
+
+async def verify_id_token(token: str, audience: str) -> dict:
+    """Verify a Google ID token's RS256 signature and claims locally. Returns the claims."""
+    try:
+        header_b64, payload_b64, signature_b64 = token.split(".")
+        header = json.loads(_b64decode(header_b64))
+        claims = json.loads(_b64decode(payload_b64))
+        signature = _b64decode(signature_b64)
+    except ValueError:
+        raise InvalidIdToken("Malformed ID token")
+
+    if header.get("alg") != "RS256":
+        raise InvalidIdToken(f"Unsupported ID token algorithm: {header.get('alg')}")
+
+    key = await jwks_cache.get_key(header.get("kid"))
+    if key is None:
+        raise InvalidIdToken("ID token signed with an unknown key")
+
+    try:
+        key.verify(
+            signature,
+            f"{header_b64}.{payload_b64}".encode("ascii"),
+            padding.PKCS1v15(),
+            hashes.SHA256()
+        )
+    except InvalidSignature:
+        raise InvalidIdToken("Invalid ID token signature")
+
+    now = time.time()
+    leeway = settings.id_token_leeway_seconds
+    if claims.get("iss") not in GOOGLE_ISSUERS:
+        raise InvalidIdToken("Wrong ID token issuer")
+    if claims.get("aud") != audience:
+        raise InvalidIdToken("Wrong ID token audience")
+    if claims.get("exp", 0) < now - leeway:
+        raise InvalidIdToken("ID token expired")
+    if claims.get("iat", 0) > now + leeway:
+        raise InvalidIdToken("ID token issued in the future")
+
+    return claims
@@ -1,6 +1,6 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
-from typing import List
+from typing import List, Optional
 
 
 class Settings(BaseSettings):
@@ -19,6 +19,82 @@ class Settings(BaseSettings):
     # Admin emails (comma-separated in .env)
     admin_emails: str = ""
 
+    # Background user deletion
+    deletion_batch_size: int = 1000
+    deletion_stale_after_seconds: int = 300
+
+    # Admin bulk creates across all users
+    bulk_chunk_size: int = 1000
+    bulk_concurrency: int = 4
+
+    # Streaming CSV/vCard recipient imports (written in bulk_chunk_size chunks)
+    recipient_import_max_rows: int = 100000
+    recipient_import_error_limit: int = 1000
+
+    # Idempotency-Key support on send endpoints
+    idempotency_ttl_seconds: int = 86400
+    idempotency_wait_seconds: float = 10.0
+    # Longer than the slowest send (token refresh plus Gmail retry at http_timeout each)
+    idempotency_lease_seconds: int = 120
+
+    # Batched email log writes
+    log_batch_size: int = 100
+    log_flush_interval: float = 0.5
+    log_buffer_limit: int = 10000
+    log_max_retries: int = 3
+
+    # Cross-worker cache coherence
+    version_poll_interval: float = 1.0
+
+    # Keep a signed, versioned copy of name/email/is_admin in the session cookie
+    session_user_snapshot: bool = True
+
+    # Shared outbound HTTP client for Google APIs (HTTP/2 multiplexes requests per host)
+    http2: bool = True
+    http_max_connections: int = 100
+    http_max_keepalive_connections: int = 20
+    http_keepalive_expiry: float = 60.0
+    http_timeout: float = 15.0
+    http_connect_timeout: float = 5.0
+
+    # Local Google ID-token verification (JWKS max-age from Google wins when present)
+    jwks_refresh_seconds: int = 3600
+    id_token_leeway_seconds: int = 60
+
+    # Serving: uvicorn worker processes (python -m app.server)
+    host: str = "0.0.0.0"
+    port: int = 8000
+    workers: int = 1
+
+    # Periodic jobs run by whichever worker holds the background-jobs lease
+    background_lease_seconds: int = 30
+    background_job_interval: float = 60.0
+
+    # Backpressure on the send path, per worker process
+    send_max_in_flight: int = 32
+    send_queue_size: int = 64
+    send_queue_timeout: float = 2.0
+    send_retry_after: int = 2
+
+    # Rate limits ("<count>/<second|minute|hour|day>"); use the mongo backend with several workers
+    rate_limit_enabled: bool = True
+    rate_limit_backend: str = "memory"
+    rate_limit_user: str = "300/minute"
+    rate_limit_ip: str = "600/minute"
+    rate_limit_send: str = "30/minute"
+
+    # Prometheus metrics on /metrics
+    metrics_enabled: bool = True
+
+    # Append send-pipeline spans (OTLP/JSON layout, one per line) to this file; off when unset
+    trace_export_path: Optional[str] = None
+    trace_buffer_limit: int = 10000
+
+    # Response compression (comma-separated, in preference order; br needs the brotli package)
+    compression_encodings: str = "br,gzip"
+    compression_min_size: int = 1024
+    compression_level: int = 6
+
     # Google OAuth Scopes
     google_scopes: list = [
         "openid",
@@ -36,6 +112,10 @@ class Settings(BaseSettings):
             return []
         return [e.strip().lower() for e in self.admin_emails.split(",")]
 
+    def get_compression_encodings(self) -> List[str]:
+        """Parse comma-separated compression encodings."""
+        return [e.strip().lower() for e in self.compression_encodings.split(",") if e.strip()]
+
 
 @lru_cache()
 def get_settings() -> Settings:
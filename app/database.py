@@ -1,26 +1,54 @@
+import os
 from motor.motor_asyncio import AsyncIOMotorClient
 from app.config import get_settings
+from app.services.metrics import MongoCommandMetrics
 
 settings = get_settings()
 
 
 class Database:
     client: AsyncIOMotorClient = None
+    # Process that created the client; Motor clients must not be shared across fork()
+    pid: int = None
 
 
 db = Database()
 
 
 async def connect_to_mongo():
-    db.client = AsyncIOMotorClient(settings.mongodb_url)
+    db.client = AsyncIOMotorClient(settings.mongodb_url, event_listeners=[MongoCommandMetrics()])
+    db.pid = os.getpid()
     print(f"Connected to MongoDB at {settings.mongodb_url}")
 
 
 async def close_mongo_connection():
     if db.client:
         db.client.close()
+        db.pid = None
         print("Closed MongoDB connection")
 
 
+async def ensure_indexes():
+    """Create the indexes backing per-user lookups and admin keyset pagination."""
+    database = get_database()
+    await database.users.create_index([("email", 1)])
+    await database.users.create_index([("created_at", 1), ("_id", 1)])
+    await database.templates.create_index([("user_id", 1), ("_id", 1)])
+    await database.templates.create_index([("category", 1), ("_id", 1)])
+    await database.recipients.create_index([("user_id", 1), ("is_default", 1)])
+    await database.recipients.create_index([("email", 1)])
+    await database.recipients.create_index([("user_id", 1), ("email_lower", 1)])
+    await database.email_logs.create_index([("user_id", 1), ("sent_at", -1)])
+    await database.idempotency_keys.create_index(
+        [("created_at", 1)],
+        expireAfterSeconds=settings.idempotency_ttl_seconds
+    )
+    await database.rate_limits.create_index([("expires_at", 1)], expireAfterSeconds=0)
+
+
 def get_database():
+    if db.pid is not None and db.pid != os.getpid():
+        raise RuntimeError(
+            "MongoDB client was created before fork; connect_to_mongo must run in each worker"
+        )
     return db.client[settings.database_name]
@@ -1,13 +1,22 @@
-from fastapi import FastAPI, Request
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi import Depends, FastAPI, Request
+from fastapi.responses import ORJSONResponse, PlainTextResponse
 from starlette.middleware.sessions import SessionMiddleware
 from contextlib import asynccontextmanager
 import os
 
 from app.config import get_settings
-from app.database import connect_to_mongo, close_mongo_connection
+from app.database import connect_to_mongo, close_mongo_connection, ensure_indexes
 from app.auth.dependencies import get_current_user_optional
+from app.services.email_log_writer import log_writer
+from app.services.versions import version_tracker
+from app.services.background_jobs import background_jobs
+from app.services.http_client import open_http_client, close_http_client
+from app.services.rate_limit import api_rate_limit
+from app.spa import mount_spa
+from app.middleware.compression import CompressionMiddleware
+from app.middleware.metrics import MetricsMiddleware
+from app.services.metrics import registry
+from app.services.tracing import span_exporter
 
 # Import routers
 from app.routes.auth import router as auth_router
@@ -23,8 +32,19 @@ settings = get_settings()
 async def lifespan(app: FastAPI):
     # Startup
     await connect_to_mongo()
+    await ensure_indexes()
+    await open_http_client()
+    log_writer.start()
+    span_exporter.start()
+    version_tracker.start()
+    background_jobs.start()
     yield
     # Shutdown
+    await background_jobs.stop()
+    await version_tracker.stop()
+    await span_exporter.stop()
+    await log_writer.stop()
+    await close_http_client()
     await close_mongo_connection()
 
 
@@ -32,6 +52,7 @@ app = FastAPI(
     title="Email Trigger",
     description="Send templated emails to your warden via Gmail",
     version="1.0.0",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
@@ -42,12 +63,25 @@ app.add_middleware(
     max_age=86400 * 7  # 7 days
 )
 
-# Include API routers
-app.include_router(auth_router)
-app.include_router(templates_router)
-app.include_router(recipients_router)
-app.include_router(email_router)
-app.include_router(admin_router)
+# Compress large JSON responses
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.compression_min_size,
+    level=settings.compression_level,
+    encodings=settings.get_compression_encodings()
+)
+
+# Outermost, so timings include compression and session handling
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
+
+# Include API routers (per-user and per-IP rate limits apply to all of them)
+rate_limited = [Depends(api_rate_limit)]
+app.include_router(auth_router, dependencies=rate_limited)
+app.include_router(templates_router, dependencies=rate_limited)
+app.include_router(recipients_router, dependencies=rate_limited)
+app.include_router(email_router, dependencies=rate_limited)
+app.include_router(admin_router, dependencies=rate_limited)
 
 
 # ==================== API INFO ====================
@@ -67,23 +101,17 @@ async def get_me(request: Request):
     }
 
 
+if settings.metrics_enabled:
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        """Prometheus scrape endpoint."""
+        return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
 # ==================== SERVE REACT BUILD (PRODUCTION) ====================
 
-# In production, serve the React build
+# In production, serve the React build from memory
 FRONTEND_BUILD_DIR = os.path.join(os.path.dirname(__file__), "..", "frontend", "dist")
 
 if os.path.exists(FRONTEND_BUILD_DIR):
-    # Mount static assets
-    app.mount("/assets", StaticFiles(directory=os.path.join(FRONTEND_BUILD_DIR, "assets")), name="assets")
-
-    # Serve index.html for all other routes (SPA fallback)
-    @app.get("/{full_path:path}")
-    async def serve_spa(request: Request, full_path: str):
-        # Don't intercept API or auth routes
-        if full_path.startswith("api/") or full_path.startswith("auth/"):
-            return {"detail": "Not found"}
-
-        index_path = os.path.join(FRONTEND_BUILD_DIR, "index.html")
-        if os.path.exists(index_path):
-            return FileResponse(index_path)
-        return {"detail": "Frontend not built. Run 'npm run build' in frontend directory."}
+    mount_spa(app, FRONTEND_BUILD_DIR)
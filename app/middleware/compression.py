@@ -0,0 +1,95 @@
+import gzip
+from typing import List
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.spa import choose_encoding
+
+try:
+    import brotli
+except ImportError:  # optional: gzip is always available
+    brotli = None
+
+# Types that are already compressed gain nothing from another pass
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "image/svg+xml")
+
+
+def available_encodings(configured: List[str]) -> List[str]:
+    """Configured encodings we can actually produce, in preference order."""
+    return [e for e in configured if e == "gzip" or (e == "br" and brotli)]
+
+
+def compress(encoding: str, body: bytes, level: int) -> bytes:
+    if encoding == "br":
+        # Brotli quality runs 0-11; map the gzip-style 1-9 level onto it
+        return brotli.compress(body, quality=min(11, max(0, level + 2)))
+    return gzip.compress(body, compresslevel=level, mtime=0)
+
+
+class CompressionMiddleware:
+    """Compress complete (non-streaming) responses above a size threshold.
+
+    Streaming responses and responses that already carry a Content-Encoding
+    (such as precompressed SPA assets) pass through untouched.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, level: int = 6, encodings: List[str] = None):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.level = level
+        self.encodings = available_encodings(encodings or ["gzip"])
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not self.encodings:
+            await self.app(scope, receive, send)
+            return
+
+        accept = Headers(scope=scope).get("accept-encoding", "")
+        encoding = choose_encoding(accept, {e: b"" for e in self.encodings})
+        if encoding == "identity":
+            await self.app(scope, receive, send)
+            return
+
+        start: Message = None
+        passthrough = False
+
+        async def send_compressed(message: Message):
+            nonlocal start, passthrough
+
+            if message["type"] == "http.response.start":
+                start = message
+                return
+
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            headers = MutableHeaders(raw=start["headers"])
+
+            if message.get("more_body") or not self._should_compress(headers, body):
+                # Streaming or ineligible: forward everything as-is from here on
+                passthrough = True
+                await send(start)
+                await send(message)
+                return
+
+            compressed = compress(encoding, body, self.level)
+            headers["Content-Encoding"] = encoding
+            etag = headers.get("etag")
+            if etag and not etag.startswith("W/"):
+                # A strong ETag names exact bytes; the encoded body is a different representation
+                headers["ETag"] = etag[:-1] + f'-{encoding}"'
+            headers["Content-Length"] = str(len(compressed))
+            headers.add_vary_header("Accept-Encoding")
+            await send(start)
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_compressed)
+
+    def _should_compress(self, headers: MutableHeaders, body: bytes) -> bool:
+        if len(body) < self.minimum_size or "content-encoding" in headers:
+            return False
+        content_type = headers.get("content-type", "")
+        return content_type.startswith(COMPRESSIBLE_TYPES)
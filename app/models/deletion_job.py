@@ -0,0 +1,24 @@
+from pydantic import BaseModel
+from typing import Dict, Optional
+from datetime import datetime
+from enum import Enum
+
+
+class DeletionJobStatus(str, Enum):
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class DeletionJobResponse(BaseModel):
+    id: str
+    user_id: str
+    status: str
+    progress: Dict[str, int]
+    attempts: int
+    error: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -32,6 +32,19 @@ class EmailLogResponse(BaseModel):
         from_attributes = True
 
 
+def serialize_email_log(log: dict) -> dict:
+    """Build the EmailLogResponse shape straight from a Mongo document, without validation."""
+    return {
+        "id": str(log["_id"]),
+        "template_id": log.get("template_id"),
+        "to": log["to"],
+        "cc": log.get("cc", []),
+        "subject": log["subject"],
+        "status": log["status"],
+        "sent_at": log["sent_at"]
+    }
+
+
 class EmailLogInDB(BaseModel):
     user_id: str
     template_id: Optional[str] = None
@@ -35,6 +35,18 @@ class RecipientResponse(BaseModel):
         from_attributes = True
 
 
+def serialize_recipient(r: dict) -> dict:
+    """Build the RecipientResponse shape straight from a Mongo document, without validation."""
+    return {
+        "id": str(r["_id"]),
+        "name": r["name"],
+        "email": r["email"],
+        "type": r["type"],
+        "is_default": r.get("is_default", False),
+        "created_at": r["created_at"]
+    }
+
+
 class RecipientInDB(BaseModel):
     user_id: str
     name: str
@@ -42,6 +42,20 @@ class TemplateResponse(BaseModel):
         from_attributes = True
 
 
+def serialize_template(t: dict) -> dict:
+    """Build the TemplateResponse shape straight from a Mongo document, without validation."""
+    return {
+        "id": str(t["_id"]),
+        "name": t["name"],
+        "category": t["category"],
+        "subject": t["subject"],
+        "body": t["body"],
+        "variables": t.get("variables", []),
+        "is_default": t.get("is_default", False),
+        "created_at": t["created_at"]
+    }
+
+
 class TemplateInDB(BaseModel):
     user_id: str
     name: str
@@ -24,6 +24,17 @@ class UserResponse(BaseModel):
         from_attributes = True
 
 
+def serialize_user(u: dict) -> dict:
+    """Build the UserResponse shape straight from a Mongo document, without validation."""
+    return {
+        "id": str(u["_id"]),
+        "email": u["email"],
+        "name": u["name"],
+        "is_admin": u.get("is_admin", False),
+        "created_at": u["created_at"]
+    }
+
+
 class UserInDB(BaseModel):
     email: str
     name: str
@@ -1,14 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse
+from typing import List, Literal, Optional
 from bson import ObjectId
 from datetime import datetime
+import asyncio
 import re
 
 from app.auth.dependencies import get_admin_user
 from app.database import get_database
-from app.models.template import TemplateCreate, TemplateUpdate, TemplateResponse
-from app.models.recipient import RecipientCreate, RecipientUpdate, RecipientResponse
-from app.models.user import UserResponse
+from app.models.template import TemplateCreate, TemplateUpdate, TemplateResponse, TemplateCategory, serialize_template
+from app.models.recipient import RecipientCreate, RecipientUpdate, RecipientResponse, RecipientType, serialize_recipient
+from app.models.user import UserResponse, serialize_user
+from app.models.deletion_job import DeletionJobResponse
+from app.services.recipients import drop_default_snapshots, refresh_default_recipients, push_default_recipient
+from app.services.bulk import bulk_insert_for_all_users
+from app.services.pagination import paginate, estimate_total, page_headers
+from app.services.user_deletion import start_user_deletion, run_user_deletion, is_retryable, claim_retry
+from app.services.versions import bump_versions, bump_global_versions
 
 router = APIRouter(prefix="/api/admin", tags=["admin"])
 
@@ -20,69 +28,145 @@ def extract_variables(text: str) -> List[str]:
     return list(set(matches))
 
 
+def email_prefix(email: str) -> dict:
+    """Case-insensitive prefix match on an email address."""
+    return {"$regex": "^" + re.escape(email), "$options": "i"}
+
+
+async def list_page(collection, query: dict, sort: str, order: str, limit: int, cursor: Optional[str], serialize):
+    """Fetch one keyset page and its total concurrently, with the pagination headers set."""
+    sort_field = "_id" if sort == "id" else sort
+    (docs, next_cursor), (total, exact) = await asyncio.gather(
+        paginate(collection, query, sort_field, order == "desc", limit, cursor),
+        estimate_total(collection, query)
+    )
+    return ORJSONResponse(
+        [serialize(doc) for doc in docs],
+        headers=page_headers(next_cursor, total, exact)
+    )
+
+
 # ==================== USER MANAGEMENT ====================
 
 @router.get("/users", response_model=List[UserResponse])
-async def get_all_users(admin=Depends(get_admin_user)):
-    """Get all users (admin only)."""
+async def get_all_users(
+    email: Optional[str] = None,
+    is_admin: Optional[bool] = None,
+    sort: Literal["id", "created_at", "email", "name"] = "id",
+    order: Literal["asc", "desc"] = "asc",
+    limit: int = Query(1000, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    admin=Depends(get_admin_user)
+):
+    """Get users one page at a time (admin only).
+
+    The next page's cursor and the total count are returned in the
+    X-Next-Cursor and X-Total-Count headers.
+    """
     db = get_database()
-    users = await db.users.find().to_list(1000)
-
-    return [
-        UserResponse(
-            id=str(u["_id"]),
-            email=u["email"],
-            name=u["name"],
-            is_admin=u.get("is_admin", False),
-            created_at=u["created_at"]
-        )
-        for u in users
-    ]
+
+    query = {"deleted_at": {"$exists": False}}
+    if email:
+        query["email"] = email_prefix(email)
+    if is_admin is not None:
+        query["is_admin"] = is_admin
+
+    return await list_page(db.users, query, sort, order, limit, cursor, serialize_user)
 
 
 @router.delete("/users/{user_id}")
-async def delete_user(user_id: str, admin=Depends(get_admin_user)):
-    """Delete a user and all their data (admin only)."""
+async def delete_user(
+    user_id: str,
+    background_tasks: BackgroundTasks,
+    admin=Depends(get_admin_user)
+):
+    """Delete a user and all their data in the background (admin only)."""
     db = get_database()
 
     # Don't allow deleting yourself
     if str(admin["_id"]) == user_id:
         raise HTTPException(status_code=400, detail="Cannot delete yourself")
 
-    # Delete user's templates, recipients, email logs, and the user
-    await db.templates.delete_many({"user_id": user_id})
-    await db.recipients.delete_many({"user_id": user_id})
-    await db.email_logs.delete_many({"user_id": user_id})
-
-    result = await db.users.delete_one({"_id": ObjectId(user_id)})
+    # Tombstone the user now; templates, recipients and logs are removed by the job
+    job = await start_user_deletion(db, user_id, str(admin["_id"]))
 
-    if result.deleted_count == 0:
+    if not job:
         raise HTTPException(status_code=404, detail="User not found")
 
-    return {"message": "User and all related data deleted successfully"}
+    background_tasks.add_task(run_user_deletion, db, job["_id"], user_id)
+
+    return {"message": "User deletion started", "job_id": str(job["_id"])}
+
+
+def deletion_job_response(job: dict) -> DeletionJobResponse:
+    return DeletionJobResponse(
+        id=str(job["_id"]),
+        user_id=job["user_id"],
+        status=job["status"],
+        progress=job["progress"],
+        attempts=job.get("attempts", 0),
+        error=job.get("error"),
+        created_at=job["created_at"],
+        finished_at=job.get("finished_at")
+    )
+
+
+@router.get("/users/deletions/{job_id}", response_model=DeletionJobResponse)
+async def get_user_deletion(job_id: str, admin=Depends(get_admin_user)):
+    """Get progress of a background user deletion (admin only)."""
+    db = get_database()
+    job = await db.deletion_jobs.find_one({"_id": ObjectId(job_id)})
+
+    if not job:
+        raise HTTPException(status_code=404, detail="Deletion job not found")
+
+    return deletion_job_response(job)
+
+
+@router.post("/users/deletions/{job_id}/retry", response_model=DeletionJobResponse)
+async def retry_user_deletion(
+    job_id: str,
+    background_tasks: BackgroundTasks,
+    admin=Depends(get_admin_user)
+):
+    """Re-run a failed or stalled user deletion (admin only)."""
+    db = get_database()
+    job = await db.deletion_jobs.find_one({"_id": ObjectId(job_id)})
+
+    if not job:
+        raise HTTPException(status_code=404, detail="Deletion job not found")
+
+    if not is_retryable(job) or not await claim_retry(db, job):
+        raise HTTPException(status_code=409, detail="Deletion job is not failed or stalled")
+
+    background_tasks.add_task(run_user_deletion, db, job["_id"], job["user_id"])
+
+    job = await db.deletion_jobs.find_one({"_id": job["_id"]})
+    return deletion_job_response(job)
 
 
 # ==================== GLOBAL TEMPLATES ====================
 
 @router.get("/templates", response_model=List[TemplateResponse])
-async def get_all_templates(admin=Depends(get_admin_user)):
-    """Get all templates from all users (admin only)."""
+async def get_all_templates(
+    user_id: Optional[str] = None,
+    category: Optional[TemplateCategory] = None,
+    sort: Literal["id", "created_at", "name"] = "id",
+    order: Literal["asc", "desc"] = "asc",
+    limit: int = Query(1000, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    admin=Depends(get_admin_user)
+):
+    """Get templates from all users one page at a time (admin only)."""
     db = get_database()
-    templates = await db.templates.find().to_list(1000)
-
-    return [
-        TemplateResponse(
-            id=str(t["_id"]),
-            name=t["name"],
-            category=t["category"],
-            subject=t["subject"],
-            body=t["body"],
-            variables=t.get("variables", []),
-            is_default=t.get("is_default", False),
-            created_at=t["created_at"]
-        )
-        for t in templates
-    ]
+
+    query = {}
+    if user_id:
+        query["user_id"] = user_id
+    if category:
+        query["category"] = category.value
+
+    return await list_page(db.templates, query, sort, order, limit, cursor, serialize_template)
 
 
 @router.get("/templates/user/{user_id}", response_model=List[TemplateResponse])
@@ -91,19 +175,7 @@ async def get_user_templates(user_id: str, admin=Depends(get_admin_user)):
     db = get_database()
     templates = await db.templates.find({"user_id": user_id}).to_list(100)
 
-    return [
-        TemplateResponse(
-            id=str(t["_id"]),
-            name=t["name"],
-            category=t["category"],
-            subject=t["subject"],
-            body=t["body"],
-            variables=t.get("variables", []),
-            is_default=t.get("is_default", False),
-            created_at=t["created_at"]
-        )
-        for t in templates
-    ]
+    return ORJSONResponse([serialize_template(t) for t in templates])
 
 
 @router.post("/templates/user/{user_id}", response_model=TemplateResponse)
@@ -116,7 +188,7 @@ async def create_template_for_user(
     db = get_database()
 
     # Verify user exists
-    user = await db.users.find_one({"_id": ObjectId(user_id)})
+    user = await db.users.find_one({"_id": ObjectId(user_id), "deleted_at": {"$exists": False}})
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
@@ -140,6 +212,7 @@ async def create_template_for_user(
         )
 
     result = await db.templates.insert_one(new_template)
+    await bump_versions(db, user_id, "templates")
 
     return TemplateResponse(
         id=str(result.inserted_id),
@@ -187,6 +260,8 @@ async def update_any_template(
         {"$set": update_data}
     )
 
+    await bump_versions(db, existing["user_id"], "templates")
+
     updated = await db.templates.find_one({"_id": ObjectId(template_id)})
 
     return TemplateResponse(
@@ -206,33 +281,41 @@ async def delete_any_template(template_id: str, admin=Depends(get_admin_user)):
     """Delete any template (admin only)."""
     db = get_database()
 
-    result = await db.templates.delete_one({"_id": ObjectId(template_id)})
+    deleted = await db.templates.find_one_and_delete({"_id": ObjectId(template_id)})
 
-    if result.deleted_count == 0:
+    if not deleted:
         raise HTTPException(status_code=404, detail="Template not found")
 
+    await bump_versions(db, deleted["user_id"], "templates")
+
     return {"message": "Template deleted successfully"}
 
 
 # ==================== GLOBAL RECIPIENTS ====================
 
 @router.get("/recipients", response_model=List[RecipientResponse])
-async def get_all_recipients(admin=Depends(get_admin_user)):
-    """Get all recipients from all users (admin only)."""
+async def get_all_recipients(
+    user_id: Optional[str] = None,
+    email: Optional[str] = None,
+    type: Optional[RecipientType] = None,
+    sort: Literal["id", "created_at", "name", "email"] = "id",
+    order: Literal["asc", "desc"] = "asc",
+    limit: int = Query(1000, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    admin=Depends(get_admin_user)
+):
+    """Get recipients from all users one page at a time (admin only)."""
     db = get_database()
-    recipients = await db.recipients.find().to_list(1000)
-
-    return [
-        RecipientResponse(
-            id=str(r["_id"]),
-            name=r["name"],
-            email=r["email"],
-            type=r["type"],
-            is_default=r.get("is_default", False),
-            created_at=r["created_at"]
-        )
-        for r in recipients
-    ]
+
+    query = {}
+    if user_id:
+        query["user_id"] = user_id
+    if email:
+        query["email"] = email_prefix(email)
+    if type:
+        query["type"] = type.value
+
+    return await list_page(db.recipients, query, sort, order, limit, cursor, serialize_recipient)
 
 
 @router.post("/recipients/user/{user_id}", response_model=RecipientResponse)
@@ -244,7 +327,7 @@ async def create_recipient_for_user(
     """Create a recipient for a specific user (admin only)."""
     db = get_database()
 
-    user = await db.users.find_one({"_id": ObjectId(user_id)})
+    user = await db.users.find_one({"_id": ObjectId(user_id), "deleted_at": {"$exists": False}})
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
@@ -252,12 +335,17 @@ async def create_recipient_for_user(
         "user_id": user_id,
         "name": recipient.name,
         "email": recipient.email,
+        "email_lower": recipient.email.lower(),
         "type": recipient.type.value,
         "is_default": recipient.is_default,
         "created_at": datetime.utcnow()
     }
 
     result = await db.recipients.insert_one(new_recipient)
+    await bump_versions(db, user_id, "recipients")
+
+    if new_recipient["is_default"]:
+        await refresh_default_recipients(db, user_id)
 
     return RecipientResponse(
         id=str(result.inserted_id),
@@ -274,11 +362,16 @@ async def delete_any_recipient(recipient_id: str, admin=Depends(get_admin_user))
     """Delete any recipient (admin only)."""
     db = get_database()
 
-    result = await db.recipients.delete_one({"_id": ObjectId(recipient_id)})
+    deleted = await db.recipients.find_one_and_delete({"_id": ObjectId(recipient_id)})
 
-    if result.deleted_count == 0:
+    if not deleted:
         raise HTTPException(status_code=404, detail="Recipient not found")
 
+    await bump_versions(db, deleted["user_id"], "recipients")
+
+    if deleted.get("is_default"):
+        await refresh_default_recipients(db, deleted["user_id"])
+
     return {"message": "Recipient deleted successfully"}
 
 
@@ -292,27 +385,28 @@ async def bulk_create_templates(
     """Create the same template for all users (admin only)."""
     db = get_database()
 
-    users = await db.users.find().to_list(1000)
     variables = extract_variables(template.subject + " " + template.body)
+    created_at = datetime.utcnow()
 
-    templates_to_insert = []
-    for user in users:
-        new_template = {
-            "user_id": str(user["_id"]),
+    def build_template(user_id: ObjectId) -> dict:
+        return {
+            "user_id": str(user_id),
             "name": template.name,
             "category": template.category.value,
             "subject": template.subject,
             "body": template.body,
             "variables": variables,
             "is_default": False,
-            "created_at": datetime.utcnow()
+            "created_at": created_at
         }
-        templates_to_insert.append(new_template)
 
-    if templates_to_insert:
-        await db.templates.insert_many(templates_to_insert)
+    result = await bulk_insert_for_all_users(db, db.templates, build_template)
+    await bump_global_versions(db, "templates")
 
-    return {"message": f"Template created for {len(templates_to_insert)} users"}
+    return {
+        "message": f"Template created for {result['inserted']} users",
+        **result
+    }
 
 
 @router.post("/recipients/bulk-create")
@@ -323,21 +417,41 @@ async def bulk_create_recipients(
     """Create the same recipient for all users (admin only)."""
     db = get_database()
 
-    users = await db.users.find().to_list(1000)
+    created_at = datetime.utcnow()
 
-    recipients_to_insert = []
-    for user in users:
-        new_recipient = {
-            "user_id": str(user["_id"]),
+    def build_recipient(user_id: ObjectId) -> dict:
+        return {
+            "user_id": str(user_id),
             "name": recipient.name,
             "email": recipient.email,
+            "email_lower": recipient.email.lower(),
             "type": recipient.type.value,
             "is_default": recipient.is_default,
-            "created_at": datetime.utcnow()
+            "created_at": created_at
         }
-        recipients_to_insert.append(new_recipient)
 
-    if recipients_to_insert:
-        await db.recipients.insert_many(recipients_to_insert)
+    async def update_snapshots(user_ids: List[ObjectId]):
+        try:
+            await push_default_recipient(
+                db,
+                user_ids,
+                recipient.type.value,
+                {"name": recipient.name, "email": recipient.email}
+            )
+        except Exception:
+            # Some snapshots may have missed the push; have them rebuilt instead
+            await drop_default_snapshots(db, user_ids)
+            raise
+
+    result = await bulk_insert_for_all_users(
+        db,
+        db.recipients,
+        build_recipient,
+        after_chunk=update_snapshots if recipient.is_default else None
+    )
+    await bump_global_versions(db, "recipients")
 
-    return {"message": f"Recipient created for {len(recipients_to_insert)} users"}
+    return {
+        "message": f"Recipient created for {result['inserted']} users",
+        **result
+    }
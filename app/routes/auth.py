@@ -1,11 +1,12 @@
 from fastapi import APIRouter, Request, HTTPException
 from fastapi.responses import RedirectResponse
-import httpx
 from datetime import datetime
 
-from app.auth.google_oauth import get_authorization_url, exchange_code_for_tokens
+from app.auth.google_oauth import get_authorization_url, exchange_code_for_tokens, fetch_user_info
+from app.auth.id_token import verify_id_token
 from app.database import get_database
 from app.config import get_settings
+from app.services.versions import bump_versions
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 settings = get_settings()
@@ -14,8 +15,9 @@ settings = get_settings()
 @router.get("/login")
 async def login(request: Request):
     """Redirect to Google OAuth login."""
-    authorization_url, state = get_authorization_url()
+    authorization_url, state, code_verifier = get_authorization_url()
     request.session["oauth_state"] = state
+    request.session["oauth_code_verifier"] = code_verifier
     return RedirectResponse(url=authorization_url)
 
 
@@ -30,22 +32,22 @@ async def callback(request: Request, code: str = None, error: str = None):
 
     try:
         # Exchange code for tokens
-        tokens = exchange_code_for_tokens(code)
+        tokens = await exchange_code_for_tokens(code, request.session.pop("oauth_code_verifier", None))
 
-        # Get user info from Google
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                "https://www.googleapis.com/oauth2/v2/userinfo",
-                headers={"Authorization": f"Bearer {tokens['access_token']}"}
-            )
-            if response.status_code != 200:
-                raise HTTPException(status_code=400, detail="Failed to get user info")
-            user_info = response.json()
+        # Identify the user from the signed ID token; the userinfo call is only a fallback
+        if tokens.get("id_token"):
+            claims = await verify_id_token(tokens["id_token"], settings.google_client_id)
+            user_info = {"id": claims["sub"], "email": claims["email"], "name": claims.get("name")}
+        else:
+            user_info = await fetch_user_info(tokens["access_token"])
 
         db = get_database()
 
-        # Check if user exists
-        existing_user = await db.users.find_one({"google_id": user_info["id"]})
+        # Check if user exists (users being deleted sign up afresh)
+        existing_user = await db.users.find_one({
+            "google_id": user_info["id"],
+            "deleted_at": {"$exists": False}
+        })
 
         # Check if user is admin
         is_admin = user_info["email"].lower() in settings.get_admin_emails()
@@ -64,11 +66,12 @@ async def callback(request: Request, code: str = None, error: str = None):
                 }
             )
             user_id = str(existing_user["_id"])
+            await bump_versions(db, user_id, "user")
         else:
             # Create new user
             new_user = {
                 "email": user_info["email"],
-                "name": user_info.get("name", user_info["email"]),
+                "name": user_info.get("name") or user_info["email"],
                 "google_id": user_info["id"],
                 "access_token": tokens["access_token"],
                 "refresh_token": tokens.get("refresh_token"),
@@ -82,8 +85,9 @@ async def callback(request: Request, code: str = None, error: str = None):
             # Create default templates for new user
             await create_default_templates(db, user_id)
 
-        # Set session
+        # Set session (the user snapshot is rebuilt on the next request)
         request.session["user_id"] = user_id
+        request.session.pop("user", None)
 
         return RedirectResponse(url="/dashboard", status_code=302)
 
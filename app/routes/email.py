@@ -1,15 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel, EmailStr
 from typing import List, Optional, Dict
 from bson import ObjectId
 from datetime import datetime
+import asyncio
+from contextlib import asynccontextmanager
 
-from app.auth.dependencies import get_current_user
+from app.auth.dependencies import get_current_user, get_current_user_full
+from app.config import get_settings
 from app.database import get_database
 from app.services.gmail import send_email, substitute_variables
-from app.models.email_log import EmailLogResponse
+from app.services.recipients import get_default_recipients
+from app.services.backpressure import SendCapacityExceeded, send_limiter
+from app.services.rate_limit import send_rate_limit
+from app.services.idempotency import run_idempotent
+from app.services.tracing import traced
+from app.models.email_log import EmailLogResponse, serialize_email_log
 
 router = APIRouter(prefix="/api/email", tags=["email"])
+settings = get_settings()
 
 
 class SendEmailRequest(BaseModel):
@@ -28,12 +38,60 @@ class SendWithTemplateRequest(BaseModel):
     variables: Dict[str, str] = {}
 
 
-@router.post("/send")
+@asynccontextmanager
+async def send_slot():
+    """Hold one of the worker's send slots; 503 when saturated."""
+    try:
+        await send_limiter.acquire()
+    except SendCapacityExceeded as e:
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(settings.send_retry_after)}
+        )
+    try:
+        yield
+    finally:
+        send_limiter.release()
+
+
+async def with_idempotency(user: dict, key: Optional[str], endpoint: str, request: BaseModel, handler):
+    """Run a send handler in a send slot, coalescing retries that carry the same Idempotency-Key.
+
+    The key is resolved before taking a slot, so retries waiting on an
+    in-flight original or replaying a stored response don't hold one.
+    """
+    async def run():
+        async with send_slot():
+            return await handler()
+
+    if not key:
+        return await run()
+
+    return await run_idempotent(
+        get_database(),
+        str(user["_id"]),
+        key,
+        endpoint,
+        request.model_dump(mode="json"),
+        run
+    )
+
+
+@router.post("/send", dependencies=[Depends(send_rate_limit)])
 async def send_custom_email(
     request: SendEmailRequest,
-    user=Depends(get_current_user)
+    user=Depends(get_current_user_full),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
 ):
     """Send a custom email (without using a template)."""
+    return await with_idempotency(
+        user, idempotency_key, "send", request,
+        lambda: _send_custom_email(request, user)
+    )
+
+
+async def _send_custom_email(request: SendEmailRequest, user: dict) -> dict:
     # Substitute variables
     subject = substitute_variables(request.subject, request.variables, user)
     body = substitute_variables(request.body, request.variables, user)
@@ -53,43 +111,44 @@ async def send_custom_email(
     return result
 
 
-@router.post("/send-template")
+@router.post("/send-template", dependencies=[Depends(send_rate_limit)])
 async def send_template_email(
     request: SendWithTemplateRequest,
-    user=Depends(get_current_user)
+    user=Depends(get_current_user_full),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
 ):
     """Send an email using a template."""
+    return await with_idempotency(
+        user, idempotency_key, "send-template", request,
+        lambda: traced("send_template", _send_template_email(request, user))
+    )
+
+
+async def _send_template_email(request: SendWithTemplateRequest, user: dict) -> dict:
     db = get_database()
 
-    # Get the template
-    template = await db.templates.find_one({
+    # Default recipients come from the snapshot on the user document
+    pending = [traced("send_template.fetch_template", db.templates.find_one({
         "_id": ObjectId(request.template_id),
         "user_id": str(user["_id"])
-    })
+    }))]
+    if request.to is None or request.cc is None:
+        pending.append(traced("send_template.fetch_default_recipients", get_default_recipients(db, user)))
+
+    template, *defaults = await asyncio.gather(*pending)
+    defaults = defaults[0] if defaults else {"to": [], "cc": []}
 
     if not template:
         raise HTTPException(status_code=404, detail="Template not found")
 
-    # Get recipients
+    # Get recipients (fall back to defaults when not provided)
     if request.to is None:
-        # Use default TO recipients
-        default_to = await db.recipients.find({
-            "user_id": str(user["_id"]),
-            "type": "to",
-            "is_default": True
-        }).to_list(100)
-        to_emails = [r["email"] for r in default_to]
+        to_emails = [r["email"] for r in defaults["to"]]
     else:
         to_emails = request.to
 
     if request.cc is None:
-        # Use default CC recipients
-        default_cc = await db.recipients.find({
-            "user_id": str(user["_id"]),
-            "type": "cc",
-            "is_default": True
-        }).to_list(100)
-        cc_emails = [r["email"] for r in default_cc]
+        cc_emails = [r["email"] for r in defaults["cc"]]
     else:
         cc_emails = request.cc
 
@@ -126,49 +185,28 @@ async def get_email_logs(user=Depends(get_current_user)):
         {"user_id": str(user["_id"])}
     ).sort("sent_at", -1).to_list(100)
 
-    return [
-        EmailLogResponse(
-            id=str(log["_id"]),
-            template_id=log.get("template_id"),
-            to=log["to"],
-            cc=log.get("cc", []),
-            subject=log["subject"],
-            status=log["status"],
-            sent_at=log["sent_at"]
-        )
-        for log in logs
-    ]
+    return ORJSONResponse([serialize_email_log(log) for log in logs])
 
 
 @router.get("/preview-template/{template_id}")
 async def preview_template(
     template_id: str,
-    user=Depends(get_current_user)
+    user=Depends(get_current_user_full)
 ):
     """Preview a template with variables filled in."""
     db = get_database()
 
-    template = await db.templates.find_one({
-        "_id": ObjectId(template_id),
-        "user_id": str(user["_id"])
-    })
+    template, defaults = await asyncio.gather(
+        db.templates.find_one({
+            "_id": ObjectId(template_id),
+            "user_id": str(user["_id"])
+        }),
+        get_default_recipients(db, user)
+    )
 
     if not template:
         raise HTTPException(status_code=404, detail="Template not found")
 
-    # Get default recipients
-    default_to = await db.recipients.find({
-        "user_id": str(user["_id"]),
-        "type": "to",
-        "is_default": True
-    }).to_list(100)
-
-    default_cc = await db.recipients.find({
-        "user_id": str(user["_id"]),
-        "type": "cc",
-        "is_default": True
-    }).to_list(100)
-
     # Preview with auto-fill variables only
     preview_subject = substitute_variables(template["subject"], {}, user)
     preview_body = substitute_variables(template["body"], {}, user)
@@ -178,6 +216,6 @@ async def preview_template(
         "subject": preview_subject,
         "body": preview_body,
         "variables": template.get("variables", []),
-        "default_to": [{"name": r["name"], "email": r["email"]} for r in default_to],
-        "default_cc": [{"name": r["name"], "email": r["email"]} for r in default_cc]
+        "default_to": defaults["to"],
+        "default_cc": defaults["cc"]
     }
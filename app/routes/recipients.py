@@ -1,50 +1,46 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import ORJSONResponse
 from typing import List
 from bson import ObjectId
 from datetime import datetime
 
-from app.auth.dependencies import get_current_user
+from app.auth.dependencies import get_current_user, get_current_user_full
 from app.database import get_database
-from app.models.recipient import RecipientCreate, RecipientUpdate, RecipientResponse
+from app.models.recipient import RecipientCreate, RecipientUpdate, RecipientResponse, RecipientType, serialize_recipient
+from app.services.recipient_import import CSV_TYPES, VCARD_TYPES, csv_rows, import_recipients, vcard_rows
+from app.services.recipients import get_default_recipients as get_default_snapshot, refresh_default_recipients
+from app.services.etags import cache_headers, collection_etag, not_modified
+from app.services.versions import bump_versions
 
 router = APIRouter(prefix="/api/recipients", tags=["recipients"])
 
 
 @router.get("", response_model=List[RecipientResponse])
-async def get_recipients(user=Depends(get_current_user)):
+async def get_recipients(request: Request, user=Depends(get_current_user)):
     """Get all recipients for current user."""
+    etag = await collection_etag(str(user["_id"]), "recipients")
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+
     db = get_database()
     recipients = await db.recipients.find({"user_id": str(user["_id"])}).to_list(100)
 
-    return [
-        RecipientResponse(
-            id=str(r["_id"]),
-            name=r["name"],
-            email=r["email"],
-            type=r["type"],
-            is_default=r.get("is_default", False),
-            created_at=r["created_at"]
-        )
-        for r in recipients
-    ]
+    return ORJSONResponse([serialize_recipient(r) for r in recipients], headers=cache_headers(etag))
 
 
 @router.get("/defaults")
-async def get_default_recipients(user=Depends(get_current_user)):
+async def get_default_recipients(request: Request, user=Depends(get_current_user)):
     """Get default TO and CC recipients."""
-    db = get_database()
-    recipients = await db.recipients.find({
-        "user_id": str(user["_id"]),
-        "is_default": True
-    }).to_list(100)
+    # The defaults snapshot lives on the user document, so it follows both scopes
+    etag = await collection_etag(str(user["_id"]), "recipients", "user")
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
 
-    to_recipients = [r for r in recipients if r["type"] == "to"]
-    cc_recipients = [r for r in recipients if r["type"] == "cc"]
-
-    return {
-        "to": [{"name": r["name"], "email": r["email"]} for r in to_recipients],
-        "cc": [{"name": r["name"], "email": r["email"]} for r in cc_recipients]
-    }
+    db = get_database()
+    user = await get_current_user_full(user)
+    return ORJSONResponse(await get_default_snapshot(db, user), headers=cache_headers(etag))
 
 
 @router.post("", response_model=RecipientResponse)
@@ -56,12 +52,17 @@ async def create_recipient(recipient: RecipientCreate, user=Depends(get_current_
         "user_id": str(user["_id"]),
         "name": recipient.name,
         "email": recipient.email,
+        "email_lower": recipient.email.lower(),
         "type": recipient.type.value,
         "is_default": recipient.is_default,
         "created_at": datetime.utcnow()
     }
 
     result = await db.recipients.insert_one(new_recipient)
+    await bump_versions(db, str(user["_id"]), "recipients")
+
+    if new_recipient["is_default"]:
+        await refresh_default_recipients(db, str(user["_id"]))
 
     return RecipientResponse(
         id=str(result.inserted_id),
@@ -73,6 +74,41 @@ async def create_recipient(recipient: RecipientCreate, user=Depends(get_current_
     )
 
 
+@router.post("/import")
+async def import_recipients_file(
+    request: Request,
+    recipient_type: RecipientType = Query(RecipientType.TO, alias="type"),
+    is_default: bool = False,
+    user=Depends(get_current_user)
+):
+    """Bulk import recipients from a CSV or vCard request body.
+
+    The body is parsed as it streams in, so uploads of any size use bounded
+    memory. CSV needs a header row with an email column; name, type and
+    is_default columns override the query defaults per row.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type in CSV_TYPES:
+        rows = csv_rows(request.stream())
+    elif content_type in VCARD_TYPES:
+        rows = vcard_rows(request.stream())
+    else:
+        raise HTTPException(status_code=415, detail="Upload a CSV (text/csv) or vCard (text/vcard) file")
+
+    db = get_database()
+    result = await import_recipients(
+        db,
+        str(user["_id"]),
+        rows,
+        {"type": recipient_type, "is_default": is_default}
+    )
+
+    return {
+        "message": f"Imported {result['inserted']} recipients",
+        **result
+    }
+
+
 @router.put("/{recipient_id}", response_model=RecipientResponse)
 async def update_recipient(
     recipient_id: str,
@@ -95,13 +131,21 @@ async def update_recipient(
     if "type" in update_data and update_data["type"]:
         update_data["type"] = update_data["type"].value
 
+    if update_data.get("email"):
+        update_data["email_lower"] = update_data["email"].lower()
+
     await db.recipients.update_one(
         {"_id": ObjectId(recipient_id)},
         {"$set": update_data}
     )
 
+    await bump_versions(db, str(user["_id"]), "recipients")
+
     updated = await db.recipients.find_one({"_id": ObjectId(recipient_id)})
 
+    if existing.get("is_default") or updated.get("is_default"):
+        await refresh_default_recipients(db, str(user["_id"]))
+
     return RecipientResponse(
         id=str(updated["_id"]),
         name=updated["name"],
@@ -117,12 +161,17 @@ async def delete_recipient(recipient_id: str, user=Depends(get_current_user)):
     """Delete a recipient."""
     db = get_database()
 
-    result = await db.recipients.delete_one({
+    deleted = await db.recipients.find_one_and_delete({
         "_id": ObjectId(recipient_id),
         "user_id": str(user["_id"])
     })
 
-    if result.deleted_count == 0:
+    if not deleted:
         raise HTTPException(status_code=404, detail="Recipient not found")
 
+    await bump_versions(db, str(user["_id"]), "recipients")
+
+    if deleted.get("is_default"):
+        await refresh_default_recipients(db, str(user["_id"]))
+
     return {"message": "Recipient deleted successfully"}
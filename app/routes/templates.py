@@ -1,4 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import ORJSONResponse
 from typing import List
 from bson import ObjectId
 from datetime import datetime
@@ -6,7 +7,9 @@ import re
 
 from app.auth.dependencies import get_current_user
 from app.database import get_database
-from app.models.template import TemplateCreate, TemplateUpdate, TemplateResponse
+from app.models.template import TemplateCreate, TemplateUpdate, TemplateResponse, serialize_template
+from app.services.etags import cache_headers, collection_etag, not_modified
+from app.services.versions import bump_versions
 
 router = APIRouter(prefix="/api/templates", tags=["templates"])
 
@@ -19,24 +22,17 @@ def extract_variables(text: str) -> List[str]:
 
 
 @router.get("", response_model=List[TemplateResponse])
-async def get_templates(user=Depends(get_current_user)):
+async def get_templates(request: Request, user=Depends(get_current_user)):
     """Get all templates for current user."""
+    etag = await collection_etag(str(user["_id"]), "templates")
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+
     db = get_database()
     templates = await db.templates.find({"user_id": str(user["_id"])}).to_list(100)
 
-    return [
-        TemplateResponse(
-            id=str(t["_id"]),
-            name=t["name"],
-            category=t["category"],
-            subject=t["subject"],
-            body=t["body"],
-            variables=t.get("variables", []),
-            is_default=t.get("is_default", False),
-            created_at=t["created_at"]
-        )
-        for t in templates
-    ]
+    return ORJSONResponse([serialize_template(t) for t in templates], headers=cache_headers(etag))
 
 
 @router.get("/{template_id}", response_model=TemplateResponse)
@@ -90,6 +86,7 @@ async def create_template(template: TemplateCreate, user=Depends(get_current_use
         )
 
     result = await db.templates.insert_one(new_template)
+    await bump_versions(db, str(user["_id"]), "templates")
 
     return TemplateResponse(
         id=str(result.inserted_id),
@@ -142,6 +139,8 @@ async def update_template(
         {"$set": update_data}
     )
 
+    await bump_versions(db, str(user["_id"]), "templates")
+
     updated = await db.templates.find_one({"_id": ObjectId(template_id)})
 
     return TemplateResponse(
@@ -169,4 +168,6 @@ async def delete_template(template_id: str, user=Depends(get_current_user)):
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Template not found")
 
+    await bump_versions(db, str(user["_id"]), "templates")
+
     return {"message": "Template deleted successfully"}
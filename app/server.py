@@ -0,0 +1,24 @@
+"""Production entry point: ``python -m app.server``.
+
+Runs ``settings.workers`` uvicorn worker processes. Workers are spawned,
+not forked from a process holding a Mongo client, and each one opens its
+own Motor client in the app lifespan.
+"""
+import uvicorn
+
+from app.config import get_settings
+
+
+def main():
+    settings = get_settings()
+    uvicorn.run(
+        "app.main:app",
+        host=settings.host,
+        port=settings.port,
+        workers=settings.workers,
+        proxy_headers=True
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+import asyncio
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from typing import Optional
+from pymongo.errors import DuplicateKeyError
+
+from app.config import get_settings
+from app.database import get_database
+from app.services.recipients import backfill_email_lower
+from app.services.user_deletion import resume_stale_deletions
+
+settings = get_settings()
+
+LEASE_ID = "background-jobs"
+
+
+def _worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class BackgroundJobs:
+    """Runs periodic maintenance in exactly one worker.
+
+    Every worker starts this loop, but only the holder of a lease document
+    in the ``leases`` collection runs the jobs. The holder renews the lease
+    on each tick; if it dies, another worker takes over once
+    ``background_lease_seconds`` pass without a renewal.
+    """
+
+    def __init__(self):
+        self.worker_id = _worker_id()
+        self.is_leader = False
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def acquire(self) -> bool:
+        """Take or renew the lease. Returns whether this worker holds it."""
+        now = datetime.utcnow()
+        try:
+            await get_database().leases.find_one_and_update(
+                {"_id": LEASE_ID, "$or": [{"holder": self.worker_id}, {"expires_at": {"$lt": now}}]},
+                {"$set": {
+                    "holder": self.worker_id,
+                    "expires_at": now + timedelta(seconds=settings.background_lease_seconds)
+                }},
+                upsert=True
+            )
+            self.is_leader = True
+        except DuplicateKeyError:
+            # Another live worker holds the lease
+            self.is_leader = False
+        return self.is_leader
+
+    async def release(self):
+        if self.is_leader:
+            await get_database().leases.delete_one({"_id": LEASE_ID, "holder": self.worker_id})
+            self.is_leader = False
+
+    async def run_jobs(self):
+        db = get_database()
+        resumed = await resume_stale_deletions(db)
+        if resumed:
+            print(f"Resumed {resumed} stale user deletion jobs")
+
+        backfilled = await backfill_email_lower(db, settings.bulk_chunk_size)
+        if backfilled:
+            print(f"Set email_lower on {backfilled} recipients")
+
+    def start(self):
+        if not self.running:
+            # Pick up the pid of the worker process, not the one that imported us
+            self.worker_id = _worker_id()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            await self.release()
+        except Exception as e:
+            print(f"Failed to release background jobs lease: {e}")
+
+    async def _run(self):
+        # Renew well inside the lease so a slow tick doesn't hand it over
+        renew_interval = min(settings.background_job_interval, settings.background_lease_seconds / 3)
+        last_run: Optional[datetime] = None
+        while True:
+            try:
+                if await self.acquire():
+                    now = datetime.utcnow()
+                    if last_run is None or now - last_run >= timedelta(seconds=settings.background_job_interval):
+                        last_run = now
+                        await self.run_jobs()
+            except Exception as e:
+                print(f"Background jobs tick failed: {e}")
+            await asyncio.sleep(renew_interval)
+
+
+background_jobs = BackgroundJobs()
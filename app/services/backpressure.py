@@ -0,0 +1,67 @@
+import asyncio
+
+from app.config import get_settings
+from app.services.metrics import Counter, Gauge, registry
+
+settings = get_settings()
+
+SEND_IN_FLIGHT = registry.register(Gauge(
+    "send_in_flight", "Sends currently holding a slot."
+))
+SEND_QUEUE_DEPTH = registry.register(Gauge(
+    "send_queue_depth", "Sends waiting for a slot."
+))
+SEND_REJECTED = registry.register(Counter(
+    "send_rejected_total", "Sends turned away because the worker was saturated.", ["reason"]
+))
+
+
+class SendCapacityExceeded(Exception):
+    pass
+
+
+class SendLimiter:
+    """Bounds concurrent sends per process.
+
+    Up to ``max_in_flight`` sends run at once and up to ``queue_size`` more
+    wait, each for at most ``queue_timeout`` seconds. Anything beyond that
+    is rejected immediately rather than piling up behind Gmail.
+    """
+
+    def __init__(self, max_in_flight: int, queue_size: int, queue_timeout: float):
+        self.max_in_flight = max_in_flight
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self.waiting = 0
+        self._semaphore = asyncio.Semaphore(max_in_flight)
+
+    async def acquire(self):
+        if self._semaphore.locked():
+            if self.waiting >= self.queue_size:
+                SEND_REJECTED.inc("queue_full")
+                raise SendCapacityExceeded("Send queue is full")
+
+            self.waiting += 1
+            SEND_QUEUE_DEPTH.inc()
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+            except asyncio.TimeoutError:
+                SEND_REJECTED.inc("timeout")
+                raise SendCapacityExceeded("Timed out waiting for a send slot")
+            finally:
+                self.waiting -= 1
+                SEND_QUEUE_DEPTH.dec()
+        else:
+            await self._semaphore.acquire()
+
+        self.in_flight += 1
+        SEND_IN_FLIGHT.inc()
+
+    def release(self):
+        self.in_flight -= 1
+        SEND_IN_FLIGHT.dec()
+        self._semaphore.release()
+
+
+send_limiter = SendLimiter(settings.send_max_in_flight, settings.send_queue_size, settings.send_queue_timeout)
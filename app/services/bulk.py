@@ -0,0 +1,77 @@
+import asyncio
+from typing import Awaitable, Callable, List, Optional
+from bson import ObjectId
+from pymongo.errors import BulkWriteError
+
+from app.config import get_settings
+
+settings = get_settings()
+
+
+async def _insert_chunk(collection, docs: List[dict]) -> dict:
+    """Insert one chunk unordered, counting partial failures instead of aborting."""
+    try:
+        result = await collection.insert_many(docs, ordered=False)
+        return {"inserted": len(result.inserted_ids), "failed": 0, "errors": []}
+    except BulkWriteError as e:
+        details = e.details
+        errors = [err.get("errmsg", "") for err in details.get("writeErrors", [])]
+        return {"inserted": details.get("nInserted", 0), "failed": len(errors), "errors": errors}
+
+
+async def bulk_insert_for_all_users(
+    db,
+    collection,
+    build_doc: Callable[[ObjectId], dict],
+    after_chunk: Optional[Callable[[List[ObjectId]], Awaitable[None]]] = None
+) -> dict:
+    """Insert one document per active user, streaming users in fixed-size chunks.
+
+    Only user ids are read, at most ``bulk_concurrency`` chunks are in flight
+    and memory stays bounded by the chunk size regardless of user count.
+    ``after_chunk`` failures are counted in ``after_chunk_failed``; the
+    chunk's documents are already written and still count as inserted.
+    """
+    chunk_size = settings.bulk_chunk_size
+    semaphore = asyncio.Semaphore(settings.bulk_concurrency)
+    totals = {"inserted": 0, "failed": 0, "after_chunk_failed": 0, "errors": []}
+    tasks = set()
+
+    async def process(user_ids: List[ObjectId]):
+        try:
+            try:
+                outcome = await _insert_chunk(collection, [build_doc(uid) for uid in user_ids])
+            except Exception as e:
+                outcome = {"inserted": 0, "failed": len(user_ids), "errors": [str(e)]}
+
+            if after_chunk and outcome["inserted"]:
+                try:
+                    await after_chunk(user_ids)
+                except Exception as e:
+                    totals["after_chunk_failed"] += len(user_ids)
+                    outcome["errors"].append(str(e))
+        finally:
+            semaphore.release()
+
+        totals["inserted"] += outcome["inserted"]
+        totals["failed"] += outcome["failed"]
+        totals["errors"].extend(outcome["errors"])
+
+    cursor = db.users.find({"deleted_at": {"$exists": False}}, {"_id": 1}, batch_size=chunk_size)
+    chunk = []
+    async for user in cursor:
+        chunk.append(user["_id"])
+        if len(chunk) == chunk_size:
+            await semaphore.acquire()
+            tasks.add(asyncio.create_task(process(chunk)))
+            chunk = []
+
+    if chunk:
+        await semaphore.acquire()
+        tasks.add(asyncio.create_task(process(chunk)))
+
+    await asyncio.gather(*tasks)
+
+    # Keep the report small even if many chunks fail the same way
+    totals["errors"] = totals["errors"][:10]
+    return totals
@@ -0,0 +1,36 @@
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from app.services.versions import version_tracker
+
+
+class VersionedCache:
+    """In-process cache whose entries are valid while a user's scope version is unchanged.
+
+    Versions come from the shared ``versions`` collection, so entries are
+    dropped on every worker when any worker writes to that user's data.
+    """
+
+    def __init__(self, scope: str, max_entries: int = 10000):
+        self.scope = scope
+        self.max_entries = max_entries
+        self._entries: Dict[str, Tuple[tuple, object]] = {}
+
+    async def get_or_load(self, user_id: str, loader: Callable[[], Awaitable[Optional[object]]]):
+        version = await version_tracker.get(user_id, self.scope)
+        entry = self._entries.get(user_id)
+        if entry and entry[0] == version:
+            return entry[1]
+
+        value = await loader()
+        if value is not None:
+            if len(self._entries) >= self.max_entries:
+                # Drop the oldest entry (dicts keep insertion order)
+                self._entries.pop(next(iter(self._entries)))
+            self._entries[user_id] = (version, value)
+        return value
+
+    def invalidate(self, user_id: str):
+        self._entries.pop(user_id, None)
+
+    def clear(self):
+        self._entries.clear()
@@ -0,0 +1,119 @@
+import asyncio
+from typing import Dict, List, Optional
+from pymongo.errors import BulkWriteError
+
+from app.config import get_settings
+from app.database import get_database
+
+settings = get_settings()
+
+# An entry a previous attempt already stored (pymongo set its _id before sending)
+DUPLICATE_KEY = 11000
+
+
+class EmailLogWriter:
+    """Buffers email log entries in-process and writes them with insert_many.
+
+    Entries are flushed when ``log_batch_size`` accumulate or every
+    ``log_flush_interval`` seconds. When the writer isn't running or the
+    buffer holds ``log_buffer_limit`` entries, writes go straight to Mongo.
+    Entries that fail are retried up to ``log_max_retries`` times.
+    """
+
+    def __init__(self):
+        self.buffer: List[dict] = []
+        # Failed attempts per buffered entry, keyed by id() since entries are plain dicts
+        self._attempts: Dict[int, int] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        if self.running:
+            return
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the flush loop and write out anything still buffered."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def write(self, entry: dict):
+        if not self.running or len(self.buffer) >= settings.log_buffer_limit:
+            await get_database().email_logs.insert_one(entry)
+            return
+
+        self.buffer.append(entry)
+        if len(self.buffer) >= settings.log_batch_size:
+            self._wakeup.set()
+
+    async def flush(self):
+        while self.buffer:
+            batch = self.buffer[:settings.log_batch_size]
+            del self.buffer[:len(batch)]
+            try:
+                await get_database().email_logs.insert_many(batch, ordered=False)
+                failed = []
+            except BulkWriteError as e:
+                # Unordered inserts store everything else; only retry entries that really failed
+                indexes = sorted(
+                    err["index"] for err in e.details.get("writeErrors", [])
+                    if err.get("code") != DUPLICATE_KEY
+                )
+                failed = [batch[i] for i in indexes]
+                error = e
+            except Exception as e:
+                failed = batch
+                error = e
+
+            failed_ids = {id(entry) for entry in failed}
+            for entry in batch:
+                if id(entry) not in failed_ids:
+                    self._attempts.pop(id(entry), None)
+            if not failed:
+                continue
+
+            print(f"Failed to flush {len(failed)} email logs: {error}")
+            self._requeue(failed)
+            return
+
+    def _requeue(self, entries: List[dict]):
+        """Put failed entries back to retry on the next tick, dropping those out of retries."""
+        retry = []
+        for entry in entries:
+            attempts = self._attempts.get(id(entry), 0) + 1
+            if attempts > settings.log_max_retries:
+                self._attempts.pop(id(entry), None)
+                print(f"Dropping email log after {attempts} failed writes: {entry.get('_id')}")
+                continue
+            self._attempts[id(entry)] = attempts
+            retry.append(entry)
+
+        if len(self.buffer) + len(retry) <= settings.log_buffer_limit:
+            self.buffer[:0] = retry
+        else:
+            for entry in retry:
+                self._attempts.pop(id(entry), None)
+            print(f"Dropping {len(retry)} email logs: buffer is full")
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=settings.log_flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+
+log_writer = EmailLogWriter()
@@ -0,0 +1,57 @@
+import hashlib
+from typing import Optional
+from fastapi import Request
+from fastapi.responses import Response
+
+from app.services.versions import version_tracker
+
+# Clients revalidate every time; the version check makes that cheap
+CACHE_CONTROL = "private, no-cache"
+
+# Suffixes CompressionMiddleware appends to strong ETags of encoded responses
+ENCODING_SUFFIXES = ("-gzip", "-br")
+
+
+async def collection_etag(user_id: str, *scopes: str) -> str:
+    """Strong ETag for a user's view of one or more version scopes.
+
+    Compute it before reading the data: a write landing in between bumps the
+    version, so the worst case is a needless 200 on the next poll, never a
+    stale 304.
+    """
+    parts = [user_id]
+    for scope in scopes:
+        user_version, global_version = await version_tracker.get(user_id, scope)
+        parts.append(f"{scope}:{user_version}:{global_version}")
+    # Hash so the tag is opaque and differs per user even at equal versions
+    return '"' + hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()[:32] + '"'
+
+
+def _normalize(tag: str) -> str:
+    tag = tag.strip()
+    if tag.startswith("W/"):
+        tag = tag[2:]
+    for suffix in ENCODING_SUFFIXES:
+        if tag.endswith(suffix + '"'):
+            return tag[:-len(suffix) - 1] + '"'
+    return tag
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match uses weak comparison, so W/ and encoding suffixes are ignored."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(_normalize(tag) == etag for tag in if_none_match.split(","))
+
+
+def not_modified(request: Request, etag: str) -> Optional[Response]:
+    """A 304 response if the client already holds this version, else None."""
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+    return None
+
+
+def cache_headers(etag: str) -> dict:
+    return {"ETag": etag, "Cache-Control": CACHE_CONTROL}
@@ -1,46 +1,80 @@
-from googleapiclient.discovery import build
-from google.oauth2.credentials import Credentials
-from google.auth.transport.requests import Request
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 import base64
 from typing import List, Optional
-from datetime import datetime
+from datetime import datetime, timedelta
 import re
 
+from app.auth.google_oauth import refresh_access_token
 from app.config import get_settings
 from app.database import get_database
+from app.services.http_client import get_http_client
+from app.services.tracing import span
+from app.services.email_log_writer import log_writer
+from app.services.versions import bump_versions
 
 settings = get_settings()
 
+GMAIL_SEND_URI = "https://gmail.googleapis.com/gmail/v1/users/me/messages/send"
 
-async def get_user_credentials(user: dict) -> Credentials:
-    """Get and refresh user's Google credentials."""
-    credentials = Credentials(
-        token=user["access_token"],
-        refresh_token=user["refresh_token"],
-        client_id=settings.google_client_id,
-        client_secret=settings.google_client_secret,
-        token_uri="https://oauth2.googleapis.com/token"
-    )
+# Refresh a little before expiry so the token doesn't lapse mid-request
+TOKEN_REFRESH_MARGIN = timedelta(minutes=5)
+
+
+def token_expired(user: dict) -> bool:
+    expiry = user.get("token_expiry")
+    if not expiry:
+        return False
+    return datetime.fromisoformat(expiry) <= datetime.utcnow() + TOKEN_REFRESH_MARGIN
 
-    # Refresh if expired
-    if credentials.expired and credentials.refresh_token:
-        credentials.refresh(Request())
-
-        # Update tokens in database
-        db = get_database()
-        await db.users.update_one(
-            {"_id": user["_id"]},
-            {
-                "$set": {
-                    "access_token": credentials.token,
-                    "token_expiry": credentials.expiry.isoformat() if credentials.expiry else None
-                }
+
+async def refresh_user_token(user: dict) -> str:
+    """Refresh the user's access token and store it. Returns the new token."""
+    tokens = await refresh_access_token(user["refresh_token"])
+
+    db = get_database()
+    await db.users.update_one(
+        {"_id": user["_id"]},
+        {
+            "$set": {
+                "access_token": tokens["access_token"],
+                "token_expiry": tokens["token_expiry"]
             }
-        )
+        }
+    )
+    await bump_versions(db, str(user["_id"]), "user")
+    return tokens["access_token"]
+
+
+async def get_access_token(user: dict) -> str:
+    """Get the user's Google access token, refreshing it if expired."""
+    if token_expired(user) and user.get("refresh_token"):
+        return await refresh_user_token(user)
+    return user["access_token"]
+
+
+async def gmail_send(user: dict, message: dict) -> dict:
+    """Send a message through the Gmail REST API on the shared client."""
+    with span("send_email.access_token"):
+        access_token = await get_access_token(user)
+    client = get_http_client()
+
+    with span("send_email.gmail_api"):
+        response = await client.post(GMAIL_SEND_URI, json=message, headers={"Authorization": f"Bearer {access_token}"})
+    if response.status_code == 401 and user.get("refresh_token"):
+        # Revoked or clock-skewed token: refresh once and retry
+        with span("send_email.access_token", retry=True):
+            access_token = await refresh_user_token(user)
+        with span("send_email.gmail_api", retry=True):
+            response = await client.post(GMAIL_SEND_URI, json=message, headers={"Authorization": f"Bearer {access_token}"})
 
-    return credentials
+    if response.status_code != 200:
+        try:
+            error = response.json()["error"]["message"]
+        except (ValueError, KeyError, TypeError):
+            error = response.text
+        raise RuntimeError(f"Gmail API error {response.status_code}: {error}")
+    return response.json()
 
 
 def substitute_variables(text: str, variables: dict, user: dict) -> str:
@@ -96,38 +130,48 @@ async def send_email(
     template_id: Optional[str] = None
 ) -> dict:
     """Send an email using the Gmail API."""
-    try:
-        credentials = await get_user_credentials(user)
-        service = build("gmail", "v1", credentials=credentials)
+    with span("send_email", recipients=len(to) + len(cc)) as current:
+        result = await _send_email(user, to, cc, subject, body, template_id)
+        if not result["success"]:
+            current.error = result["error"]
+        return result
+
 
+async def _send_email(
+    user: dict,
+    to: List[str],
+    cc: List[str],
+    subject: str,
+    body: str,
+    template_id: Optional[str]
+) -> dict:
+    try:
         # Create the message
-        message = create_message(
-            sender=user["email"],
-            to=to,
-            cc=cc,
-            subject=subject,
-            body=body
-        )
+        with span("send_email.create_message"):
+            message = create_message(
+                sender=user["email"],
+                to=to,
+                cc=cc,
+                subject=subject,
+                body=body
+            )
 
         # Send the message
-        result = service.users().messages().send(
-            userId="me",
-            body=message
-        ).execute()
+        result = await gmail_send(user, message)
 
         # Log the email
-        db = get_database()
-        await db.email_logs.insert_one({
-            "user_id": str(user["_id"]),
-            "template_id": template_id,
-            "to": to,
-            "cc": cc,
-            "subject": subject,
-            "body": body,
-            "status": "sent",
-            "message_id": result.get("id"),
-            "sent_at": datetime.utcnow()
-        })
+        with span("send_email.log_write"):
+            await log_writer.write({
+                "user_id": str(user["_id"]),
+                "template_id": template_id,
+                "to": to,
+                "cc": cc,
+                "subject": subject,
+                "body": body,
+                "status": "sent",
+                "message_id": result.get("id"),
+                "sent_at": datetime.utcnow()
+            })
 
         return {
             "success": True,
@@ -137,18 +181,18 @@ async def send_email(
 
     except Exception as e:
         # Log failed attempt
-        db = get_database()
-        await db.email_logs.insert_one({
-            "user_id": str(user["_id"]),
-            "template_id": template_id,
-            "to": to,
-            "cc": cc,
-            "subject": subject,
-            "body": body,
-            "status": "failed",
-            "error": str(e),
-            "sent_at": datetime.utcnow()
-        })
+        with span("send_email.log_write"):
+            await log_writer.write({
+                "user_id": str(user["_id"]),
+                "template_id": template_id,
+                "to": to,
+                "cc": cc,
+                "subject": subject,
+                "body": body,
+                "status": "failed",
+                "error": str(e),
+                "sent_at": datetime.utcnow()
+            })
 
         return {
             "success": False,
@@ -0,0 +1,61 @@
+import time
+import httpx
+
+from app.config import get_settings
+from app.services.metrics import OUTBOUND_LATENCY
+
+settings = get_settings()
+
+
+class HTTPClient:
+    client: httpx.AsyncClient = None
+
+
+http = HTTPClient()
+
+
+class TimedTransport(httpx.AsyncHTTPTransport):
+    """Records time to response headers for each outbound request."""
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        start = time.perf_counter()
+        status = "error"
+        try:
+            response = await super().handle_async_request(request)
+            status = str(response.status_code)
+            return response
+        finally:
+            OUTBOUND_LATENCY.observe(time.perf_counter() - start, request.url.host, request.method, status)
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """A pooled client for Google APIs: keep-alive, HTTP/2 multiplexing and bounded waits."""
+    transport = TimedTransport(
+        http2=settings.http2,
+        limits=httpx.Limits(
+            max_connections=settings.http_max_connections,
+            max_keepalive_connections=settings.http_max_keepalive_connections,
+            keepalive_expiry=settings.http_keepalive_expiry
+        )
+    )
+    return httpx.AsyncClient(
+        transport=transport,
+        timeout=httpx.Timeout(settings.http_timeout, connect=settings.http_connect_timeout)
+    )
+
+
+async def open_http_client():
+    http.client = create_http_client()
+
+
+async def close_http_client():
+    if http.client:
+        await http.client.aclose()
+        http.client = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """The shared client for outbound calls, created on first use outside the app lifespan."""
+    if http.client is None:
+        http.client = create_http_client()
+    return http.client
@@ -0,0 +1,124 @@
+import asyncio
+import hashlib
+import json
+import uuid
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Optional, Tuple
+from fastapi import HTTPException
+from pymongo.errors import DuplicateKeyError
+
+from app.config import get_settings
+
+settings = get_settings()
+
+POLL_INTERVAL = 0.1
+
+
+def request_fingerprint(endpoint: str, payload: dict) -> str:
+    """Hash the endpoint and request body so a key can't be reused for a different request."""
+    raw = json.dumps({"endpoint": endpoint, "payload": payload}, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+async def _take_over(db, record: dict, owner: str) -> bool:
+    """Claim an in-progress key whose holder stopped before its lease ran out."""
+    lease_until = record.get("lease_until") or (
+        record["created_at"] + timedelta(seconds=settings.idempotency_lease_seconds)
+    )
+    if lease_until > datetime.utcnow():
+        return False
+
+    result = await db.idempotency_keys.update_one(
+        {"_id": record["_id"], "status": "in_progress", "owner": record.get("owner")},
+        {"$set": {"owner": owner, "lease_until": _lease_deadline()}}
+    )
+    return result.modified_count == 1
+
+
+def _lease_deadline() -> datetime:
+    return datetime.utcnow() + timedelta(seconds=settings.idempotency_lease_seconds)
+
+
+async def _wait_for_result(db, key_id: str, fingerprint: str, owner: str) -> Tuple[bool, Optional[dict]]:
+    """Wait for the request holding this key to finish.
+
+    Returns (owned, response): the stored response once it completes,
+    (False, None) if it failed and released the key, or (True, None) if its
+    lease expired and this request took the key over.
+    """
+    waited = 0.0
+    while True:
+        record = await db.idempotency_keys.find_one({"_id": key_id})
+
+        if record is None:
+            # The original attempt failed and released the key
+            return False, None
+        if record["fingerprint"] != fingerprint:
+            raise HTTPException(
+                status_code=422,
+                detail="Idempotency-Key was already used for a different request"
+            )
+        if record["status"] == "completed":
+            return False, record["response"]
+        if await _take_over(db, record, owner):
+            return True, None
+
+        if waited >= settings.idempotency_wait_seconds:
+            raise HTTPException(
+                status_code=409,
+                detail="A request with this Idempotency-Key is still in progress"
+            )
+        await asyncio.sleep(POLL_INTERVAL)
+        waited += POLL_INTERVAL
+
+
+async def run_idempotent(
+    db,
+    user_id: str,
+    key: str,
+    endpoint: str,
+    payload: dict,
+    handler: Callable[[], Awaitable[dict]]
+) -> dict:
+    """Run handler at most once per (user, Idempotency-Key).
+
+    Retries of a completed request get the stored response; retries that
+    arrive while it is in flight wait for it. Failed requests release the
+    key so the client can try again. A request holds the key for
+    ``idempotency_lease_seconds``; if its worker dies, a waiting retry takes
+    the key over once the lease has passed. Records expire via a TTL index.
+    """
+    key_id = f"{user_id}:{key}"
+    fingerprint = request_fingerprint(endpoint, payload)
+    owner = uuid.uuid4().hex
+
+    while True:
+        try:
+            await db.idempotency_keys.insert_one({
+                "_id": key_id,
+                "fingerprint": fingerprint,
+                "status": "in_progress",
+                "response": None,
+                "owner": owner,
+                "lease_until": _lease_deadline(),
+                "created_at": datetime.utcnow()
+            })
+            break
+        except DuplicateKeyError:
+            owned, response = await _wait_for_result(db, key_id, fingerprint, owner)
+            if owned:
+                break
+            if response is not None:
+                return response
+
+    try:
+        response = await handler()
+    except BaseException:
+        await db.idempotency_keys.delete_one({"_id": key_id, "owner": owner})
+        raise
+
+    await db.idempotency_keys.update_one(
+        {"_id": key_id, "owner": owner},
+        {"$set": {"status": "completed", "response": response}}
+    )
+    return response
@@ -0,0 +1,99 @@
+import base64
+from typing import List, Optional, Tuple
+from bson import json_util
+from fastapi import HTTPException
+
+# Counts beyond this are reported as "at least" to keep filtered counts cheap
+COUNT_LIMIT = 10000
+
+
+def encode_cursor(sort_field: str, doc: dict) -> str:
+    """Encode the sort key of the last document on a page as an opaque cursor."""
+    raw = json_util.dumps({"v": doc.get(sort_field), "id": doc["_id"]})
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> dict:
+    """Decode a cursor produced by encode_cursor."""
+    try:
+        return json_util.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def keyset_filter(sort_field: str, descending: bool, cursor: Optional[str]) -> dict:
+    """Build the filter selecting documents strictly after the cursor."""
+    if not cursor:
+        return {}
+
+    position = decode_cursor(cursor)
+    op = "$lt" if descending else "$gt"
+
+    if sort_field == "_id":
+        return {"_id": {op: position["id"]}}
+
+    value = position["v"]
+    same_value = {sort_field: value, "_id": {op: position["id"]}}
+
+    # Nulls and missing fields sort first ascending and last descending, but
+    # comparisons never match them (type bracketing), so handle them explicitly
+    if value is None:
+        if descending:
+            return same_value
+        return {"$or": [{sort_field: {"$ne": None}}, same_value]}
+
+    branches = [{sort_field: {op: value}}, same_value]
+    if descending:
+        branches.append({sort_field: None})
+    return {"$or": branches}
+
+
+async def paginate(
+    collection,
+    query: dict,
+    sort_field: str,
+    descending: bool,
+    limit: int,
+    cursor: Optional[str] = None
+) -> Tuple[List[dict], Optional[str]]:
+    """Fetch one keyset page. Returns the documents and the cursor for the next page."""
+    after = keyset_filter(sort_field, descending, cursor)
+    if query and after:
+        full_query = {"$and": [query, after]}
+    else:
+        full_query = query or after
+
+    direction = -1 if descending else 1
+    sort = [(sort_field, direction)]
+    if sort_field != "_id":
+        sort.append(("_id", direction))
+
+    # Fetch one extra document to know whether another page exists
+    docs = await collection.find(full_query).sort(sort).limit(limit + 1).to_list(limit + 1)
+
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        next_cursor = encode_cursor(sort_field, docs[-1])
+
+    return docs, next_cursor
+
+
+async def estimate_total(collection, query: dict) -> Tuple[int, bool]:
+    """Count matching documents cheaply. Returns the count and whether it is exact."""
+    if not query:
+        return await collection.estimated_document_count(), False
+
+    count = await collection.count_documents(query, limit=COUNT_LIMIT)
+    return count, count < COUNT_LIMIT
+
+
+def page_headers(next_cursor: Optional[str], total: int, exact: bool) -> dict:
+    """Pagination metadata travels in headers so list bodies stay unchanged."""
+    headers = {
+        "X-Total-Count": str(total),
+        "X-Total-Count-Exact": "true" if exact else "false"
+    }
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+    return headers
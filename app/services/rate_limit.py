@@ -0,0 +1,136 @@
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+from fastapi import HTTPException, Request
+from pymongo.errors import DuplicateKeyError
+
+from app.config import get_settings
+from app.database import get_database
+from app.services.metrics import Counter, registry
+
+settings = get_settings()
+
+RATE_LIMITED = registry.register(Counter(
+    "rate_limited_total", "Requests rejected by a rate limit.", ["policy", "scope"]
+))
+
+UNITS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+# Prune expired in-memory entries once the table grows past this
+MEMORY_PRUNE_SIZE = 10000
+
+
+def parse_rate(rate: str) -> Tuple[int, int]:
+    """Parse "20/minute" into (20, 60)."""
+    count, _, unit = rate.partition("/")
+    return int(count), UNITS[unit.strip().rstrip("s")]
+
+
+class MemoryBackend:
+    """Per-process GCRA state; exact within one worker."""
+
+    def __init__(self):
+        self.tats: Dict[str, float] = {}
+
+    async def hit(self, key: str, now: float, interval: float, period: float) -> Optional[float]:
+        """Spend one request. Returns None if allowed, else seconds until the next one is."""
+        tat = max(self.tats.get(key, now), now)
+        allow_at = tat + interval - period
+        if now < allow_at:
+            return allow_at - now
+
+        if len(self.tats) > MEMORY_PRUNE_SIZE:
+            self.tats = {k: v for k, v in self.tats.items() if v > now}
+        self.tats[key] = tat + interval
+        return None
+
+    def clear(self):
+        self.tats.clear()
+
+
+class MongoBackend:
+    """GCRA state in the ``rate_limits`` collection, shared by every worker.
+
+    Two round trips: clamp a stale TAT forward to now (creating the key if
+    missing), then spend one interval only if it fits in the burst window.
+    The second step is a single conditional update, so concurrent workers
+    can't both spend the last slot.
+    """
+
+    async def hit(self, key: str, now: float, interval: float, period: float) -> Optional[float]:
+        collection = get_database().rate_limits
+        expires_at = datetime.utcnow() + timedelta(seconds=period)
+
+        try:
+            await collection.update_one(
+                {"_id": key, "tat": {"$lt": now}},
+                {"$set": {"tat": now, "expires_at": expires_at}},
+                upsert=True
+            )
+        except DuplicateKeyError:
+            # The key exists with a TAT in the future; nothing to clamp
+            pass
+
+        spent = await collection.find_one_and_update(
+            {"_id": key, "tat": {"$lte": now + period - interval}},
+            {"$inc": {"tat": interval}, "$set": {"expires_at": expires_at}}
+        )
+        if spent:
+            return None
+
+        doc = await collection.find_one({"_id": key})
+        return max(0.0, doc["tat"] + interval - period - now) if doc else 0.0
+
+    def clear(self):
+        pass
+
+
+memory_backend = MemoryBackend()
+mongo_backend = MongoBackend()
+
+
+def get_backend():
+    return mongo_backend if settings.rate_limit_backend == "mongo" else memory_backend
+
+
+def client_ip(request: Request) -> str:
+    return request.client.host if request.client else "unknown"
+
+
+class RateLimit:
+    """FastAPI dependency enforcing a GCRA limit per signed-in user, or per client IP for anonymous requests."""
+
+    def __init__(self, policy: str, user_rate: str, ip_rate: Optional[str] = None):
+        self.policy = policy
+        self.user_limit = parse_rate(user_rate)
+        self.ip_limit = parse_rate(ip_rate) if ip_rate else None
+
+    async def check(self, scope: str, identity: str, limit: Tuple[int, int]):
+        count, period = limit
+        retry_after = await get_backend().hit(
+            f"{self.policy}:{scope}:{identity}", time.time(), period / count, period
+        )
+        if retry_after is not None:
+            RATE_LIMITED.inc(self.policy, scope)
+            raise HTTPException(
+                status_code=429,
+                detail="Too many requests",
+                headers={"Retry-After": str(max(1, int(retry_after + 0.999)))}
+            )
+
+    async def __call__(self, request: Request):
+        if not settings.rate_limit_enabled:
+            return
+
+        # The session cookie is already decoded; no database lookup needed
+        user_id = request.session.get("user_id")
+        if user_id:
+            await self.check("user", user_id, self.user_limit)
+        elif self.ip_limit:
+            # Only anonymous traffic is limited by IP: signed-in students often
+            # share one campus NAT or proxy address, and would share one budget
+            await self.check("ip", client_ip(request), self.ip_limit)
+
+
+api_rate_limit = RateLimit("api", settings.rate_limit_user, settings.rate_limit_ip)
+send_rate_limit = RateLimit("send", settings.rate_limit_send)
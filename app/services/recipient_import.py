@@ -0,0 +1,276 @@
+import codecs
+import csv
+import re
+from datetime import datetime
+from typing import AsyncIterator, List, Optional, Tuple
+from fastapi import HTTPException
+from pydantic import ValidationError
+from pymongo.errors import BulkWriteError
+
+from app.config import get_settings
+from app.models.recipient import RecipientCreate
+from app.services.recipients import refresh_default_recipients
+from app.services.versions import bump_versions
+
+settings = get_settings()
+
+CSV_TYPES = ("text/csv", "application/csv")
+VCARD_TYPES = ("text/vcard", "text/x-vcard", "text/directory")
+
+# Longest CSV record or unfolded vCard line kept in memory; longer input is reported and skipped
+MAX_LINE_LENGTH = 64 * 1024
+
+# CSV columns mapped onto RecipientCreate; anything else is ignored
+FIELDS = ("name", "email", "type", "is_default")
+
+# (row number, raw fields, error) - exactly one of fields and error is set
+Row = Tuple[int, Optional[dict], Optional[str]]
+
+
+async def _lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[Optional[str]]:
+    """Decode a byte stream into lines, yielding None in place of overlong ones."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    pending = ""
+    skipping = False
+
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            if skipping:
+                # The rest of a line already reported as too long
+                skipping = False
+                continue
+            yield line.rstrip("\r") if len(line) <= MAX_LINE_LENGTH else None
+
+        if len(pending) > MAX_LINE_LENGTH:
+            if not skipping:
+                yield None
+            skipping = True
+            pending = ""
+
+    pending += decoder.decode(b"", final=True)
+    if pending and not skipping:
+        yield pending.rstrip("\r") if len(pending) <= MAX_LINE_LENGTH else None
+
+
+async def csv_rows(chunks: AsyncIterator[bytes]) -> AsyncIterator[Row]:
+    """Parse a CSV upload with a header row, one record at a time.
+
+    Rows are numbered like a spreadsheet, with the header as row 1. Quoted
+    fields may span lines; a record is complete once its quotes balance.
+    """
+    header: Optional[List[str]] = None
+    record: List[str] = []
+    length = quotes = row = 0
+
+    async for line in _lines(chunks):
+        if line is None:
+            row += 1
+            record, length, quotes = [], 0, 0
+            yield row, None, "Row is too long"
+            continue
+
+        record.append(line)
+        length += len(line)
+        quotes += line.count('"')
+        if quotes % 2:
+            if length > MAX_LINE_LENGTH:
+                row += 1
+                record, length, quotes = [], 0, 0
+                yield row, None, "Row is too long"
+            continue
+
+        text = "\n".join(record)
+        record, length, quotes = [], 0, 0
+        row += 1
+        if not text.strip():
+            continue
+
+        fields = next(csv.reader([text]))
+        if header is None:
+            header = [name.strip().lower() for name in fields]
+            if "email" not in header:
+                raise HTTPException(status_code=400, detail="CSV header must include an email column")
+            continue
+        yield row, dict(zip(header, fields)), None
+
+    if record:
+        yield row + 1, None, "Unterminated quoted field"
+    if header is None:
+        raise HTTPException(status_code=400, detail="CSV file is empty")
+
+
+def _unescape(value: str) -> str:
+    return re.sub(r"\\(.)", lambda m: "\n" if m.group(1) in "nN" else m.group(1), value)
+
+
+async def _unfolded(lines: AsyncIterator[Optional[str]]) -> AsyncIterator[Optional[str]]:
+    """Join vCard continuation lines (leading space or tab) onto the line they continue."""
+    current: Optional[str] = None
+    async for line in lines:
+        if line and line[0] in " \t" and current is not None:
+            current += line[1:]
+            if len(current) > MAX_LINE_LENGTH:
+                yield None
+                current = ""
+            continue
+
+        if current is not None:
+            yield current
+        if line is None:
+            yield None
+        current = line
+
+    if current is not None:
+        yield current
+
+
+async def vcard_rows(chunks: AsyncIterator[bytes]) -> AsyncIterator[Row]:
+    """Parse a vCard upload, yielding one row per EMAIL property numbered by card."""
+    card = 0
+    in_card = broken = False
+    formatted_name = structured_name = None
+    emails: List[str] = []
+
+    async for line in _unfolded(_lines(chunks)):
+        if line is None:
+            broken = in_card
+            continue
+
+        key, _, value = line.partition(":")
+        # Drop parameters (EMAIL;TYPE=work) and group prefixes (item1.EMAIL)
+        prop = key.split(";")[0].split(".")[-1].strip().upper()
+        value = value.strip()
+
+        if prop == "BEGIN" and value.upper() == "VCARD":
+            card += 1
+            in_card, broken = True, False
+            formatted_name = structured_name = None
+            emails = []
+        elif not in_card:
+            continue
+        elif prop == "FN":
+            formatted_name = _unescape(value)
+        elif prop == "N":
+            parts = [_unescape(part).strip() for part in value.split(";")]
+            structured_name = " ".join(p for p in (parts[1:2] + parts[:1]) if p)
+        elif prop == "EMAIL":
+            emails.append(_unescape(value))
+        elif prop == "END" and value.upper() == "VCARD":
+            in_card = False
+            if broken:
+                yield card, None, "Card has a line that is too long"
+            elif not emails:
+                yield card, None, "email: Field required"
+            else:
+                for email in emails:
+                    yield card, {"name": formatted_name or structured_name or "", "email": email}, None
+
+    if in_card:
+        yield card, None, "Unterminated vCard"
+
+
+def _build(fields: dict, defaults: dict) -> Tuple[Optional[RecipientCreate], Optional[str]]:
+    """Validate one row with the same model as POST /api/recipients."""
+    data = {k: v.strip() for k, v in fields.items() if k in FIELDS and v and v.strip()}
+    try:
+        return RecipientCreate(**{**defaults, **data}), None
+    except ValidationError as e:
+        error = e.errors()[0]
+        return None, f"{error['loc'][0]}: {error['msg']}"
+
+
+async def import_recipients(db, user_id: str, rows: AsyncIterator[Row], defaults: dict) -> dict:
+    """Validate, deduplicate and insert parsed rows in ``bulk_chunk_size`` chunks.
+
+    Chunks are written one after another, and each is checked against the
+    user's stored recipients by ``email_lower`` first, so duplicates are
+    caught regardless of case and across chunks without holding every email
+    seen. Memory stays bounded by the chunk size and
+    ``recipient_import_error_limit`` however long the upload is.
+    """
+    report = {"inserted": 0, "duplicates": 0, "failed": 0, "errors": [], "errors_truncated": False}
+    chunk: List[Tuple[int, dict]] = []
+    refresh_defaults = False
+    created_at = datetime.utcnow()
+
+    def fail(row: int, email: Optional[str], error: str):
+        report["failed"] += 1
+        if len(report["errors"]) < settings.recipient_import_error_limit:
+            report["errors"].append({"row": row, "email": email, "error": error})
+        else:
+            report["errors_truncated"] = True
+
+    async def flush():
+        nonlocal refresh_defaults
+        existing = await db.recipients.find(
+            {"user_id": user_id, "email_lower": {"$in": list({doc["email_lower"] for _, doc in chunk})}},
+            {"email_lower": 1}
+        ).to_list(None)
+        taken = {r["email_lower"] for r in existing}
+
+        docs, doc_rows = [], []
+        for row, doc in chunk:
+            key = doc["email_lower"]
+            if key in taken:
+                report["duplicates"] += 1
+                continue
+            taken.add(key)
+            docs.append(doc)
+            doc_rows.append(row)
+        chunk.clear()
+        if not docs:
+            return
+
+        try:
+            result = await db.recipients.insert_many(docs, ordered=False)
+            inserted = len(result.inserted_ids)
+        except BulkWriteError as e:
+            inserted = e.details.get("nInserted", 0)
+            for error in e.details.get("writeErrors", []):
+                index = error["index"]
+                fail(doc_rows[index], docs[index]["email"], error.get("errmsg", "Write failed"))
+
+        report["inserted"] += inserted
+        if inserted and any(doc["is_default"] for doc in docs):
+            refresh_defaults = True
+
+    seen = 0
+    try:
+        async for row, fields, error in rows:
+            seen += 1
+            if seen > settings.recipient_import_max_rows:
+                fail(row, None, f"Import stopped after {settings.recipient_import_max_rows} rows")
+                break
+            if error:
+                fail(row, None, error)
+                continue
+
+            recipient, error = _build(fields, defaults)
+            if error:
+                fail(row, fields.get("email"), error)
+                continue
+
+            chunk.append((row, {
+                "user_id": user_id,
+                "name": recipient.name,
+                "email": recipient.email,
+                "email_lower": recipient.email.lower(),
+                "type": recipient.type.value,
+                "is_default": recipient.is_default,
+                "created_at": created_at
+            }))
+            if len(chunk) >= settings.bulk_chunk_size:
+                await flush()
+
+        if chunk:
+            await flush()
+    finally:
+        # Bump even if the upload broke off, so caches see the chunks already written
+        if report["inserted"]:
+            await bump_versions(db, user_id, "recipients")
+        if refresh_defaults:
+            await refresh_default_recipients(db, user_id)
+
+    return report
@@ -0,0 +1,92 @@
+from bson import ObjectId
+from pymongo import ReturnDocument, UpdateOne
+from typing import List
+
+from app.services.versions import bump_versions, bump_global_versions
+
+
+async def fetch_default_recipients(db, user_id: str) -> dict:
+    """Fetch default recipients in one query and split them by type."""
+    recipients = await db.recipients.find(
+        {"user_id": user_id, "is_default": True},
+        {"name": 1, "email": 1, "type": 1}
+    ).to_list(200)
+
+    return {
+        "to": [{"name": r["name"], "email": r["email"]} for r in recipients if r["type"] == "to"],
+        "cc": [{"name": r["name"], "email": r["email"]} for r in recipients if r["type"] == "cc"]
+    }
+
+
+async def refresh_default_recipients(db, user_id: str) -> dict:
+    """Rebuild the denormalized default recipients snapshot on the user document.
+
+    Each rebuild claims a sequence number before reading recipients and only
+    writes its snapshot if no later rebuild has started, so concurrent writes
+    can't leave an older read on the user.
+    """
+    user = await db.users.find_one_and_update(
+        {"_id": ObjectId(user_id)},
+        {"$inc": {"default_recipients_seq": 1}},
+        projection={"default_recipients_seq": 1},
+        return_document=ReturnDocument.AFTER
+    )
+    snapshot = await fetch_default_recipients(db, user_id)
+
+    if user:
+        result = await db.users.update_one(
+            {"_id": ObjectId(user_id), "default_recipients_seq": user["default_recipients_seq"]},
+            {"$set": {"default_recipients": snapshot}}
+        )
+        if result.modified_count:
+            await bump_versions(db, user_id, "user")
+    return snapshot
+
+
+async def push_default_recipient(db, user_ids: List[ObjectId], recipient_type: str, entry: dict):
+    """Append one default recipient to the existing snapshots of the given users.
+
+    Users without a snapshot are skipped; theirs is rebuilt on next use.
+    """
+    await db.users.update_many(
+        {"_id": {"$in": user_ids}, "default_recipients": {"$exists": True}},
+        {
+            "$push": {f"default_recipients.{recipient_type}": entry},
+            "$inc": {"default_recipients_seq": 1}
+        }
+    )
+    await bump_global_versions(db, "user")
+
+
+async def drop_default_snapshots(db, user_ids: List[ObjectId]):
+    """Remove the given users' snapshots so each is rebuilt from recipients on next use."""
+    await db.users.update_many(
+        {"_id": {"$in": user_ids}},
+        {"$unset": {"default_recipients": ""}, "$inc": {"default_recipients_seq": 1}}
+    )
+    await bump_global_versions(db, "user")
+
+
+async def get_default_recipients(db, user: dict) -> dict:
+    """Get default recipients from the user document, rebuilding if missing."""
+    snapshot = user.get("default_recipients")
+    if snapshot is None:
+        snapshot = await refresh_default_recipients(db, str(user["_id"]))
+    return snapshot
+
+
+async def backfill_email_lower(db, batch_size: int) -> int:
+    """Set email_lower on recipients written before it existed. Returns how many were updated."""
+    updated = 0
+    while True:
+        batch = await db.recipients.find(
+            {"email_lower": {"$exists": False}}, {"email": 1}
+        ).limit(batch_size).to_list(batch_size)
+        if not batch:
+            return updated
+
+        await db.recipients.bulk_write([
+            UpdateOne({"_id": r["_id"]}, {"$set": {"email_lower": r["email"].lower()}})
+            for r in batch
+        ], ordered=False)
+        updated += len(batch)
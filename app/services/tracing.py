@@ -0,0 +1,170 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Awaitable, List, Optional, TypeVar
+
+from app.config import get_settings
+from app.services.metrics import Histogram, registry
+
+settings = get_settings()
+
+T = TypeVar("T")
+
+STAGE_LATENCY = registry.register(Histogram(
+    "stage_duration_seconds", "Latency of traced pipeline stages.", ["span", "outcome"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+))
+
+
+class Span:
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], attributes: dict):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.error: Optional[str] = None
+        # Spans finished under this root, exported together when the root ends
+        self.finished: List["Span"] = []
+
+    def to_otlp(self) -> dict:
+        """The span in OTLP/JSON field layout, so any OpenTelemetry tooling can read it."""
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 1,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [
+                {"key": key, "value": {"stringValue": str(value)}}
+                for key, value in self.attributes.items()
+            ],
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 1}
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+_current_root: ContextVar[Optional[Span]] = ContextVar("current_root", default=None)
+_export_lock = threading.Lock()
+
+
+def _append(path: str, records: List[dict]):
+    """Append spans to the JSON-lines exporter file, one per line."""
+    lines = "".join(json.dumps(record) + "\n" for record in records)
+    with _export_lock:
+        with open(path, "a") as f:
+            f.write(lines)
+
+
+class SpanExporter:
+    """Queues finished traces and appends them to ``trace_export_path`` off the event loop.
+
+    A background task writes whatever has queued through asyncio.to_thread,
+    so file I/O never runs on the request path. When the exporter isn't
+    running (scripts, tests) traces are written directly. At most
+    ``trace_buffer_limit`` spans are queued; further traces are dropped.
+    """
+
+    def __init__(self):
+        self.buffer: List[dict] = []
+        self.dropped = 0
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        if self.running or not settings.trace_export_path:
+            return
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the writer loop and write out anything still queued."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def export(self, spans: List[Span]):
+        records = [s.to_otlp() for s in spans]
+        if not self.running:
+            _append(settings.trace_export_path, records)
+            return
+
+        if len(self.buffer) + len(records) > settings.trace_buffer_limit:
+            self.dropped += len(records)
+            return
+        self.buffer.extend(records)
+        self._wakeup.set()
+
+    async def flush(self):
+        if not self.buffer:
+            return
+        records, self.buffer = self.buffer, []
+        try:
+            await asyncio.to_thread(_append, settings.trace_export_path, records)
+        except Exception as e:
+            print(f"Failed to export {len(records)} spans: {e}")
+
+    async def _run(self):
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            await self.flush()
+
+
+span_exporter = SpanExporter()
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """Time a stage into ``stage_duration_seconds`` and, if an exporter path is set, record it as a span.
+
+    Nesting follows the async context, so spans opened inside tasks started
+    by asyncio.gather attach to the span that was current when they started.
+    """
+    parent = _current_span.get()
+    root = _current_root.get()
+    current = Span(name, parent.trace_id if parent else os.urandom(16).hex(), parent.span_id if parent else None, attributes)
+
+    span_token = _current_span.set(current)
+    root_token = _current_root.set(root or current)
+    start = time.perf_counter()
+    try:
+        yield current
+    except BaseException as e:
+        current.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        STAGE_LATENCY.observe(time.perf_counter() - start, name, "error" if current.error else "ok")
+        current.end_ns = time.time_ns()
+        _current_span.reset(span_token)
+        _current_root.reset(root_token)
+
+        if settings.trace_export_path:
+            (root or current).finished.append(current)
+            if root is None:
+                span_exporter.export(current.finished)
+
+
+async def traced(name: str, awaitable: Awaitable[T], **attributes) -> T:
+    """Await something inside a span; handy for the arms of asyncio.gather."""
+    with span(name, **attributes):
+        return await awaitable
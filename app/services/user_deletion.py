@@ -0,0 +1,116 @@
+import asyncio
+from bson import ObjectId
+from datetime import datetime, timedelta
+
+from app.config import get_settings
+from app.services.versions import bump_versions
+
+settings = get_settings()
+
+# Collections holding per-user data, keyed by the string user_id
+DEPENDENT_COLLECTIONS = ["templates", "recipients", "email_logs"]
+
+
+async def start_user_deletion(db, user_id: str, admin_id: str):
+    """Tombstone the user and record a deletion job. Returns the job, or None if no such user."""
+    user = await db.users.find_one_and_update(
+        {"_id": ObjectId(user_id), "deleted_at": {"$exists": False}},
+        {"$set": {"deleted_at": datetime.utcnow()}}
+    )
+    if not user:
+        return None
+
+    await bump_versions(db, user_id, "user", "templates", "recipients")
+
+    now = datetime.utcnow()
+    job = {
+        "user_id": user_id,
+        "requested_by": admin_id,
+        "status": "running",
+        "progress": {name: 0 for name in DEPENDENT_COLLECTIONS},
+        "attempts": 0,
+        "error": None,
+        "created_at": now,
+        "updated_at": now,
+        "finished_at": None
+    }
+    result = await db.deletion_jobs.insert_one(job)
+    job["_id"] = result.inserted_id
+    return job
+
+
+def is_retryable(job: dict) -> bool:
+    """A job can be retried if it failed, or if it stopped heartbeating (e.g. the worker restarted)."""
+    if job["status"] == "failed":
+        return True
+    if job["status"] == "running":
+        stale_after = timedelta(seconds=settings.deletion_stale_after_seconds)
+        return job["updated_at"] < datetime.utcnow() - stale_after
+    return False
+
+
+async def claim_retry(db, job: dict) -> bool:
+    """Mark a retryable job as running again; False if another request claimed it first."""
+    result = await db.deletion_jobs.update_one(
+        {"_id": job["_id"], "status": job["status"], "updated_at": job["updated_at"]},
+        {"$set": {"status": "running", "error": None, "updated_at": datetime.utcnow()}}
+    )
+    return result.modified_count == 1
+
+
+async def resume_stale_deletions(db) -> int:
+    """Re-run deletion jobs whose worker stopped heartbeating. Returns how many were resumed."""
+    stale_after = timedelta(seconds=settings.deletion_stale_after_seconds)
+    jobs = await db.deletion_jobs.find({
+        "status": "running",
+        "updated_at": {"$lt": datetime.utcnow() - stale_after}
+    }).to_list(100)
+
+    resumed = 0
+    for job in jobs:
+        if await claim_retry(db, job):
+            await run_user_deletion(db, job["_id"], job["user_id"])
+            resumed += 1
+    return resumed
+
+
+async def _delete_in_batches(db, job_id: ObjectId, collection: str, user_id: str, batch_size: int):
+    """Delete a user's documents from one collection in fixed-size batches."""
+    coll = db[collection]
+    while True:
+        batch = await coll.find({"user_id": user_id}, {"_id": 1}).limit(batch_size).to_list(batch_size)
+        if not batch:
+            return
+
+        result = await coll.delete_many({"_id": {"$in": [d["_id"] for d in batch]}})
+        await db.deletion_jobs.update_one(
+            {"_id": job_id},
+            {
+                "$inc": {f"progress.{collection}": result.deleted_count},
+                "$set": {"updated_at": datetime.utcnow()}
+            }
+        )
+
+
+async def run_user_deletion(db, job_id: ObjectId, user_id: str):
+    """Delete all of a tombstoned user's data, then the user itself.
+
+    Every step is idempotent, so a failed or interrupted job can simply be run again.
+    """
+    batch_size = settings.deletion_batch_size
+    await db.deletion_jobs.update_one({"_id": job_id}, {"$inc": {"attempts": 1}})
+
+    try:
+        await asyncio.gather(*[
+            _delete_in_batches(db, job_id, name, user_id, batch_size)
+            for name in DEPENDENT_COLLECTIONS
+        ])
+        await db.users.delete_one({"_id": ObjectId(user_id)})
+        await bump_versions(db, user_id, "user", "templates", "recipients")
+        update = {"status": "completed"}
+    except Exception as e:
+        update = {"status": "failed", "error": str(e)}
+
+    now = datetime.utcnow()
+    update.update({"finished_at": now, "updated_at": now})
+    await db.deletion_jobs.update_one({"_id": job_id}, {"$set": update})
@@ -0,0 +1,119 @@
+import asyncio
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from pymongo import ReturnDocument
+
+from app.config import get_settings
+from app.database import get_database
+
+settings = get_settings()
+
+# Document bumped by writes that touch many users at once (bulk creates)
+GLOBAL_ID = "_global"
+
+# Re-read this much history on each poll to tolerate clock skew between nodes
+POLL_OVERLAP = timedelta(seconds=2)
+
+
+async def bump_versions(db, user_id: str, *scopes: str):
+    """Record that a user's data changed so every worker's caches drop it."""
+    update = {
+        "$inc": {scope: 1 for scope in scopes},
+        "$set": {"updated_at": datetime.utcnow()}
+    }
+    result = await db.versions.find_one_and_update(
+        {"_id": user_id}, update, upsert=True, return_document=ReturnDocument.AFTER
+    )
+    version_tracker.observe(result)
+
+
+async def bump_global_versions(db, *scopes: str):
+    """Invalidate a scope for every user at once."""
+    await bump_versions(db, GLOBAL_ID, *scopes)
+
+
+class VersionTracker:
+    """Per-process view of the ``versions`` collection.
+
+    A background loop polls documents changed since the last poll, so
+    version checks are in-memory. Writes made by this worker are applied
+    immediately; writes from other workers are seen within
+    ``version_poll_interval`` seconds.
+    """
+
+    def __init__(self):
+        self.versions: Dict[str, dict] = {}
+        self._last_seen: Optional[datetime] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def observe(self, doc: Optional[dict]):
+        """Record a versions document unless we already hold a newer one."""
+        if not doc:
+            return
+        current = self.versions.get(doc["_id"])
+        if current and current.get("updated_at") and doc.get("updated_at") and current["updated_at"] > doc["updated_at"]:
+            return
+        self.versions[doc["_id"]] = doc
+
+    async def get(self, user_id: str, scope: str) -> tuple:
+        """Current (user, global) version of a scope, loading unseen users on demand."""
+        if not self.running:
+            # No poller: read straight from Mongo so results are never stale
+            docs = await get_database().versions.find(
+                {"_id": {"$in": [user_id, GLOBAL_ID]}}
+            ).to_list(2)
+            for doc in docs:
+                self.observe(doc)
+        else:
+            for doc_id in (user_id, GLOBAL_ID):
+                if doc_id not in self.versions:
+                    doc = await get_database().versions.find_one({"_id": doc_id})
+                    self.versions[doc_id] = doc or {"_id": doc_id}
+
+        return (
+            self.versions.get(user_id, {}).get(scope, 0),
+            self.versions.get(GLOBAL_ID, {}).get(scope, 0)
+        )
+
+    async def poll(self):
+        query = {}
+        if self._last_seen:
+            query["updated_at"] = {"$gt": self._last_seen - POLL_OVERLAP}
+
+        docs: List[dict] = await get_database().versions.find(query).to_list(None)
+        for doc in docs:
+            self.observe(doc)
+            if self._last_seen is None or doc["updated_at"] > self._last_seen:
+                self._last_seen = doc["updated_at"]
+
+    def start(self):
+        if not self.running:
+            # Users are loaded on first use; the poller only needs later changes
+            self._last_seen = datetime.utcnow()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.versions.clear()
+        self._last_seen = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self.poll()
+            except Exception as e:
+                print(f"Failed to poll cache versions: {e}")
+            await asyncio.sleep(settings.version_poll_interval)
+
+
+version_tracker = VersionTracker()
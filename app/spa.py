@@ -0,0 +1,133 @@
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+from typing import Dict, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import Response
+
+try:
+    import brotli
+except ImportError:  # optional: pre-built .br files are still served without it
+    brotli = None
+
+# Vite names built assets like index-3f2a9c1b.js; those never change in place
+HASHED_ASSET = re.compile(r"[-.][A-Za-z0-9_-]{8,}\.\w+$")
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+
+# Compressing tiny files costs more than it saves
+MIN_COMPRESS_SIZE = 1024
+
+
+class StaticAsset:
+    """A file held in memory with its compressed variants and validators."""
+
+    def __init__(self, content: bytes, media_type: str, cache_control: str):
+        self.media_type = media_type
+        self.cache_control = cache_control
+        self.etag = '"' + hashlib.sha1(content).hexdigest() + '"'
+        self.variants: Dict[str, bytes] = {"identity": content}
+
+    def add_variant(self, encoding: str, content: bytes):
+        # Only keep variants that actually save bytes
+        if len(content) < len(self.variants["identity"]):
+            self.variants[encoding] = content
+
+    def response(self, request: Request) -> Response:
+        headers = {
+            "ETag": self.etag,
+            "Cache-Control": self.cache_control,
+            "Vary": "Accept-Encoding"
+        }
+        if request.headers.get("if-none-match") == self.etag:
+            return Response(status_code=304, headers=headers)
+
+        encoding = choose_encoding(request.headers.get("accept-encoding", ""), self.variants)
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return Response(self.variants[encoding], media_type=self.media_type, headers=headers)
+
+
+def choose_encoding(accept_encoding: str, variants: Dict[str, bytes]) -> str:
+    """Pick the best available encoding the client accepts (br, then gzip)."""
+    accepted = set()
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        if params.strip().replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        accepted.add(name.strip().lower())
+
+    for encoding in ("br", "gzip"):
+        if encoding in variants and (encoding in accepted or "*" in accepted):
+            return encoding
+    return "identity"
+
+
+def load_asset(path: str, cache_control: str) -> StaticAsset:
+    """Read a file once, using sibling .br/.gz files from the build when present."""
+    with open(path, "rb") as f:
+        content = f.read()
+
+    media_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+    if media_type.startswith("text/") or media_type in ("application/javascript", "image/svg+xml"):
+        media_type += "; charset=utf-8"
+    asset = StaticAsset(content, media_type, cache_control)
+
+    if len(content) < MIN_COMPRESS_SIZE:
+        return asset
+
+    for encoding, suffix, compress in (
+        ("br", ".br", brotli.compress if brotli else None),
+        ("gzip", ".gz", lambda data: gzip.compress(data, compresslevel=9, mtime=0)),
+    ):
+        if os.path.exists(path + suffix):
+            with open(path + suffix, "rb") as f:
+                asset.add_variant(encoding, f.read())
+        elif compress:
+            asset.add_variant(encoding, compress(content))
+
+    return asset
+
+
+def load_assets(assets_dir: str) -> Dict[str, StaticAsset]:
+    """Load every built asset into memory, keyed by its path under /assets."""
+    assets = {}
+    for root, _, files in os.walk(assets_dir):
+        for name in files:
+            if name.endswith((".br", ".gz")):
+                continue
+            path = os.path.join(root, name)
+            key = os.path.relpath(path, assets_dir).replace(os.sep, "/")
+            cache_control = IMMUTABLE if HASHED_ASSET.search(name) else REVALIDATE
+            assets[key] = load_asset(path, cache_control)
+    return assets
+
+
+def mount_spa(app: FastAPI, build_dir: str):
+    """Serve a built React app from memory: hashed assets plus an index.html fallback."""
+    assets = load_assets(os.path.join(build_dir, "assets"))
+
+    index_path = os.path.join(build_dir, "index.html")
+    index: Optional[StaticAsset] = load_asset(index_path, REVALIDATE) if os.path.exists(index_path) else None
+
+    @app.get("/assets/{asset_path:path}", include_in_schema=False)
+    async def serve_asset(request: Request, asset_path: str):
+        asset = assets.get(asset_path)
+        if not asset:
+            return Response(status_code=404)
+        return asset.response(request)
+
+    # Serve index.html for all other routes (SPA fallback)
+    @app.get("/{full_path:path}", include_in_schema=False)
+    async def serve_spa(request: Request, full_path: str):
+        # Don't intercept API or auth routes
+        if full_path.startswith("api/") or full_path.startswith("auth/"):
+            return {"detail": "Not found"}
+
+        if index:
+            return index.response(request)
+        return {"detail": "Frontend not built. Run 'npm run build' in frontend directory."}
@@ -0,0 +1,80 @@
+"""Bytes on the wire and compression CPU cost per level for a large admin template listing.
+
+Builds the /api/admin/templates body in-process against mongomock, then
+times each encoding/level the compression middleware can be configured with.
+
+    python -m benchmarks.bench_compression --templates 1000 --rounds 20
+"""
+import argparse
+import asyncio
+import os
+import time
+from datetime import datetime
+from unittest.mock import AsyncMock, patch
+
+os.environ.setdefault("GOOGLE_CLIENT_ID", "bench-client-id")
+os.environ.setdefault("GOOGLE_CLIENT_SECRET", "bench-client-secret")
+os.environ.setdefault("SECRET_KEY", "bench-secret-key")
+
+from bson import ObjectId
+from fastapi.testclient import TestClient
+from mongomock_motor import AsyncMongoMockClient
+
+from app.auth.dependencies import get_admin_user, get_current_user
+from app.database import db
+from app.main import app
+from app.middleware.compression import available_encodings, compress
+
+USER = {"_id": ObjectId(), "email": "bench@test.com", "name": "Bench", "is_admin": True}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--templates", type=int, default=1000)
+    parser.add_argument("--body-size", type=int, default=500, help="characters per template body")
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    mock_client = AsyncMongoMockClient()
+    database = mock_client["email_trigger_bench"]
+    db.client = mock_client
+
+    asyncio.run(database.templates.insert_many([
+        {
+            "user_id": str(ObjectId()),
+            "name": f"Template {i}",
+            "category": "announcement",
+            "subject": "Notice {{date}}",
+            "body": f"Dear {{{{name}}}}, update #{i}: " + "lorem ipsum dolor sit amet " * (args.body_size // 27),
+            "variables": ["date", "name"],
+            "is_default": False,
+            "created_at": datetime.utcnow()
+        }
+        for i in range(args.templates)
+    ]))
+
+    async def current_user():
+        return USER
+
+    app.dependency_overrides[get_current_user] = current_user
+    app.dependency_overrides[get_admin_user] = current_user
+
+    with patch("app.main.connect_to_mongo", new_callable=AsyncMock), \
+            patch("app.routes.admin.get_database", return_value=database):
+        with TestClient(app) as client:
+            response = client.get("/api/admin/templates", headers={"Accept-Encoding": "identity"})
+            body = response.content
+
+    print(f"/api/admin/templates: {args.templates} templates, {len(body)} bytes uncompressed")
+    for encoding in available_encodings(["gzip", "br"]):
+        for level in (1, 4, 6, 9):
+            start = time.perf_counter()
+            for _ in range(args.rounds):
+                compressed = compress(encoding, body, level)
+            ms = (time.perf_counter() - start) / args.rounds * 1000
+            print(f"{encoding:5} level {level}: {len(compressed):9} bytes "
+                  f"({len(compressed) / len(body):6.1%})  {ms:7.2f} ms/response")
+
+
+if __name__ == "__main__":
+    main()
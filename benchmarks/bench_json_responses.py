@@ -0,0 +1,114 @@
+"""Requests/second for template listings: validated JSONResponse vs precomputed ORJSONResponse.
+
+Both sides are minimal FastAPI apps with the same routes, queries and no
+middleware; they differ only in the response class and whether each item is
+built as a validated pydantic model. Runs against mongomock, so numbers
+measure serialization and framework overhead rather than Mongo latency.
+
+    python -m benchmarks.bench_json_responses --templates 200 --requests 300
+"""
+import argparse
+import asyncio
+import os
+import time
+from datetime import datetime
+from typing import List
+
+os.environ.setdefault("GOOGLE_CLIENT_ID", "bench-client-id")
+os.environ.setdefault("GOOGLE_CLIENT_SECRET", "bench-client-secret")
+os.environ.setdefault("SECRET_KEY", "bench-secret-key")
+
+from bson import ObjectId
+from fastapi import Depends, FastAPI
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.testclient import TestClient
+from mongomock_motor import AsyncMongoMockClient
+
+from app.models.template import TemplateResponse, serialize_template
+
+USER = {"_id": ObjectId(), "email": "bench@test.com", "name": "Bench", "is_admin": True}
+
+
+def listing_app(database, optimized: bool) -> FastAPI:
+    """The template listings, either as before (validated models) or as now (orjson, no validation)."""
+    listing = FastAPI(default_response_class=ORJSONResponse if optimized else JSONResponse)
+
+    async def user():
+        return USER
+
+    def to_models(templates) -> List[TemplateResponse]:
+        return [
+            TemplateResponse(
+                id=str(t["_id"]),
+                name=t["name"],
+                category=t["category"],
+                subject=t["subject"],
+                body=t["body"],
+                variables=t.get("variables", []),
+                is_default=t.get("is_default", False),
+                created_at=t["created_at"]
+            )
+            for t in templates
+        ]
+
+    def respond(templates):
+        if optimized:
+            return ORJSONResponse([serialize_template(t) for t in templates])
+        return to_models(templates)
+
+    @listing.get("/api/templates", response_model=List[TemplateResponse])
+    async def get_templates(u=Depends(user)):
+        return respond(await database.templates.find({"user_id": str(u["_id"])}).to_list(100))
+
+    @listing.get("/api/admin/templates", response_model=List[TemplateResponse])
+    async def get_all_templates(u=Depends(user)):
+        return respond(await database.templates.find().to_list(1000))
+
+    return listing
+
+
+def measure(client: TestClient, path: str, requests: int) -> float:
+    client.get(path)  # warm up
+    start = time.perf_counter()
+    for _ in range(requests):
+        response = client.get(path)
+        assert response.status_code == 200
+    return requests / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--templates", type=int, default=100, help="templates per listing")
+    parser.add_argument("--body-size", type=int, default=2000, help="characters per template body")
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    mock_client = AsyncMongoMockClient()
+    database = mock_client["email_trigger_bench"]
+
+    asyncio.run(database.templates.insert_many([
+        {
+            "user_id": str(USER["_id"]),
+            "name": f"Template {i}",
+            "category": "announcement",
+            "subject": "Notice {{date}}",
+            "body": "Dear {{name}}, " + "x" * args.body_size,
+            "variables": ["date", "name"],
+            "is_default": False,
+            "created_at": datetime.utcnow()
+        }
+        for i in range(args.templates)
+    ]))
+
+    with TestClient(listing_app(database, optimized=False)) as before, \
+            TestClient(listing_app(database, optimized=True)) as after:
+        print(f"{args.templates} templates x {args.body_size} chars, {args.requests} requests each")
+        for path in ("/api/templates", "/api/admin/templates"):
+            before_rps = measure(before, path, args.requests)
+            after_rps = measure(after, path, args.requests)
+            print(f"{path:24} before {before_rps:8.1f} req/s  after {after_rps:8.1f} req/s  "
+                  f"({after_rps / before_rps:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""Emails/second one worker can push through /api/email/send-template.
+
+Runs the app in-process (ASGI, one event loop, i.e. one worker) against
+benchmarks.fake_google in a subprocess, with mongomock by default or a real
+mongod via --mongodb-url. Drives send-template at increasing concurrency and
+reports throughput and latency percentiles. Rate limiting is turned off;
+503s from the send limiter and any 429s are counted apart from Gmail failures.
+
+    python -m benchmarks.bench_send_throughput --concurrency 1 8 32 --requests 200 --latency 0.05
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime
+from statistics import quantiles
+from unittest.mock import AsyncMock, patch
+
+os.environ.setdefault("GOOGLE_CLIENT_ID", "bench-client-id")
+os.environ.setdefault("GOOGLE_CLIENT_SECRET", "bench-client-secret")
+os.environ.setdefault("SECRET_KEY", "bench-secret-key")
+# Every request comes from one client; rate limiting would turn load into 429s
+os.environ["RATE_LIMIT_ENABLED"] = "false"
+
+import httpx
+from bson import ObjectId
+from mongomock_motor import AsyncMongoMockClient
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.auth.dependencies import get_current_user
+from app.config import get_settings
+from app.database import db
+from app.main import app
+
+settings = get_settings()
+
+USER_ID = ObjectId()
+
+
+async def seed(database) -> dict:
+    user = {
+        "_id": USER_ID,
+        "email": "bench@test.com",
+        "name": "Bench User",
+        "google_id": "bench-google-id",
+        "access_token": "bench-access-token",
+        "refresh_token": "bench-refresh-token",
+        "token_expiry": None,
+        "is_admin": False,
+        "created_at": datetime.utcnow()
+    }
+    await database.users.delete_many({"_id": USER_ID})
+    await database.users.insert_one(user)
+    template = await database.templates.insert_one({
+        "user_id": str(USER_ID),
+        "name": "Leave Application",
+        "category": "leave",
+        "subject": "Leave Application - {{date}}",
+        "body": "Dear Sir/Madam,\n\nI, {{name}}, request leave from {{from_date}} to {{to_date}}.\n\n"
+                "Reason: {{reason}}\n\nRegards,\n{{name}}",
+        "variables": ["name", "date", "from_date", "to_date", "reason"],
+        "is_default": True,
+        "created_at": datetime.utcnow()
+    })
+    await database.recipients.insert_many([
+        {"user_id": str(USER_ID), "name": "Warden", "email": "warden@test.com", "type": "to",
+         "is_default": True, "created_at": datetime.utcnow()},
+        {"user_id": str(USER_ID), "name": "Parent", "email": "parent@test.com", "type": "cc",
+         "is_default": True, "created_at": datetime.utcnow()},
+    ])
+    return {"user": user, "template_id": str(template.inserted_id)}
+
+
+def start_fake_google(args) -> subprocess.Popen:
+    process = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.fake_google", "--port", str(args.port),
+         "--latency", str(args.latency), "--jitter", str(args.jitter), "--error-rate", str(args.error_rate)],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    )
+    deadline = time.perf_counter() + 15
+    while time.perf_counter() < deadline:
+        try:
+            httpx.post(f"http://127.0.0.1:{args.port}/token")
+            return process
+        except httpx.TransportError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError("Fake Google server did not start")
+
+
+async def run_level(client: httpx.AsyncClient, template_id: str, concurrency: int, requests: int) -> dict:
+    latencies = []
+    failures = rate_limited = shed = 0
+    remaining = requests
+
+    async def worker():
+        nonlocal remaining, failures, rate_limited, shed
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            response = await client.post("/api/email/send-template", json={
+                "template_id": template_id,
+                "variables": {"from_date": "2024-01-15", "to_date": "2024-01-17", "reason": "Family function"}
+            })
+            latencies.append(time.perf_counter() - start)
+            if response.status_code == 429:
+                rate_limited += 1
+            elif response.status_code == 503:
+                shed += 1
+            elif response.status_code != 200:
+                failures += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - start
+
+    cuts = quantiles(latencies, n=100)
+    return {
+        # Only delivered emails count; rejected requests return quickly and would inflate this
+        "throughput": (len(latencies) - failures - rate_limited - shed) / elapsed,
+        "p50": cuts[49] * 1000,
+        "p95": cuts[94] * 1000,
+        "p99": cuts[98] * 1000,
+        "failures": failures,
+        "rate_limited": rate_limited,
+        "shed": shed
+    }
+
+
+async def bench(args):
+    if args.mongodb_url:
+        mongo_client = AsyncIOMotorClient(args.mongodb_url)
+    else:
+        mongo_client = AsyncMongoMockClient()
+    db.client = mongo_client
+    database = mongo_client[settings.database_name]
+    fixtures = await seed(database)
+
+    async def current_user():
+        return fixtures["user"]
+
+    app.dependency_overrides[get_current_user] = current_user
+    fake = f"http://127.0.0.1:{args.port}"
+
+    with patch("app.main.connect_to_mongo", new_callable=AsyncMock), \
+            patch("app.main.close_mongo_connection", new_callable=AsyncMock), \
+            patch("app.services.gmail.GMAIL_SEND_URI", f"{fake}/gmail/v1/users/me/messages/send"), \
+            patch("app.auth.google_oauth.TOKEN_URI", f"{fake}/token"):
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                # Warm up caches and the outbound connection pool
+                await run_level(client, fixtures["template_id"], 1, 5)
+
+                print(f"Fake Gmail latency {args.latency * 1000:.0f}ms +/- {args.jitter * 1000:.0f}ms, "
+                      f"error rate {args.error_rate:.1%}, {'mongod' if args.mongodb_url else 'mongomock'}")
+                print(f"{'concurrency':>11} {'emails/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+                      f"{'failed':>7} {'429':>5} {'503':>5}")
+                for concurrency in args.concurrency:
+                    result = await run_level(client, fixtures["template_id"], concurrency, args.requests)
+                    print(f"{concurrency:>11} {result['throughput']:>9.1f} {result['p50']:>8.1f} "
+                          f"{result['p95']:>8.1f} {result['p99']:>8.1f} {result['failures']:>7} "
+                          f"{result['rate_limited']:>5} {result['shed']:>5}")
+
+    await database.users.delete_many({"_id": USER_ID})
+    await database.templates.delete_many({"user_id": str(USER_ID)})
+    await database.recipients.delete_many({"user_id": str(USER_ID)})
+    await database.email_logs.delete_many({"user_id": str(USER_ID)})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--requests", type=int, default=200, help="sends per concurrency level")
+    parser.add_argument("--latency", type=float, default=0.05, help="fake Gmail mean latency, seconds")
+    parser.add_argument("--jitter", type=float, default=0.01)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--port", type=int, default=8790)
+    parser.add_argument("--mongodb-url", default=None, help="use a real mongod instead of mongomock")
+    args = parser.parse_args()
+
+    fake_google = start_fake_google(args)
+    try:
+        asyncio.run(bench(args))
+    finally:
+        fake_google.terminate()
+        fake_google.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Cold-start import cost of the app, from ``python -X importtime``.
+
+Each run imports app.main in a fresh interpreter, so numbers include every
+module the app pulls in at startup.
+
+    python -m benchmarks.bench_startup --runs 5 --top 15
+"""
+import argparse
+import os
+import subprocess
+import sys
+from statistics import median
+from typing import Dict, List, Tuple
+
+ENV = {
+    "GOOGLE_CLIENT_ID": "bench-client-id",
+    "GOOGLE_CLIENT_SECRET": "bench-client-secret",
+    "SECRET_KEY": "bench-secret-key",
+}
+
+# Google client packages; the app talks to Google over httpx, so none of these should load
+LAZY_PACKAGES = ("google", "googleapiclient", "google_auth_oauthlib", "google_auth_httplib2", "httplib2")
+
+
+def import_times(module: str = "app.main") -> Dict[str, Tuple[int, int]]:
+    """Import a module in a fresh interpreter; map each loaded module to (self, cumulative) microseconds."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        env={**os.environ, **ENV},
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        capture_output=True,
+        text=True,
+        check=True
+    )
+
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def eager_lazy_modules(times: Dict[str, Tuple[int, int]]) -> List[str]:
+    """Modules from LAZY_PACKAGES that were imported at startup."""
+    return sorted(name for name in times if name.split(".")[0] in LAZY_PACKAGES)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="slowest top-level imports to list")
+    args = parser.parse_args()
+
+    runs = [import_times() for _ in range(args.runs)]
+    totals = [run["app.main"][1] / 1000 for run in runs]
+    print(f"import app.main: median {median(totals):.1f} ms over {args.runs} runs "
+          f"(min {min(totals):.1f}, max {max(totals):.1f})")
+
+    eager = eager_lazy_modules(runs[-1])
+    print(f"Google client modules loaded at startup: {len(eager)}")
+
+    print("\nSlowest imports (cumulative, last run):")
+    slowest = sorted(runs[-1].items(), key=lambda item: item[1][1], reverse=True)[1:args.top + 1]
+    for name, (_, cumulative_us) in slowest:
+        print(f"  {cumulative_us / 1000:8.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
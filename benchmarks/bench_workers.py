@@ -0,0 +1,106 @@
+"""Throughput of ``python -m app.server`` as the number of worker processes grows.
+
+Starts the real server once per worker count and drives it from several
+load-generator processes, so the client side isn't the bottleneck. Needs a
+reachable MongoDB (e.g. ``docker compose up mongodb``) for app startup.
+
+    python -m benchmarks.bench_workers --workers 1 2 4 --duration 10
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+
+ENV = {
+    "GOOGLE_CLIENT_ID": "bench-client-id",
+    "GOOGLE_CLIENT_SECRET": "bench-client-secret",
+    "SECRET_KEY": "bench-secret-key",
+}
+
+
+async def _drive(url: str, duration: float, concurrency: int) -> int:
+    completed = 0
+    deadline = time.perf_counter() + duration
+
+    async with httpx.AsyncClient(limits=httpx.Limits(max_connections=concurrency)) as client:
+        async def loop():
+            nonlocal completed
+            while time.perf_counter() < deadline:
+                response = await client.get(url)
+                response.raise_for_status()
+                completed += 1
+
+        await asyncio.gather(*[loop() for _ in range(concurrency)])
+    return completed
+
+
+def load_generator(url: str, duration: float, concurrency: int) -> int:
+    return asyncio.run(_drive(url, duration, concurrency))
+
+
+def wait_until_ready(url: str, timeout: float = 30.0):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            if httpx.get(url).status_code < 500:
+                return
+        except httpx.TransportError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Server at {url} did not start within {timeout}s")
+
+
+def measure(workers: int, args) -> float:
+    env = {**os.environ, **ENV, "WORKERS": str(workers), "PORT": str(args.port)}
+    env.setdefault("MONGODB_URL", args.mongodb_url)
+    server = subprocess.Popen(
+        [sys.executable, "-m", "app.server"],
+        env=env,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+    url = f"http://127.0.0.1:{args.port}{args.path}"
+    try:
+        wait_until_ready(url)
+        with multiprocessing.Pool(args.clients) as pool:
+            start = time.perf_counter()
+            counts = pool.starmap(
+                load_generator,
+                [(url, args.duration, args.concurrency)] * args.clients
+            )
+            elapsed = time.perf_counter() - start
+        return sum(counts) / elapsed
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--path", default="/api/me")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--clients", type=int, default=os.cpu_count(), help="load generator processes")
+    parser.add_argument("--concurrency", type=int, default=16, help="connections per load generator")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--mongodb-url", default="mongodb://localhost:27017")
+    args = parser.parse_args()
+
+    print(f"GET {args.path}, {args.clients} load generators x {args.concurrency} connections, "
+          f"{args.duration:.0f}s per run ({os.cpu_count()} CPUs)")
+    baseline = None
+    for workers in args.workers:
+        rps = measure(workers, args)
+        baseline = baseline or rps / workers
+        print(f"{workers:3} workers: {rps:9.1f} req/s  ({rps / baseline:.2f}x one worker's rate, "
+              f"{rps / (baseline * workers):.0%} scaling efficiency)")
+
+
+if __name__ == "__main__":
+    main()
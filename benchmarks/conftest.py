@@ -0,0 +1,6 @@
+import os
+
+# Settings are read at import time; benchmarks never talk to Google or Mongo
+os.environ.setdefault("GOOGLE_CLIENT_ID", "bench-client-id")
+os.environ.setdefault("GOOGLE_CLIENT_SECRET", "bench-client-secret")
+os.environ.setdefault("SECRET_KEY", "bench-secret-key")
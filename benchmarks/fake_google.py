@@ -0,0 +1,57 @@
+"""A local stand-in for Google's OAuth token and Gmail send endpoints.
+
+Sends sleep for a configurable latency and fail at a configurable rate, so
+benchmarks can exercise the send path without touching Google.
+
+    python -m benchmarks.fake_google --port 8790 --latency 0.05 --error-rate 0.01
+"""
+import argparse
+import asyncio
+import random
+import uuid
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+
+def create_app(latency: float, jitter: float, error_rate: float) -> Starlette:
+    async def token(request: Request):
+        await asyncio.sleep(latency)
+        return JSONResponse({"access_token": f"fake-{uuid.uuid4().hex}", "expires_in": 3600, "token_type": "Bearer"})
+
+    async def send(request: Request):
+        await request.body()
+        await asyncio.sleep(max(0.0, random.gauss(latency, jitter)))
+        if random.random() < error_rate:
+            return JSONResponse({"error": {"code": 500, "message": "Backend Error"}}, status_code=500)
+        return JSONResponse({"id": uuid.uuid4().hex[:16], "threadId": uuid.uuid4().hex[:16], "labelIds": ["SENT"]})
+
+    return Starlette(routes=[
+        Route("/token", token, methods=["POST"]),
+        Route("/gmail/v1/users/me/messages/send", send, methods=["POST"]),
+    ])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8790)
+    parser.add_argument("--latency", type=float, default=0.05, help="mean seconds per call")
+    parser.add_argument("--jitter", type=float, default=0.01, help="standard deviation of the latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of sends that return 500")
+    args = parser.parse_args()
+
+    uvicorn.run(
+        create_app(args.latency, args.jitter, args.error_rate),
+        host=args.host,
+        port=args.port,
+        log_level="warning",
+        access_log=False
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Micro-benchmarks for the per-send CPU hot paths, with regression ceilings.
+
+Not part of the default test run (testpaths = tests):
+
+    python -m pytest benchmarks/test_hot_paths.py
+    python -m pytest benchmarks/test_hot_paths.py --benchmark-autosave
+    python -m pytest benchmarks/test_hot_paths.py --benchmark-compare --benchmark-compare-fail=mean:25%
+
+Each case also asserts an absolute ceiling on the mean, set several times
+above what a small cloud VM measures, so only real regressions trip it.
+Run with --benchmark-disable to check correctness without timing.
+"""
+import pytest
+
+from app.routes.templates import extract_variables
+from app.services.gmail import create_message, substitute_variables
+
+USER = {"name": "Asha Verma", "email": "asha.verma@college.edu"}
+
+LEAVE_NOTE = """Dear Sir/Madam,
+
+I, {{name}}, am writing to request leave from {{from_date}} to {{to_date}}.
+
+Reason: {{reason}}
+
+I request you to kindly grant me leave for the mentioned period.
+
+Thank you.
+
+Regards,
+{{name}}"""
+LEAVE_VARIABLES = {"from_date": "2024-01-15", "to_date": "2024-01-17", "reason": "Family function"}
+
+
+def announcement(size: int, variable_count: int) -> str:
+    """Roughly `size` characters of prose with `variable_count` distinct placeholders spread through it."""
+    paragraph = ("The hostel committee would like to inform all residents about the revised "
+                 "schedule for the coming term, including mess timings and visiting hours. ")
+    parts = []
+    i = 0
+    while sum(len(p) for p in parts) < size or i < variable_count:
+        parts.append(paragraph)
+        parts.append(f"{{{{var_{i % variable_count}}}}} ")
+        i += 1
+    return "Dear {{name}},\n\n" + "".join(parts) + "\n\nRegards,\n{{name}}"
+
+
+def variables_for(count: int) -> dict:
+    return {f"var_{i}": f"value number {i}" for i in range(count)}
+
+
+CASES = {
+    # name: (text, variables)
+    "leave_note": (LEAVE_NOTE, LEAVE_VARIABLES),
+    "announcement_10kb": (announcement(10_000, 20), variables_for(20)),
+    "announcement_100kb": (announcement(100_000, 50), variables_for(50)),
+    "many_variables": (announcement(20_000, 200), variables_for(200)),
+}
+
+# Mean-time ceilings in seconds
+SUBSTITUTE_CEILING = {
+    "leave_note": 0.0002,
+    "announcement_10kb": 0.002,
+    "announcement_100kb": 0.02,
+    "many_variables": 0.005,
+}
+EXTRACT_CEILING = {
+    "leave_note": 0.0001,
+    "announcement_10kb": 0.001,
+    "announcement_100kb": 0.01,
+    "many_variables": 0.002,
+}
+
+
+def check_ceiling(benchmark, ceiling: float):
+    if benchmark.disabled:
+        return
+    mean = benchmark.stats.stats.mean
+    assert mean < ceiling, f"mean {mean * 1e6:.1f}us exceeds ceiling {ceiling * 1e6:.1f}us"
+
+
+@pytest.mark.parametrize("case", CASES)
+def test_substitute_variables(benchmark, case):
+    text, variables = CASES[case]
+    result = benchmark(substitute_variables, text, variables, USER)
+    assert "{{" not in result
+    check_ceiling(benchmark, SUBSTITUTE_CEILING[case])
+
+
+@pytest.mark.parametrize("case", CASES)
+def test_extract_variables(benchmark, case):
+    text, variables = CASES[case]
+    result = benchmark(extract_variables, text)
+    assert set(result) >= set(variables)
+    check_ceiling(benchmark, EXTRACT_CEILING[case])
+
+
+@pytest.mark.parametrize("case,recipients,ceiling", [
+    ("leave_note", 2, 0.005),
+    ("announcement_10kb", 10, 0.01),
+    ("announcement_100kb", 40, 0.02),
+])
+def test_create_message(benchmark, case, recipients, ceiling):
+    text, variables = CASES[case]
+    body = substitute_variables(text, variables, USER)
+    to = [f"student{i}@college.edu" for i in range(recipients // 2 or 1)]
+    cc = [f"warden{i}@college.edu" for i in range(recipients // 2)]
+
+    message = benchmark(create_message, USER["email"], to, cc, "Hostel announcement", body)
+    assert message["raw"]
+    check_ceiling(benchmark, ceiling)
@@ -1,6 +1,9 @@
 import pytest
 import asyncio
-from unittest.mock import patch, MagicMock
+import base64
+import json
+import time
+from unittest.mock import patch, MagicMock, AsyncMock
 from fastapi.testclient import TestClient
 from mongomock_motor import AsyncMongoMockClient
 from datetime import datetime
@@ -16,9 +19,58 @@ os.environ["DATABASE_NAME"] = "email_trigger_test"
 os.environ["ADMIN_EMAILS"] = "admin@test.com"
 
 from app.main import app
+from app.auth.id_token import jwks_cache
+from app.services.rate_limit import memory_backend
 from app.database import db, get_database
 from app.auth.dependencies import get_current_user, get_admin_user
 
+class LocalGoogleKeys:
+    """Local stand-in for Google's ID-token signing keys and JWKS endpoint."""
+
+    def __init__(self, kid: str = "test-key"):
+        from cryptography.hazmat.primitives.asymmetric import rsa
+
+        self.kid = kid
+        self.private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+    def jwks(self) -> dict:
+        numbers = self.private_key.public_key().public_numbers()
+
+        def b64(value: int) -> str:
+            raw = value.to_bytes((value.bit_length() + 7) // 8, "big")
+            return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+        return {"keys": [{"kty": "RSA", "alg": "RS256", "use": "sig", "kid": self.kid,
+                          "n": b64(numbers.n), "e": b64(numbers.e)}]}
+
+    def sign(self, **overrides) -> str:
+        from cryptography.hazmat.primitives import hashes
+        from cryptography.hazmat.primitives.asymmetric import padding
+
+        now = int(time.time())
+        claims = {
+            "iss": "https://accounts.google.com",
+            "aud": "test-client-id",
+            "sub": "test-google-id",
+            "email": "test@test.com",
+            "email_verified": True,
+            "name": "Test User",
+            "iat": now,
+            "exp": now + 3600,
+            **overrides
+        }
+
+        def b64(data: bytes) -> str:
+            return base64.urlsafe_b64encode(data).decode("ascii").rstrip("=")
+
+        signing_input = ".".join([
+            b64(json.dumps({"alg": "RS256", "kid": self.kid, "typ": "JWT"}).encode()),
+            b64(json.dumps(claims).encode())
+        ])
+        signature = self.private_key.sign(signing_input.encode("ascii"), padding.PKCS1v15(), hashes.SHA256())
+        return f"{signing_input}.{b64(signature)}"
+
+
 # Store current mock user for dependency override
 _current_mock_user = None
 _mock_db_instance = None
@@ -51,6 +103,26 @@ def event_loop():
     loop.close()
 
 
+@pytest.fixture(scope="session")
+def google_keys():
+    """One RSA key pair per session; generating keys is slow."""
+    return LocalGoogleKeys()
+
+
+@pytest.fixture(autouse=True)
+def reset_jwks_cache():
+    jwks_cache.clear()
+    yield
+    jwks_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def reset_rate_limits():
+    memory_backend.clear()
+    yield
+    memory_backend.clear()
+
+
 @pytest.fixture
 async def mock_db():
     """Create a mock MongoDB database."""
@@ -64,6 +136,11 @@ async def mock_db():
     await mock_client["email_trigger_test"].templates.drop()
     await mock_client["email_trigger_test"].recipients.drop()
     await mock_client["email_trigger_test"].email_logs.drop()
+    await mock_client["email_trigger_test"].deletion_jobs.drop()
+    await mock_client["email_trigger_test"].idempotency_keys.drop()
+    await mock_client["email_trigger_test"].versions.drop()
+    await mock_client["email_trigger_test"].leases.drop()
+    await mock_client["email_trigger_test"].rate_limits.drop()
 
 
 @pytest.fixture
@@ -76,9 +153,12 @@ def client(mock_db):
     app.dependency_overrides[get_current_user] = mock_get_current_user
     app.dependency_overrides[get_admin_user] = mock_get_admin_user
 
-    with patch("app.database.get_database", return_value=mock_db):
-        with TestClient(app) as c:
-            yield c
+    # Keep the mock client in place instead of connecting to a real MongoDB
+    with patch("app.main.connect_to_mongo", new_callable=AsyncMock), \
+            patch("app.main.open_http_client", new_callable=AsyncMock):
+        with patch("app.database.get_database", return_value=mock_db):
+            with TestClient(app) as c:
+                yield c
 
     # Cleanup overrides
     app.dependency_overrides.clear()
@@ -146,6 +226,7 @@ async def test_recipient(mock_db, test_user):
         "user_id": str(test_user["_id"]),
         "name": "Test Warden",
         "email": "warden@test.com",
+        "email_lower": "warden@test.com",
         "type": "to",
         "is_default": True,
         "created_at": datetime.utcnow()
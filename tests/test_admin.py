@@ -1,5 +1,5 @@
 import pytest
-from unittest.mock import patch
+from unittest.mock import AsyncMock, patch
 from bson import ObjectId
 
 
@@ -34,6 +34,78 @@ class TestAdminAPI:
         with patch("app.routes.admin.get_database", return_value=mock_db):
             response = admin_client.delete(f"/api/admin/users/{test_user['_id']}")
             assert response.status_code == 200
+            assert "job_id" in response.json()
+
+    @pytest.mark.asyncio
+    async def test_delete_user_removes_related_data(self, admin_client, mock_db, test_user, test_template, test_recipient):
+        """Test that the background deletion job removes the user's data and reports progress."""
+        with patch("app.routes.admin.get_database", return_value=mock_db):
+            response = admin_client.delete(f"/api/admin/users/{test_user['_id']}")
+            job_id = response.json()["job_id"]
+
+            response = admin_client.get(f"/api/admin/users/deletions/{job_id}")
+            assert response.status_code == 200
+            job = response.json()
+            assert job["status"] == "completed"
+            assert job["progress"] == {"templates": 1, "recipients": 1, "email_logs": 0}
+
+        assert await mock_db.users.find_one({"_id": test_user["_id"]}) is None
+        assert await mock_db.templates.count_documents({"user_id": str(test_user["_id"])}) == 0
+        assert await mock_db.recipients.count_documents({"user_id": str(test_user["_id"])}) == 0
+
+    @pytest.mark.asyncio
+    async def test_delete_user_not_found(self, admin_client, mock_db):
+        """Test deleting a non-existent user."""
+        with patch("app.routes.admin.get_database", return_value=mock_db):
+            response = admin_client.delete(f"/api/admin/users/{ObjectId()}")
+            assert response.status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_retry_stalled_user_deletion(self, admin_client, mock_db, test_user, test_template):
+        """Test that a deletion job left running by a dead worker can be retried."""
+        from datetime import datetime, timedelta
+
+        job_id = ObjectId()
+        await mock_db.users.update_one({"_id": test_user["_id"]}, {"$set": {"deleted_at": datetime.utcnow()}})
+        await mock_db.deletion_jobs.insert_one({
+            "_id": job_id,
+            "user_id": str(test_user["_id"]),
+            "requested_by": "admin",
+            "status": "running",
+            "progress": {"templates": 0, "recipients": 0, "email_logs": 0},
+            "attempts": 1,
+            "error": None,
+            "created_at": datetime.utcnow() - timedelta(hours=1),
+            "updated_at": datetime.utcnow() - timedelta(hours=1),
+            "finished_at": None
+        })
+
+        with patch("app.routes.admin.get_database", return_value=mock_db):
+            response = admin_client.post(f"/api/admin/users/deletions/{job_id}/retry")
+            assert response.status_code == 200
+
+            response = admin_client.get(f"/api/admin/users/deletions/{job_id}")
+            job = response.json()
+            assert job["status"] == "completed"
+            assert job["attempts"] == 2
+            assert job["progress"]["templates"] == 1
+
+            # Completed jobs cannot be retried
+            response = admin_client.post(f"/api/admin/users/deletions/{job_id}/retry")
+            assert response.status_code == 409
+
+        assert await mock_db.users.find_one({"_id": test_user["_id"]}) is None
+
+    @pytest.mark.asyncio
+    async def test_deleted_user_hidden_from_listing(self, admin_client, mock_db, test_user):
+        """Test that tombstoned users are not listed."""
+        from datetime import datetime
+
+        await mock_db.users.update_one({"_id": test_user["_id"]}, {"$set": {"deleted_at": datetime.utcnow()}})
+
+        with patch("app.routes.admin.get_database", return_value=mock_db):
+            response = admin_client.get("/api/admin/users")
+            assert [u["email"] for u in response.json()] == ["admin@test.com"]
 
     @pytest.mark.asyncio
     async def test_delete_self_forbidden(self, admin_client, mock_db, admin_user):
@@ -83,3 +155,171 @@ class TestAdminAPI:
             assert response.status_code == 200
             data = response.json()
             assert "Recipient created for" in data["message"]
+
+    @pytest.mark.asyncio
+    async def test_create_recipient_for_user_refreshes_snapshot(self, admin_client, mock_db, test_user):
+        """Test that admin-created default recipients land in the user's snapshot."""
+        recipient_data = {
+            "name": "Warden",
+            "email": "warden@test.com",
+            "type": "to",
+            "is_default": True
+        }
+
+        with patch("app.routes.admin.get_database", return_value=mock_db):
+            response = admin_client.post(f"/api/admin/recipients/user/{test_user['_id']}", json=recipient_data)
+            assert response.status_code == 200
+
+        user = await mock_db.users.find_one({"_id": test_user["_id"]})
+        assert user["default_recipients"]["to"] == [{"name": "Warden", "email": "warden@test.com"}]
+
+    @pytest.mark.asyncio
+    async def test_create_for_user_being_deleted(self, admin_client, mock_db, test_user):
+        """Test that admins can't add templates or recipients to a tombstoned user."""
+        from datetime import datetime
+
+        await mock_db.users.update_one({"_id": test_user["_id"]}, {"$set": {"deleted_at": datetime.utcnow()}})
+
+        with patch("app.routes.admin.get_database", return_value=mock_db):
+            response = admin_client.post(f"/api/admin/recipients/user/{test_user['_id']}", json={
+                "name": "Warden", "email": "warden@test.com", "type": "to"
+            })
+            assert response.status_code == 404
+
+            response = admin_client.post(f"/api/admin/templates/user/{test_user['_id']}", json={
+                "name": "Leave", "category": "leave", "subject": "Leave", "body": "Body"
+            })
+            assert response.status_code == 404
+
+        assert await mock_db.recipients.count_documents({"user_id": str(test_user["_id"])}) == 0
+        assert await mock_db.templates.count_documents({"user_id": str(test_user["_id"])}) == 0
+
+    @pytest.mark.asyncio
+    async def test_delete_any_recipient_refreshes_snapshot(self, admin_client, mock_db, test_user, test_recipient):
+        """Test that admin deletion of a default recipient refreshes the owner's snapshot."""
+        with patch("app.routes.admin.get_database", return_value=mock_db):
+            response = admin_client.delete(f"/api/admin/recipients/{test_recipient['_id']}")
+            assert response.status_code == 200
+
+        user = await mock_db.users.find_one({"_id": test_user["_id"]})
+        assert user["default_recipients"] == {"to": [], "cc": []}
+
+    @pytest.mark.asyncio
+    async def test_bulk_create_recipient_pushes_into_snapshots(self, admin_client, mock_db, test_user):
+        """Test that bulk default recipients are appended only to existing snapshots."""
+        await mock_db.users.update_one(
+            {"_id": test_user["_id"]},
+            {"$set": {"default_recipients": {"to": [], "cc": []}}}
+        )
+        recipient_data = {
+            "name": "Bulk Warden",
+            "email": "bulk.warden@test.com",
+            "type": "to",
+            "is_default": True
+        }
+
+        with patch("app.routes.admin.get_database", return_value=mock_db):
+            response = admin_client.post("/api/admin/recipients/bulk-create", json=recipient_data)
+            assert response.status_code == 200
+
+        user = await mock_db.users.find_one({"_id": test_user["_id"]})
+        assert user["default_recipients"]["to"] == [{"name": "Bulk Warden", "email": "bulk.warden@test.com"}]
+        admin = await mock_db.users.find_one({"email": "admin@test.com"})
+        assert "default_recipients" not in admin
+
+    @pytest.mark.asyncio
+    async def test_bulk_create_snapshot_failure_keeps_insert_count(self, admin_client, mock_db, test_user):
+        """Test that a failed snapshot push is reported apart from the inserts and drops the snapshots."""
+        await mock_db.users.update_one(
+            {"_id": test_user["_id"]},
+            {"$set": {"default_recipients": {"to": [], "cc": []}}}
+        )
+        recipient_data = {
+            "name": "Bulk Warden",
+            "email": "bulk.warden@test.com",
+            "type": "to",
+            "is_default": True
+        }
+
+        with patch("app.routes.admin.get_database", return_value=mock_db), \
+                patch("app.routes.admin.push_default_recipient", AsyncMock(side_effect=Exception("push failed"))):
+            response = admin_client.post("/api/admin/recipients/bulk-create", json=recipient_data)
+
+        data = response.json()
+        assert data["inserted"] == 2
+        assert data["failed"] == 0
+        assert data["after_chunk_failed"] == 2
+        assert data["errors"] == ["push failed"]
+
+        user = await mock_db.users.find_one({"_id": test_user["_id"]})
+        assert "default_recipients" not in user
+
+    @pytest.mark.asyncio
+    async def test_get_users_paginated(self, admin_client, mock_db, test_user):
+        """Test keyset pagination over users with cursor and count headers."""
+        with patch("app.routes.admin.get_database", return_value=mock_db):
+            response = admin_client.get("/api/admin/users?limit=1&sort=email")
+            assert response.status_code == 200
+            assert [u["email"] for u in response.json()] == ["admin@test.com"]
+            assert response.headers["X-Total-Count"] == "2"
+            cursor = response.headers["X-Next-Cursor"]
+
+            response = admin_client.get(f"/api/admin/users?limit=1&sort=email&cursor={cursor}")
+            assert [u["email"] for u in response.json()] == ["test@test.com"]
+            assert "X-Next-Cursor" not in response.headers
+
+    @pytest.mark.asyncio
+    async def test_get_users_filtered_by_email(self, admin_client, mock_db, test_user):
+        """Test filtering users by email prefix."""
+        with patch("app.routes.admin.get_database", return_value=mock_db):
+            response = admin_client.get("/api/admin/users?email=TEST")
+            assert [u["email"] for u in response.json()] == ["test@test.com"]
+
+    @pytest.mark.asyncio
+    async def test_get_templates_filtered(self, admin_client, mock_db, test_template):
+        """Test filtering templates by category and user."""
+        with patch("app.routes.admin.get_database", return_value=mock_db):
+            response = admin_client.get(f"/api/admin/templates?category=leave&user_id={test_template['user_id']}")
+            assert len(response.json()) == 1
+
+            response = admin_client.get("/api/admin/templates?category=complaint")
+            assert response.json() == []
+
+    @pytest.mark.asyncio
+    async def test_get_recipients_filtered_by_type(self, admin_client, mock_db, test_recipient):
+        """Test filtering recipients by type."""
+        with patch("app.routes.admin.get_database", return_value=mock_db):
+            response = admin_client.get("/api/admin/recipients?type=to")
+            assert len(response.json()) == 1
+
+            response = admin_client.get("/api/admin/recipients?type=cc")
+            assert response.json() == []
+
+    @pytest.mark.asyncio
+    async def test_invalid_cursor(self, admin_client, mock_db):
+        """Test that a malformed cursor is rejected."""
+        with patch("app.routes.admin.get_database", return_value=mock_db):
+            response = admin_client.get("/api/admin/users?cursor=not-a-cursor")
+            assert response.status_code == 400
+
+    @pytest.mark.asyncio
+    async def test_bulk_create_template_streams_in_chunks(self, admin_client, mock_db, test_user):
+        """Test that bulk create covers every active user across several chunks."""
+        from datetime import datetime
+
+        await mock_db.users.insert_many([
+            {"email": f"user{i}@test.com", "name": f"User {i}", "created_at": datetime.utcnow()}
+            for i in range(5)
+        ])
+        await mock_db.users.insert_one({"email": "gone@test.com", "name": "Gone", "deleted_at": datetime.utcnow()})
+        template_data = {"name": "Bulk", "category": "other", "subject": "S", "body": "B"}
+
+        with patch("app.routes.admin.get_database", return_value=mock_db):
+            with patch("app.services.bulk.settings.bulk_chunk_size", 2):
+                response = admin_client.post("/api/admin/templates/bulk-create", json=template_data)
+                assert response.status_code == 200
+                data = response.json()
+                assert data["inserted"] == 7  # admin + test user + 5 new users
+                assert data["failed"] == 0
+
+        assert await mock_db.templates.count_documents({"name": "Bulk"}) == 7
@@ -0,0 +1,190 @@
+import httpx
+import pytest
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import patch, AsyncMock
+from urllib.parse import parse_qs, urlparse
+
+from app.auth.dependencies import get_current_user, get_current_user_full
+from app.services.http_client import http
+from app.services.versions import bump_versions
+
+
+def make_request(session: dict):
+    return SimpleNamespace(session=session)
+
+
+class TestSessionUser:
+    """Test cases for resolving the current user from the session."""
+
+    @pytest.mark.asyncio
+    async def test_snapshot_stored_without_tokens(self, mock_db, test_user):
+        """Test that the session snapshot holds only non-secret fields."""
+        session = {"user_id": str(test_user["_id"])}
+        user = await get_current_user(make_request(session))
+
+        assert user["access_token"] == "test-access-token"
+        assert session["user"]["email"] == "test@test.com"
+        assert session["user"]["id"] == str(test_user["_id"])
+        assert "access_token" not in session["user"]
+        assert "refresh_token" not in session["user"]
+
+    @pytest.mark.asyncio
+    async def test_snapshot_skips_database(self, mock_db, test_user):
+        """Test that a current snapshot authenticates without loading the user."""
+        session = {"user_id": str(test_user["_id"])}
+        await get_current_user(make_request(session))
+
+        with patch("app.auth.dependencies.load_user", new_callable=AsyncMock) as mock_load:
+            user = await get_current_user(make_request(session))
+            mock_load.assert_not_called()
+
+        assert user["_id"] == test_user["_id"]
+        assert user["name"] == "Test User"
+        assert "access_token" not in user
+
+    @pytest.mark.asyncio
+    async def test_snapshot_invalidated_by_version_bump(self, mock_db, test_user):
+        """Test that a user write makes the snapshot stale."""
+        session = {"user_id": str(test_user["_id"])}
+        await get_current_user(make_request(session))
+
+        await mock_db.users.update_one({"_id": test_user["_id"]}, {"$set": {"name": "Renamed"}})
+        await bump_versions(mock_db, str(test_user["_id"]), "user")
+
+        user = await get_current_user(make_request(session))
+        assert user["name"] == "Renamed"
+        assert session["user"]["name"] == "Renamed"
+
+    @pytest.mark.asyncio
+    async def test_snapshot_for_other_user_ignored(self, mock_db, test_user, admin_user):
+        """Test that a snapshot left over from another user is not trusted."""
+        session = {"user_id": str(admin_user["_id"])}
+        await get_current_user(make_request(session))
+        session["user_id"] = str(test_user["_id"])
+
+        user = await get_current_user(make_request(session))
+        assert user["email"] == "test@test.com"
+
+    @pytest.mark.asyncio
+    async def test_full_user_reloads_tokens(self, mock_db, test_user):
+        """Test that get_current_user_full replaces a snapshot user with the full document."""
+        session = {"user_id": str(test_user["_id"])}
+        await get_current_user(make_request(session))
+        snapshot_user = await get_current_user(make_request(session))
+
+        user = await get_current_user_full(snapshot_user)
+        assert user["access_token"] == "test-access-token"
+
+    @pytest.mark.asyncio
+    async def test_not_authenticated(self, mock_db):
+        """Test that a session without a user is rejected."""
+        from fastapi import HTTPException
+
+        with pytest.raises(HTTPException) as exc:
+            await get_current_user(make_request({}))
+        assert exc.value.status_code == 401
+
+
+@pytest.fixture
+def google(client, google_keys):
+    """Serve Google's token, JWKS and userinfo endpoints from a mock transport."""
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        if request.url.path == "/token":
+            return httpx.Response(200, json={
+                "access_token": "new-access-token",
+                "refresh_token": "new-refresh-token",
+                "expires_in": 3600,
+                "scope": "openid email",
+                "token_type": "Bearer",
+                "id_token": google_keys.sign()
+            })
+        if request.url.path == "/oauth2/v3/certs":
+            return httpx.Response(200, json=google_keys.jwks(), headers={"Cache-Control": "public, max-age=21600"})
+        if request.url.path == "/oauth2/v2/userinfo":
+            return httpx.Response(200, json={
+                "id": "test-google-id",
+                "email": "test@test.com",
+                "name": "Test User"
+            })
+        return httpx.Response(404)
+
+    previous = http.client
+    http.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    yield calls
+    http.client = previous
+
+
+class TestOAuthCallback:
+    """Test cases for the async OAuth login flow."""
+
+    def login(self, client) -> dict:
+        response = client.get("/auth/login", follow_redirects=False)
+        assert response.status_code == 307
+        return parse_qs(urlparse(response.headers["location"]).query)
+
+    def test_login_uses_pkce(self, client):
+        """Test that the authorization URL carries state and an S256 code challenge."""
+        params = self.login(client)
+        assert params["code_challenge_method"] == ["S256"]
+        assert params["state"][0]
+        assert params["access_type"] == ["offline"]
+
+    @pytest.mark.asyncio
+    async def test_callback_updates_existing_user(self, client, google, mock_db, test_user):
+        """Test that logging in refreshes the stored tokens over the shared client."""
+        self.login(client)
+        with patch("app.routes.auth.get_database", return_value=mock_db):
+            response = client.get("/auth/callback?code=auth-code", follow_redirects=False)
+
+        assert response.status_code == 302
+        token_request = google[0]
+        assert b"code_verifier=" in token_request.content
+        assert b"code=auth-code" in token_request.content
+
+        user = await mock_db.users.find_one({"_id": test_user["_id"]})
+        assert user["access_token"] == "new-access-token"
+        assert user["refresh_token"] == "new-refresh-token"
+        assert await mock_db.users.count_documents({}) == 1
+
+    @pytest.mark.asyncio
+    async def test_callback_verifies_id_token_locally(self, client, google, mock_db, test_user):
+        """Test that the user is identified from the ID token without a userinfo call."""
+        with patch("app.routes.auth.get_database", return_value=mock_db):
+            client.get("/auth/callback?code=auth-code", follow_redirects=False)
+            client.get("/auth/callback?code=auth-code", follow_redirects=False)
+
+        paths = [request.url.path for request in google]
+        assert "/oauth2/v2/userinfo" not in paths
+        # The key set is cached across logins
+        assert paths.count("/oauth2/v3/certs") == 1
+
+    @pytest.mark.asyncio
+    async def test_callback_ignores_tombstoned_user(self, client, google, mock_db, test_user):
+        """Test that a user being deleted signs up afresh instead of being revived."""
+        await mock_db.users.update_one({"_id": test_user["_id"]}, {"$set": {"deleted_at": datetime.utcnow()}})
+
+        with patch("app.routes.auth.get_database", return_value=mock_db):
+            response = client.get("/auth/callback?code=auth-code", follow_redirects=False)
+
+        assert response.status_code == 302
+        new_user = await mock_db.users.find_one({"deleted_at": {"$exists": False}})
+        assert new_user["_id"] != test_user["_id"]
+        assert new_user["access_token"] == "new-access-token"
+        assert await mock_db.templates.count_documents({"user_id": str(new_user["_id"])}) == 3
+
+    def test_callback_token_exchange_failure(self, client, mock_db):
+        """Test that a rejected code is reported as an authentication failure."""
+        previous = http.client
+        http.client = httpx.AsyncClient(transport=httpx.MockTransport(
+            lambda request: httpx.Response(400, json={"error": "invalid_grant"})
+        ))
+        try:
+            response = client.get("/auth/callback?code=bad-code")
+        finally:
+            http.client = previous
+        assert response.status_code == 400
+        assert "invalid_grant" in response.json()["detail"]
@@ -0,0 +1,87 @@
+import os
+import pytest
+from bson import ObjectId
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from app.database import db, get_database
+from app.services.background_jobs import BackgroundJobs, LEASE_ID
+from app.services.user_deletion import resume_stale_deletions
+
+
+class TestBackgroundJobsLease:
+    """Test cases for running periodic jobs in a single worker."""
+
+    @pytest.mark.asyncio
+    async def test_only_one_worker_holds_lease(self, mock_db):
+        """Test that a second worker can't take a live lease."""
+        first, second = BackgroundJobs(), BackgroundJobs()
+
+        assert await first.acquire() is True
+        assert await second.acquire() is False
+        # The holder keeps renewing
+        assert await first.acquire() is True
+
+    @pytest.mark.asyncio
+    async def test_expired_lease_taken_over(self, mock_db):
+        """Test that another worker takes over when the holder stops renewing."""
+        first, second = BackgroundJobs(), BackgroundJobs()
+        await first.acquire()
+        await mock_db.leases.update_one(
+            {"_id": LEASE_ID},
+            {"$set": {"expires_at": datetime.utcnow() - timedelta(seconds=1)}}
+        )
+
+        assert await second.acquire() is True
+        assert await first.acquire() is False
+
+    @pytest.mark.asyncio
+    async def test_release_hands_over_immediately(self, mock_db):
+        """Test that stopping the leader frees the lease for the next worker."""
+        first, second = BackgroundJobs(), BackgroundJobs()
+        await first.acquire()
+        await first.release()
+
+        assert await second.acquire() is True
+
+    @pytest.mark.asyncio
+    async def test_resume_stale_deletions(self, mock_db, test_user, test_template):
+        """Test that deletion jobs abandoned by a dead worker are finished."""
+        stale = datetime.utcnow() - timedelta(hours=1)
+        job_id = ObjectId()
+        await mock_db.users.update_one({"_id": test_user["_id"]}, {"$set": {"deleted_at": stale}})
+        await mock_db.deletion_jobs.insert_one({
+            "_id": job_id,
+            "user_id": str(test_user["_id"]),
+            "status": "running",
+            "progress": {"templates": 0, "recipients": 0, "email_logs": 0},
+            "attempts": 1,
+            "error": None,
+            "created_at": stale,
+            "updated_at": stale,
+            "finished_at": None
+        })
+        # A job that is still heartbeating must be left alone
+        await mock_db.deletion_jobs.insert_one({
+            "user_id": str(ObjectId()),
+            "status": "running",
+            "progress": {},
+            "attempts": 1,
+            "updated_at": datetime.utcnow()
+        })
+
+        assert await resume_stale_deletions(mock_db) == 1
+
+        job = await mock_db.deletion_jobs.find_one({"_id": job_id})
+        assert job["status"] == "completed"
+        assert await mock_db.templates.count_documents({}) == 0
+
+
+class TestForkSafety:
+    """Test cases for per-worker Mongo clients."""
+
+    def test_client_from_parent_process_rejected(self, mock_db):
+        """Test that a client created before fork isn't silently reused in a worker."""
+        with patch.object(db, "pid", os.getpid() + 1):
+            with pytest.raises(RuntimeError):
+                get_database()
@@ -0,0 +1,107 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from app.services.backpressure import SendCapacityExceeded, SendLimiter
+
+
+class TestSendLimiter:
+    """Test cases for bounding in-flight sends."""
+
+    @pytest.mark.asyncio
+    async def test_waits_then_rejects_when_queue_full(self):
+        """Test that sends beyond the slots queue, and beyond the queue are rejected."""
+        limiter = SendLimiter(max_in_flight=1, queue_size=1, queue_timeout=5)
+        await limiter.acquire()
+
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        assert limiter.waiting == 1
+
+        with pytest.raises(SendCapacityExceeded):
+            await limiter.acquire()
+
+        limiter.release()
+        await waiter
+        assert limiter.in_flight == 1
+        assert limiter.waiting == 0
+        limiter.release()
+
+    @pytest.mark.asyncio
+    async def test_queue_wait_times_out(self):
+        """Test that a queued send gives up after the queue timeout."""
+        limiter = SendLimiter(max_in_flight=1, queue_size=5, queue_timeout=0.01)
+        await limiter.acquire()
+
+        with pytest.raises(SendCapacityExceeded):
+            await limiter.acquire()
+        assert limiter.waiting == 0
+        assert limiter.in_flight == 1
+
+    @pytest.mark.asyncio
+    async def test_slots_released(self):
+        """Test that released slots are reusable without queueing."""
+        limiter = SendLimiter(max_in_flight=2, queue_size=0, queue_timeout=1)
+        for _ in range(5):
+            await limiter.acquire()
+            await limiter.acquire()
+            limiter.release()
+            limiter.release()
+        assert limiter.in_flight == 0
+
+
+class TestSendBackpressure:
+    """Test cases for the 503 response on a saturated worker."""
+
+    @pytest.mark.asyncio
+    async def test_saturated_send_returns_503(self, auth_client, mock_db):
+        """Test that a saturated worker answers 503 with Retry-After and never sends."""
+        saturated = SendLimiter(max_in_flight=1, queue_size=0, queue_timeout=1)
+        await saturated.acquire()
+        mock_send = AsyncMock()
+
+        with patch("app.routes.email.send_limiter", saturated), \
+                patch("app.routes.email.send_email", mock_send):
+            response = auth_client.post("/api/email/send", json={
+                "to": ["warden@test.com"], "subject": "Hi", "body": "Hello"
+            })
+
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "2"
+        mock_send.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_slot_released_after_send(self, auth_client, mock_db):
+        """Test that each request gives its slot back."""
+        limiter = SendLimiter(max_in_flight=1, queue_size=0, queue_timeout=1)
+        mock_send = AsyncMock(return_value={"success": True, "message_id": "m", "message": "ok"})
+
+        with patch("app.routes.email.send_limiter", limiter), \
+                patch("app.routes.email.send_email", mock_send):
+            for _ in range(3):
+                response = auth_client.post("/api/email/send", json={
+                    "to": ["warden@test.com"], "subject": "Hi", "body": "Hello"
+                })
+                assert response.status_code == 200
+
+        assert limiter.in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_idempotent_replay_needs_no_slot(self, auth_client, mock_db):
+        """Test that replaying a completed Idempotency-Key works even when the worker is saturated."""
+        limiter = SendLimiter(max_in_flight=1, queue_size=0, queue_timeout=1)
+        mock_send = AsyncMock(return_value={"success": True, "message_id": "m", "message": "ok"})
+        payload = {"to": ["warden@test.com"], "subject": "Hi", "body": "Hello"}
+        headers = {"Idempotency-Key": "replay-key"}
+
+        with patch("app.routes.email.send_limiter", limiter), \
+                patch("app.routes.email.get_database", return_value=mock_db), \
+                patch("app.routes.email.send_email", mock_send):
+            assert auth_client.post("/api/email/send", json=payload, headers=headers).status_code == 200
+
+            await limiter.acquire()
+            response = auth_client.post("/api/email/send", json=payload, headers=headers)
+            limiter.release()
+
+        assert response.status_code == 200
+        assert mock_send.call_count == 1
@@ -0,0 +1,89 @@
+import gzip
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse, Response
+from fastapi.testclient import TestClient
+
+from app.middleware.compression import CompressionMiddleware
+
+
+@pytest.fixture
+def compression_client():
+    """Create a client for a small app behind the compression middleware."""
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=100, level=6, encodings=["gzip"])
+
+    @app.get("/large")
+    async def large():
+        return {"items": ["x" * 50] * 100}
+
+    @app.get("/tagged")
+    async def tagged():
+        return JSONResponse({"items": ["x" * 50] * 100}, headers={"ETag": '"v1"'})
+
+    @app.get("/small")
+    async def small():
+        return {"ok": True}
+
+    @app.get("/encoded")
+    async def encoded():
+        return Response(gzip.compress(b"a" * 500), media_type="text/plain", headers={"Content-Encoding": "gzip"})
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            for _ in range(10):
+                yield b"y" * 100
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    @app.get("/binary")
+    async def binary():
+        return Response(b"\x00" * 500, media_type="image/png")
+
+    return TestClient(app)
+
+
+class TestCompressionMiddleware:
+    """Test cases for response compression."""
+
+    def test_large_json_compressed(self, compression_client):
+        """Test that large JSON responses are gzipped."""
+        response = compression_client.get("/large", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert "Accept-Encoding" in response.headers["vary"]
+        assert int(response.headers["content-length"]) < 5000
+        assert len(response.json()["items"]) == 100
+
+    def test_small_response_not_compressed(self, compression_client):
+        """Test that responses under the threshold are sent as-is."""
+        response = compression_client.get("/small", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in response.headers
+
+    def test_client_without_gzip(self, compression_client):
+        """Test that clients not accepting gzip get identity responses."""
+        response = compression_client.get("/large", headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in response.headers
+
+    def test_already_encoded_passthrough(self, compression_client):
+        """Test that responses with a Content-Encoding are not compressed twice."""
+        response = compression_client.get("/encoded", headers={"Accept-Encoding": "gzip"})
+        assert response.text == "a" * 500
+
+    def test_streaming_passthrough(self, compression_client):
+        """Test that streaming responses are forwarded untouched."""
+        response = compression_client.get("/stream", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in response.headers
+        assert response.content == b"y" * 1000
+
+    def test_incompressible_type_skipped(self, compression_client):
+        """Test that binary media types are not compressed."""
+        response = compression_client.get("/binary", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in response.headers
+
+    def test_strong_etag_gets_encoding_suffix(self, compression_client):
+        """Test that compressed responses don't reuse the identity body's strong ETag."""
+        response = compression_client.get("/tagged", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["etag"] == '"v1-gzip"'
+
+        response = compression_client.get("/tagged", headers={"Accept-Encoding": "identity"})
+        assert response.headers["etag"] == '"v1"'
@@ -0,0 +1,145 @@
+import pytest
+from unittest.mock import patch, AsyncMock
+from datetime import datetime
+from bson import ObjectId
+
+
+class TestEmailAPI:
+    """Test cases for email API endpoints."""
+
+    @pytest.mark.asyncio
+    async def test_send_template_uses_default_recipients(self, auth_client, mock_db, test_template, test_recipient):
+        """Test that send-template falls back to default TO and CC recipients."""
+        await mock_db.recipients.insert_one({
+            "_id": ObjectId(),
+            "user_id": test_recipient["user_id"],
+            "name": "Parent",
+            "email": "parent@test.com",
+            "type": "cc",
+            "is_default": True,
+            "created_at": datetime.utcnow()
+        })
+
+        mock_send = AsyncMock(return_value={"success": True, "message_id": "msg123", "message": "Email sent successfully"})
+
+        with patch("app.routes.email.get_database", return_value=mock_db):
+            with patch("app.routes.email.send_email", mock_send):
+                response = auth_client.post(
+                    "/api/email/send-template",
+                    json={"template_id": str(test_template["_id"]), "variables": {"date": "2024-01-15"}}
+                )
+                assert response.status_code == 200
+                kwargs = mock_send.call_args.kwargs
+                assert kwargs["to"] == ["warden@test.com"]
+                assert kwargs["cc"] == ["parent@test.com"]
+                assert kwargs["subject"] == "Test Subject - 2024-01-15"
+
+    @pytest.mark.asyncio
+    async def test_send_template_no_recipients(self, auth_client, mock_db, test_template):
+        """Test that send-template fails when there are no recipients."""
+        with patch("app.routes.email.get_database", return_value=mock_db):
+            response = auth_client.post(
+                "/api/email/send-template",
+                json={"template_id": str(test_template["_id"])}
+            )
+            assert response.status_code == 400
+
+    @pytest.mark.asyncio
+    async def test_send_template_not_found(self, auth_client, mock_db):
+        """Test sending with a non-existent template."""
+        with patch("app.routes.email.get_database", return_value=mock_db):
+            response = auth_client.post(
+                "/api/email/send-template",
+                json={"template_id": str(ObjectId()), "to": ["warden@test.com"]}
+            )
+            assert response.status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_preview_template(self, auth_client, mock_db, test_template, test_recipient):
+        """Test previewing a template with default recipients."""
+        with patch("app.routes.email.get_database", return_value=mock_db):
+            response = auth_client.get(f"/api/email/preview-template/{test_template['_id']}")
+            assert response.status_code == 200
+            data = response.json()
+            assert data["template_name"] == "Test Template"
+            assert "Test User" in data["body"]
+            assert data["default_to"] == [{"name": "Test Warden", "email": "warden@test.com"}]
+            assert data["default_cc"] == []
+
+    @pytest.mark.asyncio
+    async def test_send_template_reads_user_snapshot(self, auth_client, mock_db, test_user, test_template):
+        """Test that send-template uses the user's default_recipients snapshot without querying recipients."""
+        from tests.conftest import set_current_user
+
+        set_current_user({
+            **test_user,
+            "default_recipients": {
+                "to": [{"name": "Warden", "email": "snapshot.warden@test.com"}],
+                "cc": [{"name": "Parent", "email": "snapshot.parent@test.com"}]
+            }
+        })
+        mock_send = AsyncMock(return_value={"success": True, "message_id": "msg123", "message": "Email sent successfully"})
+
+        with patch("app.routes.email.get_database", return_value=mock_db):
+            with patch("app.routes.email.send_email", mock_send):
+                with patch("app.services.recipients.fetch_default_recipients", new_callable=AsyncMock) as mock_fetch:
+                    response = auth_client.post(
+                        "/api/email/send-template",
+                        json={"template_id": str(test_template["_id"])}
+                    )
+                    assert response.status_code == 200
+                    mock_fetch.assert_not_called()
+
+        kwargs = mock_send.call_args.kwargs
+        assert kwargs["to"] == ["snapshot.warden@test.com"]
+        assert kwargs["cc"] == ["snapshot.parent@test.com"]
+
+    @pytest.mark.asyncio
+    async def test_send_idempotency_key_coalesces_retries(self, auth_client, mock_db, test_template):
+        """Test that a retried send with the same Idempotency-Key does not send twice."""
+        mock_send = AsyncMock(return_value={"success": True, "message_id": "msg123", "message": "Email sent successfully"})
+        payload = {"template_id": str(test_template["_id"]), "to": ["warden@test.com"]}
+        headers = {"Idempotency-Key": "leave-2024-01-15"}
+
+        with patch("app.routes.email.get_database", return_value=mock_db):
+            with patch("app.routes.email.send_email", mock_send):
+                first = auth_client.post("/api/email/send-template", json=payload, headers=headers)
+                second = auth_client.post("/api/email/send-template", json=payload, headers=headers)
+
+        assert first.status_code == 200
+        assert second.status_code == 200
+        assert second.json() == first.json()
+        assert mock_send.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_send_idempotency_key_reused_for_other_request(self, auth_client, mock_db, test_template):
+        """Test that reusing an Idempotency-Key with a different body is rejected."""
+        mock_send = AsyncMock(return_value={"success": True, "message_id": "msg123", "message": "Email sent successfully"})
+        headers = {"Idempotency-Key": "key-1"}
+
+        with patch("app.routes.email.get_database", return_value=mock_db):
+            with patch("app.routes.email.send_email", mock_send):
+                auth_client.post("/api/email/send-template", json={"template_id": str(test_template["_id"]), "to": ["a@test.com"]}, headers=headers)
+                response = auth_client.post("/api/email/send-template", json={"template_id": str(test_template["_id"]), "to": ["b@test.com"]}, headers=headers)
+
+        assert response.status_code == 422
+        assert mock_send.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_send_idempotency_key_released_on_failure(self, auth_client, mock_db):
+        """Test that a failed send can be retried with the same Idempotency-Key."""
+        mock_send = AsyncMock(side_effect=[
+            {"success": False, "error": "boom", "message": "Failed to send email: boom"},
+            {"success": True, "message_id": "msg123", "message": "Email sent successfully"}
+        ])
+        payload = {"to": ["warden@test.com"], "subject": "Hi", "body": "Body"}
+        headers = {"Idempotency-Key": "key-2"}
+
+        with patch("app.routes.email.get_database", return_value=mock_db):
+            with patch("app.routes.email.send_email", mock_send):
+                first = auth_client.post("/api/email/send", json=payload, headers=headers)
+                second = auth_client.post("/api/email/send", json=payload, headers=headers)
+
+        assert first.status_code == 500
+        assert second.status_code == 200
+        assert mock_send.call_count == 2
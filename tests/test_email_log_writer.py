@@ -0,0 +1,105 @@
+import pytest
+from unittest.mock import patch, MagicMock, AsyncMock
+from bson import ObjectId
+from pymongo.errors import BulkWriteError
+
+from app.services.email_log_writer import EmailLogWriter
+
+
+class TestEmailLogWriter:
+    """Test cases for the batched email log writer."""
+
+    @pytest.mark.asyncio
+    async def test_write_direct_when_not_running(self, mock_db):
+        """Test that logs go straight to Mongo when the writer isn't started."""
+        writer = EmailLogWriter()
+        await writer.write({"user_id": "u1", "status": "sent"})
+
+        assert await mock_db.email_logs.count_documents({}) == 1
+        assert writer.buffer == []
+
+    @pytest.mark.asyncio
+    async def test_buffers_and_flushes_on_stop(self, mock_db):
+        """Test that buffered logs are written on shutdown."""
+        writer = EmailLogWriter()
+        writer.start()
+        for i in range(3):
+            await writer.write({"user_id": "u1", "status": "sent", "n": i})
+
+        assert await mock_db.email_logs.count_documents({}) == 0
+        await writer.stop()
+        assert await mock_db.email_logs.count_documents({}) == 3
+
+    @pytest.mark.asyncio
+    async def test_flushes_in_batches(self, mock_db):
+        """Test that flush writes the buffer in batches of log_batch_size."""
+        writer = EmailLogWriter()
+        writer.buffer = [{"user_id": "u1", "n": i} for i in range(5)]
+
+        fake_db = MagicMock()
+        fake_db.email_logs.insert_many = AsyncMock()
+
+        with patch("app.services.email_log_writer.settings.log_batch_size", 2):
+            with patch("app.services.email_log_writer.get_database", return_value=fake_db):
+                await writer.flush()
+
+        sizes = [len(call.args[0]) for call in fake_db.email_logs.insert_many.call_args_list]
+        assert sizes == [2, 2, 1]
+        assert writer.buffer == []
+
+    @pytest.mark.asyncio
+    async def test_full_buffer_falls_back_to_direct_write(self, mock_db):
+        """Test that a full buffer makes writes go straight to Mongo."""
+        writer = EmailLogWriter()
+        writer.start()
+
+        with patch("app.services.email_log_writer.settings.log_buffer_limit", 1):
+            await writer.write({"user_id": "u1", "n": 1})
+            await writer.write({"user_id": "u1", "n": 2})
+            assert len(writer.buffer) == 1
+            assert await mock_db.email_logs.count_documents({}) == 1
+
+        await writer.stop()
+        assert await mock_db.email_logs.count_documents({}) == 2
+
+    @pytest.mark.asyncio
+    async def test_partial_failure_requeues_only_failed_entries(self, mock_db):
+        """Test that stored and duplicate-key entries aren't retried after a partial failure."""
+        writer = EmailLogWriter()
+        entries = [{"_id": ObjectId(), "n": i} for i in range(3)]
+        writer.buffer = list(entries)
+
+        fake_db = MagicMock()
+        fake_db.email_logs.insert_many = AsyncMock(side_effect=[
+            BulkWriteError({"nInserted": 1, "writeErrors": [
+                {"index": 1, "code": 11000, "errmsg": "E11000 duplicate key"},
+                {"index": 2, "code": 121, "errmsg": "Document failed validation"}
+            ]}),
+            None
+        ])
+
+        with patch("app.services.email_log_writer.get_database", return_value=fake_db):
+            await writer.flush()
+            assert writer.buffer == [entries[2]]
+
+            await writer.flush()
+            assert writer.buffer == []
+
+        assert fake_db.email_logs.insert_many.call_args.args[0] == [entries[2]]
+
+    @pytest.mark.asyncio
+    async def test_drops_entries_after_max_retries(self, mock_db):
+        """Test that an entry that keeps failing is dropped instead of blocking the buffer."""
+        writer = EmailLogWriter()
+        writer.buffer = [{"_id": ObjectId(), "n": 1}]
+
+        fake_db = MagicMock()
+        fake_db.email_logs.insert_many = AsyncMock(side_effect=Exception("connection reset"))
+
+        with patch("app.services.email_log_writer.settings.log_max_retries", 2):
+            with patch("app.services.email_log_writer.get_database", return_value=fake_db):
+                for _ in range(3):
+                    await writer.flush()
+
+        assert writer.buffer == []
+        assert fake_db.email_logs.insert_many.call_count == 3
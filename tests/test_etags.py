@@ -0,0 +1,75 @@
+import pytest
+from unittest.mock import patch
+
+from app.services.etags import etag_matches
+
+
+class TestConditionalGet:
+    """Test cases for ETag revalidation of template and recipient lists."""
+
+    @pytest.mark.asyncio
+    async def test_unchanged_list_returns_304(self, auth_client, mock_db, test_template):
+        """Test that a matching If-None-Match gets an empty 304."""
+        with patch("app.routes.templates.get_database", return_value=mock_db):
+            first = auth_client.get("/api/templates")
+            etag = first.headers["etag"]
+            assert first.headers["cache-control"] == "private, no-cache"
+
+            response = auth_client.get("/api/templates", headers={"If-None-Match": etag})
+            assert response.status_code == 304
+            assert response.content == b""
+            assert response.headers["etag"] == etag
+
+    @pytest.mark.asyncio
+    async def test_write_changes_etag(self, auth_client, mock_db):
+        """Test that creating a recipient invalidates the previous ETag."""
+        with patch("app.routes.recipients.get_database", return_value=mock_db):
+            etag = auth_client.get("/api/recipients").headers["etag"]
+
+            auth_client.post("/api/recipients", json={
+                "name": "New Warden", "email": "new.warden@test.com", "type": "to", "is_default": True
+            })
+
+            response = auth_client.get("/api/recipients", headers={"If-None-Match": etag})
+            assert response.status_code == 200
+            assert response.headers["etag"] != etag
+            assert len(response.json()) == 1
+
+    @pytest.mark.asyncio
+    async def test_defaults_follow_user_scope(self, auth_client, mock_db, test_recipient):
+        """Test that the defaults ETag changes when the recipients scope is bumped."""
+        with patch("app.routes.recipients.get_database", return_value=mock_db):
+            # The first read builds the snapshot, which bumps the user scope
+            auth_client.get("/api/recipients/defaults")
+            etag = auth_client.get("/api/recipients/defaults").headers["etag"]
+            assert auth_client.get(
+                "/api/recipients/defaults", headers={"If-None-Match": etag}
+            ).status_code == 304
+
+            auth_client.delete(f"/api/recipients/{test_recipient['_id']}")
+
+            response = auth_client.get("/api/recipients/defaults", headers={"If-None-Match": etag})
+            assert response.status_code == 200
+            assert response.json()["to"] == []
+
+    @pytest.mark.asyncio
+    async def test_etag_is_per_user(self, auth_client, mock_db, test_user):
+        """Test that one user's ETag never validates another user's list."""
+        from tests.conftest import set_current_user
+
+        with patch("app.routes.templates.get_database", return_value=mock_db):
+            etag = auth_client.get("/api/templates").headers["etag"]
+
+            set_current_user({**test_user, "_id": "someone-else"})
+            response = auth_client.get("/api/templates", headers={"If-None-Match": etag})
+            assert response.status_code == 200
+
+    def test_matching_ignores_weak_prefix_and_encoding_suffix(self):
+        """Test that tags rewritten by compression or proxies still match."""
+        assert etag_matches('"abc"', '"abc"')
+        assert etag_matches('W/"abc"', '"abc"')
+        assert etag_matches('"abc-gzip"', '"abc"')
+        assert etag_matches('"other", W/"abc-br"', '"abc"')
+        assert etag_matches("*", '"abc"')
+        assert not etag_matches('"abcd"', '"abc"')
+        assert not etag_matches(None, '"abc"')
@@ -1,9 +1,30 @@
+import httpx
 import pytest
 from unittest.mock import patch, MagicMock, AsyncMock
-from datetime import datetime
+from datetime import datetime, timedelta
 from bson import ObjectId
 
 from app.services.gmail import substitute_variables, create_message
+from app.services.http_client import http
+
+
+@pytest.fixture
+def gmail_api():
+    """Serve the Gmail send and token endpoints from a mock transport."""
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        if request.url.path == "/token":
+            return httpx.Response(200, json={"access_token": "refreshed-token", "expires_in": 3600})
+        if request.headers["authorization"] == "Bearer revoked-token":
+            return httpx.Response(401, json={"error": {"code": 401, "message": "Invalid Credentials"}})
+        return httpx.Response(200, json={"id": "msg123", "threadId": "thread123"})
+
+    previous = http.client
+    http.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    yield calls
+    http.client = previous
 
 
 class TestGmailService:
@@ -100,34 +121,62 @@ class TestEmailSending:
     """Test cases for email sending functionality."""
 
     @pytest.mark.asyncio
-    async def test_send_email_success(self, mock_db, test_user):
+    async def test_send_email_success(self, mock_db, test_user, gmail_api):
         """Test successful email sending."""
         from app.services.gmail import send_email
 
-        mock_service = MagicMock()
-        mock_service.users().messages().send().execute.return_value = {"id": "msg123"}
+        with patch("app.services.gmail.get_database", return_value=mock_db):
+            result = await send_email(
+                user=test_user,
+                to=["recipient@test.com"],
+                cc=[],
+                subject="Test",
+                body="Test body"
+            )
+
+            assert result["success"] == True
+            assert result["message_id"] == "msg123"
+
+        request = gmail_api[0]
+        assert request.url.path == "/gmail/v1/users/me/messages/send"
+        assert request.headers["authorization"] == "Bearer test-access-token"
+
+    @pytest.mark.asyncio
+    async def test_expired_token_refreshed_before_send(self, mock_db, test_user, gmail_api):
+        """Test that an expired access token is refreshed on the shared client and stored."""
+        from app.services.gmail import send_email
+
+        test_user["token_expiry"] = (datetime.utcnow() - timedelta(minutes=1)).isoformat()
+        with patch("app.services.gmail.get_database", return_value=mock_db):
+            result = await send_email(test_user, ["recipient@test.com"], [], "Test", "Test body")
+
+        assert result["success"] == True
+        assert [r.url.path for r in gmail_api] == ["/token", "/gmail/v1/users/me/messages/send"]
+        assert gmail_api[1].headers["authorization"] == "Bearer refreshed-token"
+        user = await mock_db.users.find_one({"_id": test_user["_id"]})
+        assert user["access_token"] == "refreshed-token"
+
+    @pytest.mark.asyncio
+    async def test_rejected_token_refreshed_and_retried(self, mock_db, test_user, gmail_api):
+        """Test that a 401 from Gmail triggers one refresh and retry."""
+        from app.services.gmail import send_email
 
-        with patch("app.services.gmail.build", return_value=mock_service):
-            with patch("app.services.gmail.get_user_credentials", new_callable=AsyncMock):
-                with patch("app.services.gmail.get_database", return_value=mock_db):
-                    result = await send_email(
-                        user=test_user,
-                        to=["recipient@test.com"],
-                        cc=[],
-                        subject="Test",
-                        body="Test body"
-                    )
+        test_user["access_token"] = "revoked-token"
+        with patch("app.services.gmail.get_database", return_value=mock_db):
+            result = await send_email(test_user, ["recipient@test.com"], [], "Test", "Test body")
 
-                    assert result["success"] == True
-                    assert result["message_id"] == "msg123"
+        assert result["success"] == True
+        assert [r.url.path for r in gmail_api] == [
+            "/gmail/v1/users/me/messages/send", "/token", "/gmail/v1/users/me/messages/send"
+        ]
 
     @pytest.mark.asyncio
     async def test_send_email_failure(self, mock_db, test_user):
         """Test email sending failure."""
         from app.services.gmail import send_email
 
-        with patch("app.services.gmail.get_user_credentials", new_callable=AsyncMock) as mock_creds:
-            mock_creds.side_effect = Exception("API Error")
+        with patch("app.services.gmail.get_access_token", new_callable=AsyncMock) as mock_token:
+            mock_token.side_effect = Exception("API Error")
             with patch("app.services.gmail.get_database", return_value=mock_db):
                 result = await send_email(
                     user=test_user,
@@ -0,0 +1,90 @@
+import time
+import httpx
+import pytest
+
+from app.auth.id_token import InvalidIdToken, jwks_cache, verify_id_token
+from app.services.http_client import http
+from tests.conftest import LocalGoogleKeys
+
+
+@pytest.fixture
+def certs(google_keys):
+    """Serve the JWKS endpoint from a mock transport; yields the list of key sets served."""
+    served = [google_keys]
+    fetches = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        fetches.append(request)
+        keys = {"keys": [k for keyset in served for k in keyset.jwks()["keys"]]}
+        return httpx.Response(200, json=keys, headers={"Cache-Control": "public, max-age=21600"})
+
+    previous = http.client
+    http.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    yield served, fetches
+    http.client = previous
+
+
+class TestVerifyIdToken:
+    """Test cases for local Google ID-token verification."""
+
+    @pytest.mark.asyncio
+    async def test_valid_token(self, certs, google_keys):
+        """Test that a correctly signed token returns its claims."""
+        claims = await verify_id_token(google_keys.sign(), "test-client-id")
+        assert claims["sub"] == "test-google-id"
+        assert claims["email"] == "test@test.com"
+
+    @pytest.mark.asyncio
+    async def test_keys_cached_for_max_age(self, certs, google_keys):
+        """Test that the key set is fetched once and reused."""
+        _, fetches = certs
+        await verify_id_token(google_keys.sign(), "test-client-id")
+        await verify_id_token(google_keys.sign(), "test-client-id")
+        assert len(fetches) == 1
+
+    @pytest.mark.asyncio
+    async def test_rotated_key_triggers_refetch(self, certs, google_keys):
+        """Test that a token signed with a new key refreshes the key set."""
+        served, fetches = certs
+        await verify_id_token(google_keys.sign(), "test-client-id")
+
+        rotated = LocalGoogleKeys(kid="rotated-key")
+        served.append(rotated)
+        jwks_cache._fetched_at -= 120  # past the refetch rate limit
+
+        claims = await verify_id_token(rotated.sign(), "test-client-id")
+        assert claims["sub"] == "test-google-id"
+        assert len(fetches) == 2
+
+    @pytest.mark.asyncio
+    async def test_tampered_token_rejected(self, certs, google_keys):
+        """Test that changing the payload breaks the signature."""
+        header, _, signature = google_keys.sign().split(".")
+        _, payload, _ = google_keys.sign(sub="someone-else").split(".")
+        with pytest.raises(InvalidIdToken):
+            await verify_id_token(f"{header}.{payload}.{signature}", "test-client-id")
+
+    @pytest.mark.asyncio
+    async def test_wrong_audience_rejected(self, certs, google_keys):
+        """Test that tokens issued to another client are rejected."""
+        with pytest.raises(InvalidIdToken):
+            await verify_id_token(google_keys.sign(aud="other-client"), "test-client-id")
+
+    @pytest.mark.asyncio
+    async def test_expired_token_rejected(self, certs, google_keys):
+        """Test that expired tokens are rejected beyond the leeway."""
+        past = int(time.time()) - 7200
+        with pytest.raises(InvalidIdToken):
+            await verify_id_token(google_keys.sign(iat=past, exp=past + 3600), "test-client-id")
+
+    @pytest.mark.asyncio
+    async def test_wrong_issuer_rejected(self, certs, google_keys):
+        """Test that tokens from other issuers are rejected."""
+        with pytest.raises(InvalidIdToken):
+            await verify_id_token(google_keys.sign(iss="https://evil.example.com"), "test-client-id")
+
+    @pytest.mark.asyncio
+    async def test_malformed_token_rejected(self, certs):
+        """Test that garbage is rejected without a key lookup."""
+        with pytest.raises(InvalidIdToken):
+            await verify_id_token("not-a-jwt", "test-client-id")
@@ -0,0 +1,95 @@
+import httpx
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+from app.services.http_client import TimedTransport
+from app.services.metrics import (
+    Counter, Histogram, MetricsRegistry, MongoCommandMetrics, MONGO_LATENCY, OUTBOUND_LATENCY
+)
+
+
+class TestMetricTypes:
+    """Test cases for the Prometheus text format."""
+
+    def test_counter_render(self):
+        """Test that counters render one line per label set."""
+        registry = MetricsRegistry()
+        counter = registry.register(Counter("jobs_total", "Jobs run.", ["kind"]))
+        counter.inc("a")
+        counter.inc("a")
+        counter.inc("b", amount=3)
+
+        text = registry.render()
+        assert "# TYPE jobs_total counter" in text
+        assert 'jobs_total{kind="a"} 2' in text
+        assert 'jobs_total{kind="b"} 3' in text
+
+    def test_histogram_buckets_cumulative(self):
+        """Test that histogram buckets are cumulative and end with +Inf."""
+        histogram = Histogram("latency_seconds", "Latency.", ["route"], buckets=[0.1, 1.0])
+        histogram.observe(0.05, "/a")
+        histogram.observe(0.5, "/a")
+        histogram.observe(5.0, "/a")
+
+        text = "\n".join(histogram.render())
+        assert 'latency_seconds_bucket{route="/a",le="0.1"} 1' in text
+        assert 'latency_seconds_bucket{route="/a",le="1.0"} 2' in text
+        assert 'latency_seconds_bucket{route="/a",le="+Inf"} 3' in text
+        assert 'latency_seconds_count{route="/a"} 3' in text
+        assert 'latency_seconds_sum{route="/a"} 5.55' in text
+
+    def test_label_values_escaped(self):
+        """Test that quotes in label values don't break the format."""
+        counter = Counter("odd_total", "Odd labels.", ["value"])
+        counter.inc('say "hi"')
+        assert 'odd_total{value="say \\"hi\\""} 1' in counter.render()
+
+
+class TestRequestMetrics:
+    """Test cases for the timing middleware and /metrics endpoint."""
+
+    def test_requests_recorded_by_route_template(self, client, mock_db, test_user):
+        """Test that requests are labelled with the route template and status."""
+        from tests.conftest import set_current_user
+        set_current_user(test_user)
+
+        with patch("app.routes.templates.get_database", return_value=mock_db):
+            client.get("/api/templates/507f1f77bcf86cd799439011")
+
+        response = client.get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert 'http_requests_total{method="GET",route="/api/templates/{template_id}",status="404"}' in response.text
+        assert 'http_request_duration_seconds_count{method="GET",route="/api/templates/{template_id}"}' in response.text
+        assert "507f1f77bcf86cd799439011" not in response.text
+        assert 'http_requests_in_flight{method="GET"} 1' in response.text
+
+
+class TestDependencyMetrics:
+    """Test cases for Mongo and outbound HTTP timings."""
+
+    def test_mongo_command_timed(self):
+        """Test that command monitoring events are recorded per command and collection."""
+        listener = MongoCommandMetrics()
+        started = SimpleNamespace(
+            connection_id=("localhost", 27017), request_id=1,
+            command_name="find", command={"find": "metrics_test_users", "filter": {}}
+        )
+        listener.started(started)
+        listener.succeeded(SimpleNamespace(
+            connection_id=("localhost", 27017), request_id=1, command_name="find", duration_micros=1500
+        ))
+
+        assert MONGO_LATENCY.values[("find", "metrics_test_users", "success")][1][0] == pytest.approx(0.0015)
+
+    @pytest.mark.asyncio
+    async def test_outbound_request_timed(self):
+        """Test that outbound calls are recorded by host and status."""
+        transport = TimedTransport()
+        response = httpx.Response(200)
+        with patch.object(httpx.AsyncHTTPTransport, "handle_async_request", new_callable=AsyncMock, return_value=response):
+            await transport.handle_async_request(httpx.Request("POST", "https://metrics-test.example.com/send"))
+
+        counts, _ = OUTBOUND_LATENCY.values[("metrics-test.example.com", "POST", "200")]
+        assert sum(counts) == 1
@@ -0,0 +1,27 @@
+import pytest
+
+from app.services.pagination import paginate
+
+
+class TestKeysetPagination:
+    """Test cases for keyset pagination over fields that may be null."""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("descending", [False, True])
+    async def test_pages_cover_null_and_missing_values(self, mock_db, descending):
+        """Test that walking every page returns each document once, nulls included."""
+        docs = [{"name": name} for name in ["b", None, "a", "c", None, "b", "d", None, "a", "e"]]
+        docs += [{}, {}]  # no name at all
+        await mock_db.templates.insert_many(docs)
+
+        seen, cursor = [], None
+        while True:
+            page, cursor = await paginate(mock_db.templates, {}, "name", descending, 3, cursor)
+            seen.extend(page)
+            if not cursor:
+                break
+
+        assert len(seen) == 12
+        assert len({d["_id"] for d in seen}) == 12
+        named = [d["name"] for d in seen if d.get("name")]
+        assert named == sorted(named, reverse=descending)
@@ -0,0 +1,102 @@
+import pytest
+from types import SimpleNamespace
+from unittest.mock import patch
+from fastapi import HTTPException
+
+from app.services.rate_limit import MemoryBackend, MongoBackend, RateLimit, api_rate_limit, parse_rate
+
+
+def make_request(user_id=None, ip="10.0.0.1"):
+    session = {"user_id": user_id} if user_id else {}
+    return SimpleNamespace(session=session, client=SimpleNamespace(host=ip))
+
+
+class TestGCRA:
+    """Test cases for the GCRA backends."""
+
+    def test_parse_rate(self):
+        """Test that rates parse into count and period seconds."""
+        assert parse_rate("20/minute") == (20, 60)
+        assert parse_rate("5/seconds") == (5, 1)
+        assert parse_rate("1000/day") == (1000, 86400)
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("backend_name", ["memory", "mongo"])
+    async def test_burst_then_steady_rate(self, mock_db, backend_name):
+        """Test that a full burst is allowed, then one request per interval."""
+        backend = MemoryBackend() if backend_name == "memory" else MongoBackend()
+        now = 1_000_000.0
+        interval, period = 20.0, 60.0  # 3 per minute
+
+        for _ in range(3):
+            assert await backend.hit("k", now, interval, period) is None
+
+        retry_after = await backend.hit("k", now, interval, period)
+        assert retry_after == pytest.approx(20.0)
+
+        # One interval later exactly one more request fits
+        assert await backend.hit("k", now + 20, interval, period) is None
+        assert await backend.hit("k", now + 20, interval, period) is not None
+
+        # Idle for a full period restores the burst
+        for _ in range(3):
+            assert await backend.hit("k", now + 200, interval, period) is None
+
+    @pytest.mark.asyncio
+    async def test_mongo_state_shared_between_instances(self, mock_db):
+        """Test that two workers' backends draw from the same allowance."""
+        first, second = MongoBackend(), MongoBackend()
+        now = 1_000_000.0
+
+        assert await first.hit("shared", now, 30.0, 60.0) is None
+        assert await second.hit("shared", now, 30.0, 60.0) is None
+        assert await first.hit("shared", now, 30.0, 60.0) is not None
+        assert await second.hit("shared", now, 30.0, 60.0) is not None
+
+
+class TestRateLimitDependency:
+    """Test cases for the per-user and per-IP dependency."""
+
+    @pytest.mark.asyncio
+    async def test_users_limited_independently(self):
+        """Test that one user exhausting their limit doesn't affect another."""
+        limit = RateLimit("test_users", "2/minute")
+
+        await limit(make_request("user-a"))
+        await limit(make_request("user-a"))
+        with pytest.raises(HTTPException) as exc:
+            await limit(make_request("user-a"))
+        assert exc.value.status_code == 429
+        assert int(exc.value.headers["Retry-After"]) >= 1
+
+        await limit(make_request("user-b"))
+
+    @pytest.mark.asyncio
+    async def test_ip_limit_applies_without_session(self):
+        """Test that anonymous clients are limited by IP."""
+        limit = RateLimit("test_ips", "100/minute", "1/minute")
+
+        await limit(make_request(ip="10.0.0.2"))
+        with pytest.raises(HTTPException):
+            await limit(make_request(ip="10.0.0.2"))
+        await limit(make_request(ip="10.0.0.3"))
+
+    @pytest.mark.asyncio
+    async def test_signed_in_users_skip_ip_limit(self):
+        """Test that users behind one shared address don't share the IP budget."""
+        limit = RateLimit("test_shared_ip", "100/minute", "1/minute")
+
+        for user_id in ("user-c", "user-d", "user-e"):
+            await limit(make_request(user_id, ip="10.0.0.4"))
+            await limit(make_request(user_id, ip="10.0.0.4"))
+
+    def test_routes_return_429(self, auth_client, mock_db):
+        """Test that API routes answer 429 with Retry-After once the limit is hit."""
+        with patch.object(api_rate_limit, "ip_limit", (2, 60)), \
+                patch("app.routes.templates.get_database", return_value=mock_db):
+            assert auth_client.get("/api/templates").status_code == 200
+            assert auth_client.get("/api/templates").status_code == 200
+            response = auth_client.get("/api/templates")
+
+        assert response.status_code == 429
+        assert response.headers["retry-after"] == "30"
@@ -0,0 +1,206 @@
+import pytest
+from unittest.mock import patch
+
+from app.services.recipient_import import csv_rows, vcard_rows
+
+
+async def stream(data: bytes, size: int):
+    """Yield data in fixed-size pieces, like a chunked request body."""
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+
+async def collect(rows):
+    return [row async for row in rows]
+
+
+class TestRecipientImportParsing:
+    """Test cases for incremental CSV and vCard parsing."""
+
+    @pytest.mark.asyncio
+    async def test_csv_split_across_chunks(self):
+        """Test that records, quoted newlines and multi-byte characters survive any chunking."""
+        data = (
+            '\ufeffName,Email,Type\r\n'
+            '"Warden, Block A",warden@test.com,to\r\n'
+            '"Renée\nParent",parent@test.com,cc\r\n'
+            '\r\n'
+            'Friend,friend@test.com\r\n'
+        ).encode("utf-8")
+
+        for size in (1, 3, 7, len(data)):
+            rows = await collect(csv_rows(stream(data, size)))
+            assert rows == [
+                (2, {"name": "Warden, Block A", "email": "warden@test.com", "type": "to"}, None),
+                (3, {"name": "Renée\nParent", "email": "parent@test.com", "type": "cc"}, None),
+                (5, {"name": "Friend", "email": "friend@test.com"}, None)
+            ]
+
+    @pytest.mark.asyncio
+    async def test_csv_overlong_row_skipped(self):
+        """Test that a row over the length limit is reported without being buffered."""
+        with patch("app.services.recipient_import.MAX_LINE_LENGTH", 50):
+            data = ("name,email\n" + "x" * 200 + "\nOk,ok@test.com\n").encode("utf-8")
+            rows = await collect(csv_rows(stream(data, 16)))
+
+        assert rows == [
+            (2, None, "Row is too long"),
+            (3, {"name": "Ok", "email": "ok@test.com"}, None)
+        ]
+
+    @pytest.mark.asyncio
+    async def test_vcard_cards(self):
+        """Test folded lines, grouped properties and several emails per card."""
+        data = (
+            "BEGIN:VCARD\r\n"
+            "VERSION:3.0\r\n"
+            "N:Warden;Hostel;;;\r\n"
+            "FN:Hostel\r\n"
+            "  Warden\r\n"
+            "EMAIL;TYPE=work:warden@test.com\r\n"
+            "item1.EMAIL:office@test.com\r\n"
+            "END:VCARD\r\n"
+            "BEGIN:VCARD\r\n"
+            "N:Parent;Guardian;;;\r\n"
+            "END:VCARD\r\n"
+        ).encode("utf-8")
+
+        rows = await collect(vcard_rows(stream(data, 5)))
+        assert rows == [
+            (1, {"name": "Hostel Warden", "email": "warden@test.com"}, None),
+            (1, {"name": "Hostel Warden", "email": "office@test.com"}, None),
+            (2, None, "email: Field required")
+        ]
+
+
+class TestRecipientImportAPI:
+    """Test cases for the bulk recipient import endpoint."""
+
+    @pytest.mark.asyncio
+    async def test_import_csv(self, auth_client, mock_db, test_user):
+        """Test importing CSV rows with per-row errors and type overrides."""
+        data = (
+            "name,email,type,is_default\n"
+            "Warden,warden@test.com,to,true\n"
+            "Parent,parent@test.com,cc,\n"
+            "Broken,not-an-email,to,false\n"
+            ",noname@test.com,cc,false\n"
+        )
+
+        with patch("app.routes.recipients.get_database", return_value=mock_db):
+            response = auth_client.post(
+                "/api/recipients/import",
+                content=data,
+                headers={"Content-Type": "text/csv; charset=utf-8"}
+            )
+
+        assert response.status_code == 200
+        result = response.json()
+        assert result["inserted"] == 2
+        assert result["failed"] == 2
+        assert [e["row"] for e in result["errors"]] == [4, 5]
+        assert result["errors"][0]["email"] == "not-an-email"
+        assert result["errors"][1]["error"].startswith("name:")
+
+        stored = await mock_db.recipients.find({"user_id": str(test_user["_id"])}).to_list(None)
+        assert {(r["email"], r["type"], r["is_default"]) for r in stored} == {
+            ("warden@test.com", "to", True),
+            ("parent@test.com", "cc", False)
+        }
+
+        user = await mock_db.users.find_one({"_id": test_user["_id"]})
+        assert user["default_recipients"]["to"] == [{"name": "Warden", "email": "warden@test.com"}]
+
+    @pytest.mark.asyncio
+    async def test_import_deduplicates(self, auth_client, mock_db, test_recipient):
+        """Test that existing emails and repeats across chunks are skipped."""
+        data = "name,email\n" + "".join(
+            f"Person {i},{email}\n" for i, email in enumerate([
+                "WARDEN@test.com", "a@test.com", "b@test.com", "a@test.com", "c@test.com", "b@test.com"
+            ])
+        )
+
+        with patch("app.routes.recipients.get_database", return_value=mock_db):
+            with patch("app.services.recipient_import.settings.bulk_chunk_size", 2):
+                response = auth_client.post(
+                    "/api/recipients/import", content=data, headers={"Content-Type": "text/csv"}
+                )
+
+        result = response.json()
+        assert result["inserted"] == 3
+        assert result["duplicates"] == 3
+        assert await mock_db.recipients.count_documents({"email": "a@test.com"}) == 1
+
+    @pytest.mark.asyncio
+    async def test_import_deduplicates_ignoring_case(self, auth_client, mock_db):
+        """Test that a recipient stored with mixed case is found by a lowercase import."""
+        with patch("app.routes.recipients.get_database", return_value=mock_db):
+            auth_client.post("/api/recipients", json={"name": "Warden", "email": "Warden@hostel.edu"})
+            response = auth_client.post(
+                "/api/recipients/import",
+                content="name,email\nWarden,warden@hostel.edu\n",
+                headers={"Content-Type": "text/csv"}
+            )
+
+        assert response.json()["inserted"] == 0
+        assert response.json()["duplicates"] == 1
+
+    @pytest.mark.asyncio
+    async def test_backfill_email_lower(self, mock_db, test_user):
+        """Test that recipients written before email_lower existed get it set."""
+        from app.services.recipients import backfill_email_lower
+
+        await mock_db.recipients.insert_many([
+            {"user_id": str(test_user["_id"]), "name": f"Old {i}", "email": f"Old{i}@Test.com"}
+            for i in range(3)
+        ])
+
+        assert await backfill_email_lower(mock_db, batch_size=2) == 3
+        assert await mock_db.recipients.count_documents({"email_lower": "old1@test.com"}) == 1
+        assert await backfill_email_lower(mock_db, batch_size=2) == 0
+
+    @pytest.mark.asyncio
+    async def test_import_vcard_uses_query_defaults(self, auth_client, mock_db, test_user):
+        """Test that vCard rows take their type and default flag from the query."""
+        data = "BEGIN:VCARD\nFN:Parent\nEMAIL:parent@test.com\nEND:VCARD\n"
+
+        with patch("app.routes.recipients.get_database", return_value=mock_db):
+            response = auth_client.post(
+                "/api/recipients/import?type=cc&is_default=true",
+                content=data,
+                headers={"Content-Type": "text/vcard"}
+            )
+
+        assert response.json()["inserted"] == 1
+        stored = await mock_db.recipients.find_one({"email": "parent@test.com"})
+        assert stored["type"] == "cc"
+        assert stored["is_default"] is True
+
+    @pytest.mark.asyncio
+    async def test_import_invalidates_list_etag(self, auth_client, mock_db):
+        """Test that an import bumps the recipients version."""
+        with patch("app.routes.recipients.get_database", return_value=mock_db):
+            etag = auth_client.get("/api/recipients").headers["etag"]
+            auth_client.post(
+                "/api/recipients/import",
+                content="email,name\nnew@test.com,New\n",
+                headers={"Content-Type": "text/csv"}
+            )
+            response = auth_client.get("/api/recipients", headers={"If-None-Match": etag})
+
+        assert response.status_code == 200
+        assert len(response.json()) == 1
+
+    @pytest.mark.asyncio
+    async def test_import_rejects_bad_uploads(self, auth_client, mock_db):
+        """Test unsupported content types and CSVs without an email column."""
+        with patch("app.routes.recipients.get_database", return_value=mock_db):
+            response = auth_client.post(
+                "/api/recipients/import", content="{}", headers={"Content-Type": "application/json"}
+            )
+            assert response.status_code == 415
+
+            response = auth_client.post(
+                "/api/recipients/import", content="name,phone\nA,123\n", headers={"Content-Type": "text/csv"}
+            )
+            assert response.status_code == 400
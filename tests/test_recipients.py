@@ -140,3 +140,71 @@ class TestRecipientsAPI:
         with patch("app.routes.recipients.get_database", return_value=mock_db):
             response = auth_client.delete(f"/api/recipients/{fake_id}")
             assert response.status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_create_default_recipient_updates_snapshot(self, auth_client, mock_db, test_user):
+        """Test that creating a default recipient refreshes the user's snapshot."""
+        recipient_data = {
+            "name": "Parent",
+            "email": "parent@test.com",
+            "type": "cc",
+            "is_default": True
+        }
+
+        with patch("app.routes.recipients.get_database", return_value=mock_db):
+            response = auth_client.post("/api/recipients", json=recipient_data)
+            assert response.status_code == 200
+
+        user = await mock_db.users.find_one({"_id": test_user["_id"]})
+        assert user["default_recipients"] == {
+            "to": [],
+            "cc": [{"name": "Parent", "email": "parent@test.com"}]
+        }
+
+    @pytest.mark.asyncio
+    async def test_delete_default_recipient_updates_snapshot(self, auth_client, mock_db, test_user, test_recipient):
+        """Test that deleting a default recipient removes it from the snapshot."""
+        with patch("app.routes.recipients.get_database", return_value=mock_db):
+            response = auth_client.delete(f"/api/recipients/{test_recipient['_id']}")
+            assert response.status_code == 200
+
+        user = await mock_db.users.find_one({"_id": test_user["_id"]})
+        assert user["default_recipients"] == {"to": [], "cc": []}
+
+    @pytest.mark.asyncio
+    async def test_update_recipient_refreshes_snapshot(self, auth_client, mock_db, test_user, test_recipient):
+        """Test that updating a default recipient refreshes the user's snapshot."""
+        with patch("app.routes.recipients.get_database", return_value=mock_db):
+            response = auth_client.put(
+                f"/api/recipients/{test_recipient['_id']}",
+                json={"email": "new.warden@test.com", "type": "cc"}
+            )
+            assert response.status_code == 200
+
+        user = await mock_db.users.find_one({"_id": test_user["_id"]})
+        assert user["default_recipients"] == {
+            "to": [],
+            "cc": [{"name": "Test Warden", "email": "new.warden@test.com"}]
+        }
+
+    @pytest.mark.asyncio
+    async def test_stale_refresh_does_not_overwrite_snapshot(self, mock_db, test_user, test_recipient):
+        """Test that a rebuild superseded by a later one does not write its snapshot."""
+        from app.services import recipients as recipients_service
+
+        user_id = str(test_user["_id"])
+        original_fetch = recipients_service.fetch_default_recipients
+
+        async def fetch_then_race(db, uid):
+            # Read the current state, then let a newer rebuild start and finish
+            stale = await original_fetch(db, uid)
+            await db.recipients.delete_many({"user_id": uid})
+            with patch.object(recipients_service, "fetch_default_recipients", original_fetch):
+                await recipients_service.refresh_default_recipients(db, uid)
+            return stale
+
+        with patch.object(recipients_service, "fetch_default_recipients", fetch_then_race):
+            await recipients_service.refresh_default_recipients(mock_db, user_id)
+
+        user = await mock_db.users.find_one({"_id": test_user["_id"]})
+        assert user["default_recipients"] == {"to": [], "cc": []}
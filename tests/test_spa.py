@@ -0,0 +1,86 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.spa import mount_spa, choose_encoding
+
+
+@pytest.fixture
+def spa_client(tmp_path):
+    """Create a client for an app serving a fake frontend build."""
+    assets = tmp_path / "assets"
+    assets.mkdir()
+    (tmp_path / "index.html").write_text("<html><body><div id='root'></div></body></html>")
+    (assets / "index-3f2a9c1b.js").write_text("console.log('hello');\n" * 200)
+    (assets / "logo.svg").write_text("<svg></svg>")
+
+    app = FastAPI()
+    mount_spa(app, str(tmp_path))
+    return TestClient(app)
+
+
+class TestSPA:
+    """Test cases for serving the built frontend."""
+
+    def test_index_served_for_client_routes(self, spa_client):
+        """Test that unknown paths get index.html with an ETag."""
+        response = spa_client.get("/dashboard")
+        assert response.status_code == 200
+        assert "<div id='root'>" in response.text
+        assert response.headers["cache-control"] == "no-cache"
+        assert response.headers["etag"]
+
+    def test_index_not_modified(self, spa_client):
+        """Test that a matching If-None-Match returns 304."""
+        etag = spa_client.get("/").headers["etag"]
+        response = spa_client.get("/history", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.content == b""
+
+    def test_hashed_asset_gzip_and_immutable(self, spa_client):
+        """Test that hashed assets are served precompressed with long-lived caching."""
+        response = spa_client.get("/assets/index-3f2a9c1b.js", headers={"Accept-Encoding": "gzip"})
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert "immutable" in response.headers["cache-control"]
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert response.text.startswith("console.log")
+
+    def test_asset_identity_without_accept_encoding(self, spa_client):
+        """Test that clients not accepting compression get the raw bytes."""
+        response = spa_client.get("/assets/index-3f2a9c1b.js", headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in response.headers
+        assert response.content.startswith(b"console.log")
+
+    def test_small_unhashed_asset(self, spa_client):
+        """Test that small, unhashed assets are served uncompressed and revalidated."""
+        response = spa_client.get("/assets/logo.svg", headers={"Accept-Encoding": "gzip"})
+        assert response.status_code == 200
+        assert "content-encoding" not in response.headers
+        assert response.headers["cache-control"] == "no-cache"
+
+    def test_missing_asset(self, spa_client):
+        """Test that unknown assets are 404s rather than index.html."""
+        response = spa_client.get("/assets/missing.js")
+        assert response.status_code == 404
+
+    def test_prebuilt_brotli_variant_preferred(self, tmp_path):
+        """Test that a .br file from the build is served to clients accepting br."""
+        assets = tmp_path / "assets"
+        assets.mkdir()
+        content = b"body { color: red; }\n" * 100
+        (assets / "index-a1b2c3d4.css").write_bytes(content)
+        (assets / "index-a1b2c3d4.css.br").write_bytes(b"fake-brotli")
+
+        app = FastAPI()
+        mount_spa(app, str(tmp_path))
+        response = TestClient(app).get("/assets/index-a1b2c3d4.css", headers={"Accept-Encoding": "gzip, br"})
+        assert response.headers["content-encoding"] == "br"
+
+    def test_choose_encoding(self):
+        """Test Accept-Encoding negotiation."""
+        variants = {"identity": b"", "gzip": b""}
+        assert choose_encoding("gzip, deflate", variants) == "gzip"
+        assert choose_encoding("gzip;q=0", variants) == "identity"
+        assert choose_encoding("br", variants) == "identity"
+        assert choose_encoding("*", variants) == "gzip"
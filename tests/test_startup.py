@@ -0,0 +1,11 @@
+from benchmarks.bench_startup import eager_lazy_modules, import_times
+
+
+class TestStartupImports:
+    """Test cases for keeping cold-start imports light."""
+
+    def test_google_clients_not_imported_at_startup(self):
+        """Test that importing the app does not load any Google client library."""
+        times = import_times("app.main")
+        assert "app.main" in times
+        assert eager_lazy_modules(times) == []
@@ -0,0 +1,148 @@
+import asyncio
+import json
+import httpx
+import pytest
+from unittest.mock import patch
+
+from app.services import tracing
+from app.services.http_client import http
+from app.services.tracing import STAGE_LATENCY, SpanExporter, span, traced
+
+
+@pytest.fixture
+def exported(tmp_path):
+    """Enable the local span exporter; yields a reader for the exported spans."""
+    path = tmp_path / "spans.jsonl"
+
+    def read():
+        if not path.exists():
+            return []
+        return [json.loads(line) for line in path.read_text().splitlines()]
+
+    with patch.object(tracing.settings, "trace_export_path", str(path)):
+        yield read
+
+
+class TestSpans:
+    """Test cases for stage-level tracing."""
+
+    @pytest.mark.asyncio
+    async def test_nested_spans_share_trace(self, exported):
+        """Test that child spans link to their parent and export with the root."""
+        with span("tracing_test.root", user="u1"):
+            with span("tracing_test.child"):
+                pass
+            assert exported() == []  # nothing written until the root ends
+
+        child, root = exported()
+        assert root["name"] == "tracing_test.root"
+        assert "parentSpanId" not in root
+        assert child["parentSpanId"] == root["spanId"]
+        assert child["traceId"] == root["traceId"]
+        assert root["attributes"] == [{"key": "user", "value": {"stringValue": "u1"}}]
+
+    @pytest.mark.asyncio
+    async def test_gathered_spans_attach_to_parent(self, exported):
+        """Test that spans opened in concurrent tasks nest under the current span."""
+        with span("tracing_test.gather"):
+            await asyncio.gather(
+                traced("tracing_test.a", asyncio.sleep(0)),
+                traced("tracing_test.b", asyncio.sleep(0))
+            )
+
+        spans = {s["name"]: s for s in exported()}
+        root_id = spans["tracing_test.gather"]["spanId"]
+        assert spans["tracing_test.a"]["parentSpanId"] == root_id
+        assert spans["tracing_test.b"]["parentSpanId"] == root_id
+
+    @pytest.mark.asyncio
+    async def test_error_recorded(self, exported):
+        """Test that exceptions mark the span as failed and still propagate."""
+        with pytest.raises(ValueError):
+            with span("tracing_test.fails"):
+                raise ValueError("boom")
+
+        [failed] = exported()
+        assert failed["status"] == {"code": 2, "message": "ValueError: boom"}
+        assert ("tracing_test.fails", "error") in STAGE_LATENCY.values
+
+    def test_histogram_without_exporter(self):
+        """Test that stage timings are recorded even when export is off."""
+        with span("tracing_test.metrics_only"):
+            pass
+        assert ("tracing_test.metrics_only", "ok") in STAGE_LATENCY.values
+
+
+class TestSpanExporter:
+    """Test cases for writing spans off the event loop."""
+
+    @pytest.mark.asyncio
+    async def test_running_exporter_writes_in_background(self, exported):
+        """Test that a finished trace is queued, then written by the background task."""
+        exporter = SpanExporter()
+        exporter.start()
+        try:
+            with patch.object(tracing, "span_exporter", exporter):
+                with span("request"):
+                    pass
+                assert exported() == []
+                assert len(exporter.buffer) == 1
+
+                for _ in range(20):
+                    await asyncio.sleep(0.01)
+                    if exported():
+                        break
+            assert [s["name"] for s in exported()] == ["request"]
+        finally:
+            await exporter.stop()
+
+    @pytest.mark.asyncio
+    async def test_full_queue_drops_traces(self, exported):
+        """Test that traces beyond trace_buffer_limit are dropped and counted."""
+        exporter = SpanExporter()
+        exporter.start()
+        try:
+            with patch.object(tracing, "span_exporter", exporter), \
+                    patch.object(tracing.settings, "trace_buffer_limit", 1):
+                with span("first"):
+                    pass
+                with span("second"):
+                    pass
+            assert exporter.dropped == 1
+        finally:
+            await exporter.stop()
+        assert [s["name"] for s in exported()] == ["first"]
+
+
+class TestSendPipelineTracing:
+    """Test cases for the instrumented send-template path."""
+
+    @pytest.mark.asyncio
+    async def test_send_template_stages(self, auth_client, mock_db, test_template, test_recipient, exported):
+        """Test that each stage of a template send is a span in one trace."""
+        previous = http.client
+        http.client = httpx.AsyncClient(transport=httpx.MockTransport(
+            lambda request: httpx.Response(200, json={"id": "msg123"})
+        ))
+        try:
+            with patch("app.routes.email.get_database", return_value=mock_db):
+                response = auth_client.post(
+                    "/api/email/send-template",
+                    json={"template_id": str(test_template["_id"])}
+                )
+        finally:
+            http.client = previous
+        assert response.status_code == 200
+
+        spans = exported()
+        assert {s["name"] for s in spans} == {
+            "send_template",
+            "send_template.fetch_template",
+            "send_template.fetch_default_recipients",
+            "send_email",
+            "send_email.create_message",
+            "send_email.access_token",
+            "send_email.gmail_api",
+            "send_email.log_write",
+        }
+        assert len({s["traceId"] for s in spans}) == 1
@@ -0,0 +1,66 @@
+import pytest
+from unittest.mock import AsyncMock
+
+from app.services.cache import VersionedCache
+from app.services.versions import VersionTracker, bump_versions, bump_global_versions
+
+
+class TestVersionedCache:
+    """Test cases for version-checked caching across workers."""
+
+    @pytest.mark.asyncio
+    async def test_cache_hit_until_version_bumped(self, mock_db):
+        """Test that cached values are reused until the user's scope is bumped."""
+        cache = VersionedCache("templates")
+        loader = AsyncMock(side_effect=["first", "second"])
+
+        assert await cache.get_or_load("user-1", loader) == "first"
+        assert await cache.get_or_load("user-1", loader) == "first"
+        assert loader.call_count == 1
+
+        await bump_versions(mock_db, "user-1", "templates")
+        assert await cache.get_or_load("user-1", loader) == "second"
+
+    @pytest.mark.asyncio
+    async def test_other_scope_bump_keeps_cache(self, mock_db):
+        """Test that bumping an unrelated scope doesn't invalidate the entry."""
+        cache = VersionedCache("templates")
+        loader = AsyncMock(return_value="value")
+
+        await cache.get_or_load("user-2", loader)
+        await bump_versions(mock_db, "user-2", "recipients")
+        await cache.get_or_load("user-2", loader)
+        assert loader.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_global_bump_invalidates_every_user(self, mock_db):
+        """Test that a global bump drops entries for all users."""
+        cache = VersionedCache("recipients")
+        loader = AsyncMock(return_value="value")
+
+        await cache.get_or_load("user-3", loader)
+        await bump_global_versions(mock_db, "recipients")
+        await cache.get_or_load("user-3", loader)
+        assert loader.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_poll_sees_writes_from_other_workers(self, mock_db):
+        """Test that a polling tracker picks up bumps made by another process."""
+        tracker = VersionTracker()
+        tracker.start()
+        try:
+            before = await tracker.get("user-4", "user")
+
+            # Simulate another worker bumping the version directly in Mongo
+            from datetime import datetime
+            await mock_db.versions.update_one(
+                {"_id": "user-4"},
+                {"$inc": {"user": 1}, "$set": {"updated_at": datetime.utcnow()}},
+                upsert=True
+            )
+            assert await tracker.get("user-4", "user") == before
+
+            await tracker.poll()
+            assert await tracker.get("user-4", "user") != before
+        finally:
+            await tracker.stop()